@@ -0,0 +1,101 @@
+"""On-disk index of local backups."""
+
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+CATALOG_VERSION = 1
+
+# One lock per catalog file, shared by every BackupCatalog opened on it
+_locks: dict[Path, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(path: Path) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(path.resolve(), threading.Lock())
+
+
+class BackupCatalog:
+    """
+    JSON index of every backup, written when a backup is created or deleted.
+
+    Listing and retention read this one file instead of statting archives
+    and parsing snapshot manifests. Entries hold raw values:
+
+        name, filename, path, type ("full", "incremental" or "store"),
+        created (ISO timestamp), bytes, new_bytes, file_count, sha256,
+        include_database, include_files, database_layout, parent
+    """
+
+    def __init__(self, path: Path, rebuild: Callable[[], list[dict]]):
+        """
+        Initialize the catalog.
+
+        Args:
+            path: Catalog file
+            rebuild: Scans the backup directory for entries; used once when
+                the catalog doesn't exist yet (backups made before it did)
+        """
+        self.path = Path(path)
+        self.rebuild = rebuild
+        self._lock = _lock_for(self.path)
+
+    def _load(self) -> dict[str, dict]:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if data.get("version") == CATALOG_VERSION:
+                return data["backups"]
+        except (FileNotFoundError, ValueError):
+            pass
+
+        backups = {entry["name"]: entry for entry in self.rebuild()}
+        self._save(backups)
+        return backups
+
+    def _save(self, backups: dict[str, dict]):
+        """Replace the catalog atomically, so readers never see half of it."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # A unique temporary name, so even another process saving at the
+        # same time can't write into or rename this one's file
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.path.parent, prefix=f"{self.path.name}.", suffix=".tmp", delete=False
+        ) as f:
+            try:
+                json.dump({"version": CATALOG_VERSION, "backups": backups}, f, indent=1)
+            except BaseException:
+                f.close()
+                os.unlink(f.name)
+                raise
+        os.replace(f.name, self.path)
+
+    def entries(self) -> list[dict]:
+        """All backups, newest first."""
+        with self._lock:
+            backups = self._load()
+        return sorted(backups.values(), key=lambda e: (e["created"], e["name"]), reverse=True)
+
+    def get(self, name: str) -> Optional[dict]:
+        """The entry for a backup name, if cataloged."""
+        with self._lock:
+            return self._load().get(name)
+
+    def add(self, entry: dict):
+        """Record a finished backup."""
+        with self._lock:
+            backups = self._load()
+            backups[entry["name"]] = entry
+            self._save(backups)
+
+    def remove(self, name: str) -> bool:
+        """Forget a deleted backup; False if it wasn't cataloged."""
+        with self._lock:
+            backups = self._load()
+            if backups.pop(name, None) is None:
+                return False
+            self._save(backups)
+            return True
@@ -0,0 +1,95 @@
+"""Per-entry compression codecs for backup archives."""
+
+import gzip
+from pathlib import PurePosixPath
+from typing import BinaryIO
+import zstandard
+
+CODECS = ("zstd", "gzip", "none")
+
+# Name suffix added to compressed archive members
+CODEC_SUFFIXES = {"zstd": ".zst", "gzip": ".gz", "none": ""}
+
+# Pax header recording how a member was compressed, so a restore can tell
+# our .zst/.gz members apart from site files that happen to use the suffix
+CODEC_PAX_KEY = "PSMCP.codec"
+
+# Formats that are already compressed; recompressing them burns CPU for
+# little or no gain, so they are always stored as-is
+STORED_EXTENSIONS = frozenset({
+    ".jpg", ".jpeg", ".png", ".gif", ".webp", ".avif", ".heic",
+    ".mp3", ".m4a", ".ogg", ".mp4", ".m4v", ".mov", ".webm",
+    ".zip", ".gz", ".tgz", ".bz2", ".xz", ".zst", ".7z", ".rar",
+    ".woff", ".woff2", ".pdf",
+})
+
+# Files at least this large are compressed with zstd's worker threads
+ZSTD_THREADED_MIN_SIZE = 4 * 1024 * 1024
+
+
+def choose_codec(relative_path: str, default: str) -> str:
+    """Pick the codec for one file: `default`, or none for compressed formats."""
+    if PurePosixPath(relative_path).suffix.lower() in STORED_EXTENSIONS:
+        return "none"
+    return default
+
+
+def compressing_writer(
+    codec: str,
+    fileobj: BinaryIO,
+    level: int = 3,
+    size_hint: int = 0,
+) -> BinaryIO:
+    """
+    Wrap fileobj so that writes are compressed with codec.
+
+    Closing the returned writer flushes the compressed stream but leaves
+    fileobj open.
+
+    Args:
+        codec: "zstd" or "gzip"
+        fileobj: Binary file to write compressed bytes to
+        level: Compression level
+        size_hint: Uncompressed size, if known (enables threaded zstd)
+    """
+    if codec == "zstd":
+        threads = -1 if size_hint >= ZSTD_THREADED_MIN_SIZE else 0
+        compressor = zstandard.ZstdCompressor(level=level, threads=threads)
+        # No content size in the frame: a live file may change while it's read
+        return compressor.stream_writer(fileobj, closefd=False)
+    if codec == "gzip":
+        return gzip.GzipFile(fileobj=fileobj, mode="wb", compresslevel=level)
+    raise ValueError(f"Unknown compression codec: {codec}")
+
+
+def decompressing_reader(codec: str, fileobj: BinaryIO) -> BinaryIO:
+    """Wrap fileobj so that reads return decompressed bytes."""
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().stream_reader(fileobj, closefd=False)
+    if codec == "gzip":
+        return gzip.GzipFile(fileobj=fileobj, mode="rb")
+    if codec == "none":
+        return fileobj
+    raise ValueError(f"Unknown compression codec: {codec}")
+
+
+def compress_bytes(codec: str, data: bytes, level: int = 3) -> bytes:
+    """Compress a whole buffer with codec."""
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    if codec == "gzip":
+        return gzip.compress(data, compresslevel=level)
+    if codec == "none":
+        return data
+    raise ValueError(f"Unknown compression codec: {codec}")
+
+
+def decompress_bytes(codec: str, data: bytes) -> bytes:
+    """Decompress a buffer produced by compress_bytes()."""
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "gzip":
+        return gzip.decompress(data)
+    if codec == "none":
+        return data
+    raise ValueError(f"Unknown compression codec: {codec}")
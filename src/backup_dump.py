@@ -0,0 +1,157 @@
+"""Split a multi-table mysqldump stream into one dump per table."""
+
+import gzip
+import re
+import tempfile
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Optional
+
+# mysqldump opens every section with a comment naming its table or view:
+#   -- Table structure for table `wp_posts`
+#   -- Dumping data for table `wp_posts`
+#   -- Temporary view structure for view `v` / -- Final view structure for view `v`
+SECTION_MARKER = re.compile(rb"^-- [^`\n]*\b(?:table|view) `((?:[^`]|``)+)`\s*$")
+
+
+class _Section:
+    """One table's gzipped dump, spooled until it is complete."""
+
+    def __init__(self, header: bytes, spool_size: int, spool_dir: Optional[Path]):
+        self.spool = tempfile.SpooledTemporaryFile(max_size=spool_size, dir=spool_dir)
+        self.writer = gzip.GzipFile(fileobj=self.spool, mode="wb", compresslevel=6, mtime=0)
+        self.writer.write(header)
+
+
+class DumpSplitter:
+    """
+    Writable sink for a gzipped mysqldump of several tables.
+
+    The stream is decompressed and cut at the section comments mysqldump
+    writes, and each table's part is gzipped again and handed to
+    emit(table, fileobj, size) as soon as the dump moves on to the next
+    table. The text before the first section (the SET statements every
+    dump starts with) is repeated at the top of every part, so each one
+    imports on its own. Views are written in two places by mysqldump
+    (a placeholder, then the real view at the end), so tables named in
+    `hold` are only emitted by close().
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[str, BinaryIO, int], None],
+        spool_size: int,
+        spool_dir: Optional[Path] = None,
+        hold: Iterable[str] = (),
+        on_first_section: Optional[Callable[[], None]] = None,
+    ):
+        """
+        Initialize the splitter.
+
+        Args:
+            emit: Receives each finished table dump (gzipped) and its size
+            spool_size: Bytes of a table dump kept in memory before spilling to disk
+            spool_dir: Where spilled table dumps go
+            hold: Tables (views) whose sections may come back later
+            on_first_section: Called once, when the first table section starts
+                (mysqldump has opened its transaction by then)
+        """
+        self.emit = emit
+        self.spool_size = spool_size
+        self.spool_dir = spool_dir
+        self.hold = set(hold)
+        self.on_first_section = on_first_section
+        self.emitted: list[str] = []
+        self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        self._header = bytearray()
+        self._sections: dict[str, _Section] = {}
+        self._current: Optional[str] = None
+        self._pending = b""
+        self._mid_line = False
+        self._written = 0
+
+    def write(self, data: bytes) -> int:
+        self._written += len(data)
+        self._feed(self._decompressor.decompress(data))
+        return len(data)
+
+    def tell(self) -> int:
+        """Bytes of the gzipped stream written so far."""
+        return self._written
+
+    def flush(self):
+        pass
+
+    def _feed(self, data: bytes):
+        pos = 0
+        while pos < len(data):
+            newline = data.find(b"\n", pos)
+            end = len(data) if newline < 0 else newline + 1
+            if self._mid_line:
+                # Rest of a line already known not to be a section comment
+                self._out(data[pos:end])
+                self._mid_line = newline < 0
+            elif newline < 0:
+                self._pending += data[pos:]
+                if not b"--".startswith(self._pending[:2]):
+                    # INSERT lines run to megabytes; don't hold them back
+                    self._out(self._pending)
+                    self._pending = b""
+                    self._mid_line = True
+            else:
+                line = self._pending + data[pos:end]
+                self._pending = b""
+                self._line(line)
+            pos = end
+
+    def _line(self, line: bytes):
+        if line.startswith(b"-- "):
+            match = SECTION_MARKER.match(line)
+            if match:
+                self._switch(match.group(1).replace(b"``", b"`").decode("utf-8"))
+        self._out(line)
+
+    def _out(self, data: bytes):
+        if self._current is None:
+            self._header += data
+        else:
+            self._sections[self._current].writer.write(data)
+
+    def _switch(self, table: str):
+        if table == self._current:
+            return
+        if self._current is None and self.on_first_section is not None:
+            self.on_first_section()
+        elif self._current is not None and self._current not in self.hold:
+            self._finish(self._current)
+        if table not in self._sections:
+            self._sections[table] = _Section(bytes(self._header), self.spool_size, self.spool_dir)
+        self._current = table
+
+    def _finish(self, table: str):
+        section = self._sections.pop(table)
+        try:
+            section.writer.close()
+            size = section.spool.tell()
+            section.spool.seek(0)
+            self.emit(table, section.spool, size)
+            self.emitted.append(table)
+        finally:
+            section.spool.close()
+
+    def close(self):
+        """Emit the tables still open; raises if the stream was cut short."""
+        if not self._decompressor.eof:
+            raise ValueError("Database dump stream ended early")
+        if self._pending:
+            self._line(self._pending)
+            self._pending = b""
+        for table in list(self._sections):
+            self._finish(table)
+        self._current = None
+
+    def discard(self):
+        """Drop unfinished tables (after a failed dump)."""
+        for section in self._sections.values():
+            section.spool.close()
+        self._sections.clear()
@@ -0,0 +1,73 @@
+"""Rules for leaving files out of wp-content backups."""
+
+import re
+from fnmatch import fnmatchcase
+from typing import Iterable, Optional
+
+
+class BackupFilter:
+    """
+    Decide which wp-content paths a backup skips.
+
+    Paths are relative to wp-content and use `/`. Globs match the whole
+    path (`*` also matches `/`, so `*/node_modules` matches at any depth);
+    the regex is searched in it, with directories given a trailing `/`.
+    Directories are checked while the tree is walked, so an excluded
+    subtree is never listed.
+
+    Thumbnails are only skipped by exact path, from the `sizes` in each
+    attachment's metadata: an original upload that merely looks like a
+    resized copy (banner-1920x1080.jpg) is never left out.
+    """
+
+    def __init__(
+        self,
+        exclude: Iterable[str] = (),
+        exclude_regex: Optional[str] = None,
+        max_file_size: int = 0,
+        thumbnails: Iterable[str] = (),
+    ):
+        """
+        Initialize the filter.
+
+        Args:
+            exclude: Glob patterns of files and directories to skip
+            exclude_regex: Regular expression of paths to skip
+            max_file_size: Skip files larger than this many bytes (0: no limit)
+            thumbnails: Generated image sizes to skip (wp-content relative
+                paths; `wp media regenerate` recreates them)
+        """
+        self.exclude = tuple(pattern.strip("/") for pattern in exclude if pattern.strip("/"))
+        self.exclude_regex = re.compile(exclude_regex) if exclude_regex else None
+        self.max_file_size = max_file_size
+        self.thumbnails = frozenset(thumbnails)
+
+    def _matches(self, path: str) -> bool:
+        if any(fnmatchcase(path.rstrip("/"), pattern) for pattern in self.exclude):
+            return True
+        return self.exclude_regex is not None and self.exclude_regex.search(path) is not None
+
+    def excludes_directory(self, relative_path: str) -> bool:
+        """Whether to skip a directory and everything below it."""
+        return bool(relative_path) and self._matches(f"{relative_path}/")
+
+    def excludes_file(self, relative_path: str, size: int) -> bool:
+        """Whether to skip a file."""
+        if self.max_file_size and size > self.max_file_size:
+            return True
+        if relative_path in self.thumbnails:
+            return True
+        return self._matches(relative_path)
+
+    def tar_arguments(self, root_name: str) -> list[str]:
+        """
+        GNU tar options applying the globs on the server.
+
+        Only globs translate to tar; the other rules are applied as the
+        stream is unpacked.
+        """
+        if not self.exclude:
+            return []
+        return ["--anchored", "--wildcards"] + [
+            f"--exclude={root_name}/{pattern}" for pattern in self.exclude
+        ]
@@ -0,0 +1,170 @@
+"""Checkpoint journal that lets an interrupted backup resume."""
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+# Partial files are checkpointed every this many bytes
+CHECKPOINT_BYTES = 64 * 1024 * 1024
+
+
+class BackupJournal:
+    """
+    Append-only log of the progress of one backup.
+
+    Each line is a JSON record:
+
+        {"t": "start", "meta": {...}}                   backup name and options
+        {"t": "done", "key": ..., "entry": {...}}       a file is complete
+        {"t": "part", "key": ..., "size", "mtime",
+         "offset": n, "state": {...}}                   a file is complete up to n
+
+    "done" records may also carry the archive offset after the member, for
+    sinks that append to a tar. Records are flushed as they are written (so
+    they survive the process losing its connection or being killed) and
+    written only after the data they describe has been flushed.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Load the journal at path, if it exists.
+
+        Args:
+            path: Journal file
+        """
+        self.path = Path(path)
+        self.meta: dict = {}
+        self.completed: dict[str, dict] = {}
+        self.partial: dict[str, dict] = {}
+        self.offset = 0
+        self.resumed = False
+        self._lock = threading.Lock()
+        self._file = None
+
+        if self.path.exists():
+            self._load()
+
+    def _load(self):
+        """Replay records; a torn final line from a crash is ignored."""
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+
+                key = record.get("key")
+                if record["t"] == "start":
+                    self.meta = record["meta"]
+                elif record["t"] == "done":
+                    self.completed[key] = record["entry"]
+                    self.partial.pop(key, None)
+                    if "offset" in record:
+                        self.offset = max(self.offset, record["offset"])
+                elif record["t"] == "part":
+                    self.partial[key] = record
+
+    @property
+    def age(self) -> float:
+        """Seconds since the backup was started."""
+        return time.time() - self.meta.get("started", 0)
+
+    def open(self, meta: Optional[dict] = None):
+        """
+        Open for writing: a new journal if meta is given, else append.
+
+        Args:
+            meta: Backup name and options for a new journal
+        """
+        if meta is not None:
+            self.meta = {**meta, "started": time.time()}
+            self._file = open(self.path, "w")
+            self._write({"t": "start", "meta": self.meta})
+            return
+
+        self.resumed = True
+        self._file = open(self.path, "a+")
+        self._file.seek(0, 2)
+        if self._file.tell():
+            # Make sure a torn final line can't swallow the next record
+            self._file.seek(self._file.tell() - 1)
+            if self._file.read(1) != "\n":
+                self._file.write("\n")
+
+    def _write(self, record: dict):
+        with self._lock:
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+
+    def done(self, key: str, entry: dict, offset: Optional[int] = None):
+        """Record a finished file (and the archive offset after it)."""
+        record = {"t": "done", "key": key, "entry": entry}
+        if offset is not None:
+            record["offset"] = offset
+        self._write(record)
+
+    def checkpoint(
+        self,
+        key: str,
+        size: int,
+        mtime: Optional[int],
+        offset: int,
+        state: Optional[dict] = None,
+    ):
+        """Record that a file is complete up to offset."""
+        self._write({
+            "t": "part",
+            "key": key,
+            "size": size,
+            "mtime": mtime,
+            "offset": offset,
+            "state": state or {},
+        })
+
+    def get_completed(
+        self,
+        key: str,
+        size: Optional[int] = None,
+        mtime: Optional[int] = None,
+    ) -> Optional[dict]:
+        """The finished entry for key, if it still matches size and mtime."""
+        entry = self.completed.get(key)
+        if entry is None:
+            return None
+        if size is not None and entry.get("size") != size:
+            return None
+        if mtime is not None and entry.get("mtime") != mtime:
+            return None
+        return entry
+
+    def get_partial(self, key: str, size: int, mtime: int) -> Optional[dict]:
+        """The last checkpoint for key, if the file hasn't changed since."""
+        record = self.partial.get(key)
+        if record is None or record["size"] != size or record["mtime"] != mtime:
+            return None
+        return record
+
+    def forget_progress(self):
+        """Drop all finished and partial records (their data is gone)."""
+        self.completed.clear()
+        self.partial.clear()
+        self.offset = 0
+
+        if self._file is not None:
+            with self._lock:
+                self._file.seek(0)
+                self._file.truncate()
+            self._write({"t": "start", "meta": self.meta})
+
+    def close(self):
+        """Close the journal, keeping it for a later resume."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        """Close and delete the journal once the backup is complete."""
+        self.close()
+        self.path.unlink(missing_ok=True)
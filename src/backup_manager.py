@@ -1,12 +1,98 @@
 """WordPress Backup Manager for MCP Server."""
 
+import contextlib
+import gzip
+import hashlib
+import io
+import json
 import os
+import re
+import shlex
+import shutil
 import tarfile
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Callable, Iterator, Optional
 import paramiko
+from .backup_catalog import BackupCatalog
+from .backup_dump import DumpSplitter
+from .backup_filters import BackupFilter
+from .backup_journal import BackupJournal
+from .backup_retention import RetentionPolicy, disk_bytes, plan_retention
+from .backup_restore import (
+    DATABASE_RESTORE_MANIFEST,
+    BackupContents,
+    extract_legacy_archive,
+    read_archive,
+    read_directory,
+    read_store_snapshot,
+    select_paths,
+)
+from .backup_store import BackupStore, StoreSink
 from .config import WordPressConfig
+from .sftp_transfer import (
+    DirectorySink,
+    LocalFile,
+    ParallelSFTPDownloader,
+    ParallelSFTPUploader,
+    TarSink,
+)
+from .ssh_pool import get_ssh_pool
+from .tar_stream import RemoteTarStreamer
+from .tool_executor import check_cancelled, in_current_context
+
+# Written into every incremental snapshot directory; marks it as complete
+MANIFEST_NAME = "manifest.json"
+
+# Content-addressed store directory inside the backup directory
+STORE_DIR = "store"
+
+# Index of all backups inside the backup directory
+CATALOG_NAME = "catalog.json"
+
+# Checkpoint journal of a backup in progress: <backup name>.journal
+JOURNAL_SUFFIX = ".journal"
+
+# Full backups are .tar (per-file compression); older ones are .tar.gz
+ARCHIVE_SUFFIXES = (".tar", ".tar.gz")
+
+# Database dumps are streamed to disk in chunks of this size
+DB_CHUNK_SIZE = 1024 * 1024
+
+# Compressed dumps up to this size are spooled in memory before being added
+# to an archive (tar needs the size up front); larger ones spill to disk
+DB_SPOOL_SIZE = 64 * 1024 * 1024
+
+# Per-table dumps go under this directory, next to a restore manifest
+# (backup_restore.DATABASE_RESTORE_MANIFEST)
+DB_TABLES_DIR = "database"
+
+# How long the global read lock for a parallel dump may wait on running
+# statements before the backup gives up (writes queue behind it meanwhile)
+DB_LOCK_WAIT_TIMEOUT = 30
+DB_LOCKED_MARKER = "wp-mcp-read-locked"
+
+# Prints the wp-content relative path of every generated image size listed
+# in attachment metadata, one per line
+LIST_THUMBNAILS_PHP = """
+$uploads = wp_get_upload_dir()['basedir'];
+$content = rtrim(WP_CONTENT_DIR, '/') . '/';
+if (strpos($uploads . '/', $content) !== 0) return;
+$root = substr($uploads, strlen($content));
+$ids = get_posts(['post_type' => 'attachment', 'post_status' => 'any', 'numberposts' => -1, 'fields' => 'ids']);
+foreach ($ids as $id) {
+    $meta = wp_get_attachment_metadata($id);
+    if (empty($meta['file']) || empty($meta['sizes'])) continue;
+    $dir = dirname($meta['file']);
+    foreach ($meta['sizes'] as $size) {
+        if (!empty($size['file'])) echo $root . '/' . ($dir === '.' ? '' : $dir . '/') . $size['file'], "\n";
+    }
+}
+"""
 
 
 class BackupError(Exception):
@@ -14,216 +100,1225 @@ class BackupError(Exception):
     pass
 
 
+def format_size(size_bytes: float) -> str:
+    """Format a byte count as a human-readable size."""
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size_bytes < 1024.0:
+            return f"{size_bytes:.1f} {unit}"
+        size_bytes /= 1024.0
+    return f"{size_bytes:.1f} TB"
+
+
 class BackupManager:
     """Manages WordPress site backups via SSH."""
 
-    def __init__(self, config: WordPressConfig, local_backup_dir: str = "./backups"):
+    def __init__(
+        self,
+        config: WordPressConfig,
+        local_backup_dir: str = "./backups",
+        progress: Optional[Callable[[dict], None]] = None,
+    ):
+        """
+        Initialize the backup manager.
+
+        Args:
+            config: WordPress configuration
+            local_backup_dir: Where backups are stored
+            progress: Called periodically with file transfer stats
+        """
         self.config = config
         self.local_backup_dir = Path(local_backup_dir)
+        self.progress = progress
+        self.pool = get_ssh_pool(config)
         self.ssh_client: Optional[paramiko.SSHClient] = None
+        self._connect_lock = threading.Lock()
+        self._backup_catalog: Optional[BackupCatalog] = None
 
     def connect(self):
-        """Establish SSH connection."""
-        if self.ssh_client is not None:
-            return
-
-        self.ssh_client = paramiko.SSHClient()
-        self.ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-
-        connect_kwargs = {
-            "hostname": self.config.ssh_host,
-            "username": self.config.ssh_user,
-            "port": self.config.ssh_port,
-        }
-
-        if self.config.ssh_key_path:
-            connect_kwargs["key_filename"] = self.config.ssh_key_path
-        elif self.config.ssh_password:
-            connect_kwargs["password"] = self.config.ssh_password
-            connect_kwargs["look_for_keys"] = False
-            connect_kwargs["allow_agent"] = False
-
-        self.ssh_client.connect(**connect_kwargs)
+        """Lease a warm SSH connection from the shared pool."""
+        with self._connect_lock:
+            if self.ssh_client is None:
+                self.ssh_client = self.pool.acquire()
 
     def disconnect(self):
-        """Close SSH connection."""
-        if self.ssh_client:
-            self.ssh_client.close()
-            self.ssh_client = None
+        """Return the SSH connection to the pool (it stays open for reuse)."""
+        with self._connect_lock:
+            if self.ssh_client:
+                self.pool.release(self.ssh_client)
+                self.ssh_client = None
 
-    def create_backup(self, include_files: bool = True, include_database: bool = True) -> dict:
+    def create_backup(
+        self,
+        include_files: bool = True,
+        include_database: bool = True,
+        incremental: bool = False,
+        transfer: Optional[str] = None,
+        store: Optional[bool] = None,
+    ) -> dict:
         """
         Create a complete WordPress backup.
 
+        Progress is journaled as the backup runs. If an earlier backup with
+        the same options failed less than backup_resume_hours ago, this call
+        resumes it instead of starting over: finished files are skipped and
+        large partial files continue from their last checkpoint.
+
+        When a retention policy is configured, backups it no longer keeps
+        are pruned once this one is complete.
+
         Args:
             include_files: Include wp-content directory
             include_database: Include database dump
+            incremental: Keep the backup as a snapshot directory and only
+                download files that changed since the previous snapshot
+                (unchanged files are hardlinked from it)
+            transfer: "sftp" (parallel per-file) or "tar" (one remote tar
+                stream) for wp-content in full backups; defaults to config.
+                Incremental snapshots always use SFTP.
+            store: Save into the deduplicating content-addressed store
+                instead of a standalone archive (defaults to config)
 
         Returns:
             dict with backup information
         """
         self.connect()
+        try:
+            self.local_backup_dir.mkdir(parents=True, exist_ok=True)
+
+            if store is None:
+                store = self.config.backup_store
+            transfer = transfer or self.config.backup_transfer
+
+            if store:
+                latest = self._store().latest_snapshot()
+                options = {"mode": "store", "transfer": transfer, "parent": latest and latest["name"]}
+            elif incremental:
+                options = {"mode": "snapshot", "transfer": "sftp", "parent": self._latest_snapshot()}
+            else:
+                options = {"mode": "archive", "transfer": transfer}
+            options.update(include_files=include_files, include_database=include_database)
+
+            journal = self._open_journal(options)
+            backup_name = journal.meta["name"]
+
+            results = {
+                "timestamp": journal.meta["timestamp"],
+                "backup_name": backup_name,
+                "backup_path": str(self.local_backup_dir / backup_name),
+                "files_backed_up": False,
+                "database_backed_up": False,
+                "archive_created": False,
+                "total_size": "0 MB",
+                "resumed": journal.resumed,
+            }
+
+            try:
+                if store:
+                    self._create_store_snapshot(
+                        backup_name,
+                        include_files,
+                        include_database,
+                        transfer,
+                        journal,
+                        results,
+                    )
+                elif incremental:
+                    self._create_snapshot(backup_name, include_files, include_database, journal, results)
+                else:
+                    self._create_archive(
+                        backup_name,
+                        include_files,
+                        include_database,
+                        transfer,
+                        journal,
+                        results,
+                    )
+                self._catalog().add(self._catalog_entry(journal.meta, results))
+                journal.remove()
+            except Exception as e:
+                # Keep the journal and partial data so a retry can resume
+                journal.close()
+                raise BackupError(f"Backup failed: {str(e)}")
+        finally:
+            self.disconnect()
 
-        # Create backup directory
-        self.local_backup_dir.mkdir(parents=True, exist_ok=True)
+        policy = self._retention_policy()
+        if policy.enabled:
+            # The backup is safe already; a failed prune is only reported
+            try:
+                results["pruned"] = self.prune(policy, dry_run=False)["deleted"]
+            except Exception as e:
+                results["prune_error"] = str(e)
+        return results
+
+    def _open_journal(self, options: dict) -> BackupJournal:
+        """
+        Resume the newest interrupted backup with these options, or start one.
+
+        Other interrupted backups (different options, or older than
+        backup_resume_hours) are discarded along with their partial data.
+        """
+        max_age = self.config.backup_resume_hours * 3600
+        resume = None
+
+        for path in sorted(self.local_backup_dir.glob(f"*{JOURNAL_SUFFIX}"), reverse=True):
+            journal = BackupJournal(path)
+            matches = journal.meta and all(journal.meta.get(k) == v for k, v in options.items())
+            if resume is None and matches and journal.age < max_age:
+                resume = journal
+            else:
+                self._discard_unfinished(journal)
+
+        if resume is not None:
+            resume.open()
+            return resume
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         backup_name = f"sst_nyc_{timestamp}"
-        backup_path = self.local_backup_dir / backup_name
-        backup_path.mkdir(exist_ok=True)
+        journal = BackupJournal(self.local_backup_dir / f"{backup_name}{JOURNAL_SUFFIX}")
+        journal.open({**options, "name": backup_name, "timestamp": timestamp})
+        return journal
 
-        results = {
-            "timestamp": timestamp,
-            "backup_name": backup_name,
-            "backup_path": str(backup_path),
-            "files_backed_up": False,
-            "database_backed_up": False,
-            "archive_created": False,
-            "total_size": "0 MB",
-        }
+    def _discard_unfinished(self, journal: BackupJournal):
+        """Delete an interrupted backup's journal and partial data."""
+        name = journal.meta.get("name")
+        mode = journal.meta.get("mode")
+
+        if name and mode == "archive":
+            (self.local_backup_dir / f"{name}.tar.partial").unlink(missing_ok=True)
+        elif name and mode == "snapshot":
+            snapshot_dir = self.local_backup_dir / name
+            if not (snapshot_dir / MANIFEST_NAME).exists():
+                self._cleanup_directory(snapshot_dir)
+        # Store chunks are left to the store's garbage collection
+
+        journal.remove()
+
+    def _create_archive(
+        self,
+        backup_name: str,
+        include_files: bool,
+        include_database: bool,
+        transfer: str,
+        journal: BackupJournal,
+        results: dict,
+    ):
+        """
+        Stream a full backup straight into a tar archive.
+
+        Remote data goes into the archive as it arrives, so nothing is staged
+        on disk and peak usage is the archive itself (plus the compressed
+        database dump, which is spooled because tar needs its size up front).
+        The tar container is uncompressed; files are compressed individually
+        with the configured codec (see backup_codecs). The archive is written
+        under a .partial name and renamed when done; an interrupted one is
+        cut back to its last journaled member and appended to.
+        """
+        archive_path = self.local_backup_dir / f"{backup_name}.tar"
+        partial_path = archive_path.with_name(f"{archive_path.name}.partial")
+        tar = self._open_partial_archive(partial_path, journal)
+
+        with tar:
+            root = TarSink(tar, backup_name, journal=journal)
 
-        try:
             # 1. Backup Database
             if include_database:
-                db_file = backup_path / "database.sql"
-                self._backup_database(db_file)
-                results["database_backed_up"] = True
-                results["database_size"] = self._get_file_size(db_file)
+                def archived(name: str) -> Optional[int]:
+                    entry = journal.get_completed(f"{backup_name}/{name}")
+                    return entry and entry["size"]
+
+                self._dump_database(root.add_fileobj, archived, results)
 
             # 2. Backup wp-content
             if include_files:
-                wp_content_dir = backup_path / "wp-content"
-                self._backup_files(wp_content_dir)
+                sink = TarSink(
+                    tar,
+                    f"{backup_name}/wp-content",
+                    codec=self.config.backup_compression,
+                    level=self.config.backup_compression_level,
+                    spool_dir=self.local_backup_dir,
+                    journal=journal,
+                )
+                if transfer == "tar":
+                    transfer_stats = self._stream_files(sink)
+                else:
+                    transfer_stats, _ = self._backup_files(sink)
                 results["files_backed_up"] = True
-                results["files_size"] = self._get_dir_size(wp_content_dir)
+                results["transfer"] = transfer_stats
+                results["transfer_mode"] = transfer
+                results["files_size"] = format_size(transfer_stats["bytes"])
 
             # 3. Backup wp-config.php
-            if include_files:
-                wp_config_file = backup_path / "wp-config.php"
-                self._backup_wp_config(wp_config_file)
+            if include_files and journal.get_completed(f"{backup_name}/wp-config.php") is None:
+                wp_config = self._read_wp_config()
+                if wp_config is not None:
+                    root.add_fileobj("wp-config.php", io.BytesIO(wp_config), len(wp_config))
 
-            # 4. Create compressed archive
-            archive_path = self.local_backup_dir / f"{backup_name}.tar.gz"
-            self._create_archive(backup_path, archive_path)
-            results["archive_created"] = True
-            results["archive_path"] = str(archive_path)
-            results["total_size"] = self._get_file_size(archive_path)
+        os.replace(partial_path, archive_path)
 
-            # Clean up uncompressed files
-            self._cleanup_directory(backup_path)
+        results["archive_created"] = True
+        results["archive_path"] = str(archive_path)
+        results["total_size"] = self._get_file_size(archive_path)
+        results["total_bytes"] = archive_path.stat().st_size
+        results["sha256"] = self._sha256_file(archive_path)
+        if include_files:
+            results["file_count"] = transfer_stats["files"] + transfer_stats["resumed"]
 
-            return results
+    def _open_partial_archive(self, partial_path: Path, journal: BackupJournal) -> tarfile.TarFile:
+        """Open a new partial archive, or reopen an interrupted one for appending."""
+        offset = journal.offset
+        if offset and partial_path.exists() and partial_path.stat().st_size >= offset:
+            # Drop the member that was being written, then re-add the
+            # end-of-archive blocks that append mode expects to find
+            with open(partial_path, "r+b") as f:
+                f.truncate(offset)
+                f.seek(offset)
+                f.write(tarfile.NUL * tarfile.BLOCKSIZE * 2)
+            return tarfile.open(partial_path, "a", format=tarfile.PAX_FORMAT)
 
-        except Exception as e:
-            raise BackupError(f"Backup failed: {str(e)}")
-        finally:
-            self.disconnect()
+        journal.forget_progress()
+        return tarfile.open(partial_path, "w", format=tarfile.PAX_FORMAT)
+
+    def _create_store_snapshot(
+        self,
+        backup_name: str,
+        include_files: bool,
+        include_database: bool,
+        transfer: str,
+        journal: BackupJournal,
+        results: dict,
+    ):
+        """
+        Save a snapshot into the content-addressed store.
+
+        Only chunks the store doesn't already hold are written. With SFTP
+        transfer, files unchanged since the previous snapshot are not even
+        downloaded.
+        """
+        store = self._store()
+        parent = journal.meta["parent"]
+        previous = store.read_snapshot(parent) if parent else None
+        sink = StoreSink(store, previous["files"] if previous else None, journal)
+
+        # 1. Backup Database
+        if include_database:
+            def stored(name: str) -> Optional[int]:
+                entry = sink.resume_root_file(name)
+                return entry and entry["size"]
 
-    def _backup_database(self, local_path: Path):
-        """Backup WordPress database."""
-        command = f"cd {self.config.remote_path} && wp db export - --allow-root"
+            self._dump_database(
+                lambda name, fileobj, size: sink.add_root_file(name, fileobj),
+                stored,
+                results,
+            )
+
+        # 2. Backup wp-content
+        if include_files:
+            if transfer == "tar":
+                transfer_stats = self._stream_files(sink)
+            else:
+                transfer_stats, _ = self._backup_files(sink, previous["files"] if previous else None)
+            results["files_backed_up"] = True
+            results["transfer"] = transfer_stats
+            results["transfer_mode"] = transfer
+            results["files_size"] = format_size(
+                transfer_stats["bytes"] + transfer_stats["unchanged_bytes"]
+            )
+
+        # 3. Backup wp-config.php
+        if include_files:
+            wp_config = self._read_wp_config()
+            if wp_config is not None:
+                sink.add_root_file("wp-config.php", io.BytesIO(wp_config))
+
+        # 4. Write the manifest last; until then the snapshot doesn't exist
+        manifest = sink.snapshot_manifest(
+            backup_name,
+            parent=parent,
+            include_database=include_database,
+            include_files=include_files,
+        )
+        store.write_snapshot(manifest)
+        snapshot_path = store.snapshots_dir / f"{backup_name}.json"
+
+        results["store"] = True
+        results["backup_path"] = str(snapshot_path)
+        results["parent"] = manifest["parent"]
+        results["new_size"] = format_size(manifest["new_bytes"])
+        results["new_bytes"] = manifest["new_bytes"]
+        results["total_size"] = format_size(manifest["total_bytes"])
+        results["total_bytes"] = manifest["total_bytes"]
+        results["file_count"] = len(manifest["files"])
+        results["sha256"] = self._sha256_file(snapshot_path)
+
+    def _store(self) -> BackupStore:
+        """Open the content-addressed store."""
+        return BackupStore(
+            self.local_backup_dir / STORE_DIR,
+            codec=self.config.backup_compression,
+            level=self.config.backup_compression_level,
+        )
+
+    def _create_snapshot(
+        self,
+        backup_name: str,
+        include_files: bool,
+        include_database: bool,
+        journal: BackupJournal,
+        results: dict,
+    ):
+        """
+        Create an incremental snapshot directory.
+
+        Only files changed since the previous snapshot are downloaded;
+        unchanged ones are hardlinked from it.
+        """
+        backup_path = self.local_backup_dir / backup_name
+        backup_path.mkdir(exist_ok=True)
+
+        # 1. Backup Database
+        if include_database:
+            def write(name: str, fileobj: BinaryIO, size: int):
+                path = backup_path / name
+                path.parent.mkdir(exist_ok=True)
+                with open(path, 'wb') as f:
+                    shutil.copyfileobj(fileobj, f)
+                journal.done(f"@{name}", {"size": size})
+
+            def written(name: str) -> Optional[int]:
+                entry = journal.get_completed(f"@{name}")
+                return entry["size"] if entry and (backup_path / name).exists() else None
+
+            self._dump_database(write, written, results)
+
+        # 2. Backup wp-content
+        parent = journal.meta["parent"]
+        file_manifest = {}
+        if include_files:
+            wp_content_dir = backup_path / "wp-content"
+            reuse_root = self.local_backup_dir / parent / "wp-content" if parent else None
+            previous = self._read_manifest(self.local_backup_dir / parent)["files"] if parent else None
+            transfer, file_manifest = self._backup_files(
+                DirectorySink(wp_content_dir, reuse_root, journal), previous
+            )
+            results["files_backed_up"] = True
+            results["transfer"] = transfer
+            results["files_size"] = self._get_dir_size(wp_content_dir)
+
+        # 3. Backup wp-config.php
+        if include_files:
+            wp_config = self._read_wp_config()
+            if wp_config is not None:
+                (backup_path / "wp-config.php").write_bytes(wp_config)
+
+        # 4. Write the manifest last; it seeds the next run
+        total_bytes = sum(
+            f.stat().st_size for f in backup_path.rglob('*') if f.is_file()
+        )
+        self._write_manifest(backup_path, {
+            "name": backup_name,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "parent": parent,
+            "include_database": include_database,
+            "include_files": include_files,
+            "total_bytes": total_bytes,
+            "files": file_manifest,
+        })
+        results["incremental"] = True
+        results["parent"] = parent
+        results["total_size"] = format_size(total_bytes)
+        results["total_bytes"] = total_bytes
+        # Unchanged files are hardlinks into the parent and take no new space
+        results["new_bytes"] = total_bytes - (results["transfer"]["unchanged_bytes"] if include_files else 0)
+        results["file_count"] = len(file_manifest)
+        results["sha256"] = self._sha256_file(backup_path / MANIFEST_NAME)
+
+    def _dump_database(
+        self,
+        add: Callable[[str, BinaryIO, int], None],
+        done: Callable[[str], Optional[int]],
+        results: dict,
+    ):
+        """
+        Dump the database into a backup, one file or one file per table.
+
+        Each dump is spooled and handed to add(name, fileobj, size). Parts
+        for which done(name) returns a size were saved by an interrupted run
+        and are skipped.
+
+        A per-table dump (backup_db_workers > 1) is only consistent across
+        tables if every table is transactional, so databases with other
+        engines (MyISAM, Aria, MEMORY) get the single dump instead.
+        """
+        if self.config.backup_db_workers > 1:
+            tables = self._list_tables()
+            others = sorted(
+                table["name"] for table in tables
+                if table["engine"] is not None and table["engine"] != "InnoDB"
+            )
+            if not others:
+                results["database_transfer"], size = self._backup_database_tables(tables, add, done)
+                results["database_layout"] = "per-table"
+                results["database_backed_up"] = True
+                results["database_size"] = format_size(size)
+                return
+            results["database_parallel_skipped"] = f"Not InnoDB: {', '.join(others)}"
+
+        size = done("database.sql.gz")
+        if size is None:
+            with tempfile.SpooledTemporaryFile(
+                max_size=DB_SPOOL_SIZE, dir=self.local_backup_dir
+            ) as spool:
+                results["database_transfer"] = self._backup_database(spool)
+                size = spool.tell()
+                spool.seek(0)
+                add("database.sql.gz", spool, size)
+
+        results["database_backed_up"] = True
+        results["database_size"] = format_size(size)
+
+    def _list_tables(self) -> list[dict]:
+        """
+        Every table and view in the site's database, largest first.
+
+        All of them, not only those with the WordPress prefix: the single
+        dump includes the rest too. Views have engine None.
+        """
+        query = (
+            "SELECT TABLE_NAME, IFNULL(ENGINE, ''), IFNULL(DATA_LENGTH + INDEX_LENGTH, 0) "
+            "FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE()"
+        )
+        command = (
+            f"cd {self.config.remote_path} && wp db query {shlex.quote(query)} "
+            f"--skip-column-names --batch --allow-root"
+        )
         stdin, stdout, stderr = self.ssh_client.exec_command(command)
-        exit_code = stdout.channel.recv_exit_status()
+        output = stdout.read().decode('utf-8')
+        if stdout.channel.recv_exit_status() != 0:
+            raise BackupError(f"Listing database tables failed: {stderr.read().decode('utf-8')}")
+
+        tables = []
+        for row in output.splitlines():
+            if row:
+                name, engine, size = row.split("\t")
+                tables.append({"name": name, "engine": engine or None, "size": int(size)})
+        return sorted(tables, key=lambda table: table["size"], reverse=True)
 
+    @contextlib.contextmanager
+    def _global_read_lock(self) -> Iterator[None]:
+        """
+        Hold FLUSH TABLES WITH READ LOCK in a mysql session while the block runs.
+
+        Reads go on; writes wait until the lock is released, which also
+        happens if the session dies with its SSH channel.
+        """
+        command = f"cd {self.config.remote_path} && wp db cli --unbuffered --allow-root"
+        stdin, stdout, stderr = self.ssh_client.exec_command(command)
+        try:
+            stdin.write(
+                f"SET SESSION lock_wait_timeout = {DB_LOCK_WAIT_TIMEOUT};\n"
+                f"FLUSH TABLES WITH READ LOCK;\n"
+                f"SELECT '{DB_LOCKED_MARKER}';\n"
+            )
+            stdin.flush()
+            for line in stdout:
+                if DB_LOCKED_MARKER in line:
+                    break
+            else:
+                raise BackupError(
+                    f"Could not lock the database for a consistent dump: "
+                    f"{stderr.read().decode('utf-8')}"
+                )
+            yield
+        finally:
+            try:
+                stdin.write("UNLOCK TABLES;\n")
+                stdin.flush()
+            finally:
+                stdin.channel.shutdown_write()
+                stdout.channel.recv_exit_status()
+
+    def _backup_database_tables(
+        self,
+        tables: list[dict],
+        add: Callable[[str, BinaryIO, int], None],
+        done: Callable[[str], Optional[int]],
+    ) -> tuple[dict, int]:
+        """
+        Dump the tables in parallel from one consistent snapshot.
+
+        Tables are split into backup_db_workers groups of similar size, and
+        each group is dumped by one `wp db export --single-transaction` over
+        its own SSH connection. The snapshots line up: a global read lock is
+        held from before the first export starts until every export has
+        begun its transaction, so all of them see the same moment (writes
+        wait only for that short window). Each export's stream is split
+        into one file per table (see DumpSplitter); views are dumped after,
+        as they hold no data. A restore manifest listing the table files is
+        added last.
+
+        A resumed backup keeps the table files of the interrupted run only
+        if all of them were saved; otherwise every table is dumped again,
+        so no backup mixes snapshots.
+
+        Args:
+            tables: _list_tables() result (all transactional)
+
+        Returns:
+            Tuple of (transfer stats, total compressed size)
+        """
+        def file_name(table: str) -> str:
+            return f"{DB_TABLES_DIR}/{table}.sql.gz"
+
+        started = time.monotonic()
+        sizes = {table["name"]: done(file_name(table["name"])) for table in tables}
+        received = 0
+        lock_seconds = 0.0
+        workers = 0
+
+        if None in sizes.values():
+            base_tables = [table for table in tables if table["engine"] is not None]
+            views = [table["name"] for table in tables if table["engine"] is None]
+            # Largest first into the lightest group
+            workers = max(1, min(self.config.backup_db_workers, len(base_tables)))
+            groups: list[list[str]] = [[] for _ in range(workers)]
+            group_sizes = [0] * workers
+            for table in base_tables:
+                lightest = group_sizes.index(min(group_sizes))
+                groups[lightest].append(table["name"])
+                group_sizes[lightest] += table["size"]
+            groups = [group for group in groups if group]
+
+            spool_size = DB_SPOOL_SIZE // workers
+            lock = threading.Lock()
+
+            def emit(table: str, fileobj: BinaryIO, size: int):
+                add(file_name(table), fileobj, size)
+                with lock:
+                    sizes[table] = size
+
+            def dump(group: list[str], snapshot: Optional[threading.Event] = None, hold=()):
+                nonlocal received
+                splitter = DumpSplitter(
+                    emit,
+                    spool_size,
+                    self.local_backup_dir,
+                    hold=hold,
+                    on_first_section=snapshot and snapshot.set,
+                )
+                try:
+                    with self.pool.connection() as ssh_client:
+                        stats = self._backup_database(splitter, tables=group, ssh_client=ssh_client)
+                    splitter.close()
+                finally:
+                    if snapshot is not None:
+                        snapshot.set()
+                    splitter.discard()
+                missing = set(group) - set(splitter.emitted)
+                if missing:
+                    raise BackupError(f"Database dump is missing tables: {', '.join(sorted(missing))}")
+                with lock:
+                    received += stats["bytes_received"]
+
+            snapshots = [threading.Event() for _ in groups]
+            with ThreadPoolExecutor(len(groups) or 1, thread_name_prefix="db-dump") as executor:
+                futures = []
+                with self._global_read_lock():
+                    locked = time.monotonic()
+                    for group, snapshot in zip(groups, snapshots):
+                        futures.append(executor.submit(in_current_context(dump), group, snapshot))
+                    for snapshot in snapshots:
+                        while not snapshot.wait(1):
+                            check_cancelled()
+                    lock_seconds = time.monotonic() - locked
+                for future in futures:
+                    future.result()
+
+            if views:
+                dump(views, hold=views)
+
+        restore_manifest = json.dumps({
+            "layout": "per-table",
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "consistency": "coordinated --single-transaction snapshot",
+            "tables": [
+                {
+                    "table": table["name"],
+                    "file": file_name(table["name"]),
+                    "size": sizes[table["name"]],
+                    # Imported last, once the tables they select from exist
+                    **({"view": True} if table["engine"] is None else {}),
+                }
+                for table in tables
+            ],
+        }, indent=2).encode('utf-8')
+        add(DATABASE_RESTORE_MANIFEST, io.BytesIO(restore_manifest), len(restore_manifest))
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        stats = {
+            "tables": len(tables),
+            "workers": workers,
+            "bytes_received": received,
+            "read_lock_seconds": round(lock_seconds, 2),
+            "seconds": round(elapsed, 1),
+            "mb_per_second": round(received / elapsed / (1024 * 1024), 2),
+        }
+        return stats, sum(sizes.values())
+
+    def _backup_database(
+        self,
+        out: BinaryIO,
+        tables: Optional[list[str]] = None,
+        ssh_client: Optional[paramiko.SSHClient] = None,
+    ) -> dict:
+        """
+        Stream the gzipped database dump into a binary file object.
+
+        The dump is read in fixed-size chunks as the server produces it, so
+        memory stays bounded and the remote side never blocks on a full
+        channel window. With remote compression the server gzips the stream
+        and the compressed bytes are written through unchanged.
+
+        Args:
+            out: Binary file to write the gzipped dump to
+            tables: Dump only these tables (in one transaction)
+            ssh_client: Connection to run on (defaults to self.ssh_client)
+
+        Returns:
+            Transfer stats (bytes received/written, seconds, throughput)
+        """
+        export = f"cd {self.config.remote_path} && wp db export - --allow-root"
+        if tables is not None:
+            export += f" --tables={shlex.quote(','.join(tables))} --single-transaction"
+        remote_compression = self.config.backup_remote_compression
+        if remote_compression:
+            # pipefail so a failed export isn't masked by gzip's exit status;
+            # -n (no timestamp) keeps identical dumps byte-identical for the store
+            command = f"bash -o pipefail -c {shlex.quote(export + ' | gzip -n -c')}"
+        else:
+            command = export
+
+        stdin, stdout, stderr = (ssh_client or self.ssh_client).exec_command(command)
+        started = time.monotonic()
+        received = 0
+        start_offset = out.tell()
+
+        writer = out if remote_compression else gzip.GzipFile(fileobj=out, mode='wb', compresslevel=6, mtime=0)
+        while True:
+            chunk = stdout.read(DB_CHUNK_SIZE)
+            if not chunk:
+                break
+            writer.write(chunk)
+            received += len(chunk)
+            check_cancelled()
+        if writer is not out:
+            writer.close()
+
+        exit_code = stdout.channel.recv_exit_status()
         if exit_code != 0:
             error = stderr.read().decode('utf-8')
-            raise BackupError(f"Database backup failed: {error}")
+            target = f"tables {', '.join(tables)}" if tables else "database"
+            raise BackupError(f"Database backup failed ({target}): {error}")
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        return {
+            "bytes_received": received,
+            "bytes_written": out.tell() - start_offset,
+            "remote_compression": remote_compression,
+            "seconds": round(elapsed, 1),
+            "mb_per_second": round(received / elapsed / (1024 * 1024), 2),
+        }
 
-        # Write database dump to file
-        with open(local_path, 'wb') as f:
-            f.write(stdout.read())
+    def _backup_files(self, sink, previous: Optional[dict] = None) -> tuple[dict, dict]:
+        """
+        Backup wp-content directory with parallel SFTP workers.
 
-    def _backup_files(self, local_path: Path):
-        """Backup wp-content directory."""
-        local_path.mkdir(parents=True, exist_ok=True)
+        Args:
+            sink: DirectorySink, TarSink or StoreSink receiving the files
+            previous: File manifest of the last snapshot (marks unchanged files)
 
-        # Use SFTP to download wp-content recursively
-        sftp = self.ssh_client.open_sftp()
+        Returns:
+            Tuple of (transfer stats, file manifest)
+        """
+        downloader = ParallelSFTPDownloader(
+            self.pool,
+            workers=self.config.backup_workers,
+            progress=self.progress,
+            file_filter=self._backup_filter(),
+        )
         remote_wp_content = f"{self.config.remote_path}/wp-content"
+        stats = downloader.download(remote_wp_content, sink, previous)
+        return stats.as_dict(), downloader.manifest
 
-        try:
-            self._sftp_download_recursive(sftp, remote_wp_content, str(local_path))
-        finally:
-            sftp.close()
+    def _stream_files(self, sink) -> dict:
+        """
+        Backup wp-content as one tar stream produced on the server.
+
+        Returns:
+            Transfer stats
+        """
+        streamer = RemoteTarStreamer(
+            self.pool,
+            workers=self.config.backup_workers,
+            progress=self.progress,
+            remote_compression="zstd" if self.config.backup_remote_compression else "none",
+            file_filter=self._backup_filter(),
+        )
+        stats = streamer.stream(f"{self.config.remote_path}/wp-content", sink)
+        return stats.as_dict()
+
+    def _backup_filter(self) -> BackupFilter:
+        """Exclusion rules for wp-content from the configuration."""
+        return BackupFilter(
+            exclude=self.config.backup_exclude,
+            exclude_regex=self.config.backup_exclude_regex,
+            max_file_size=self.config.backup_max_file_size,
+            thumbnails=self._list_thumbnails() if self.config.backup_skip_thumbnails else (),
+        )
+
+    def _list_thumbnails(self) -> set[str]:
+        """Generated image sizes, from the `sizes` in attachment metadata."""
+        command = (
+            f"cd {self.config.remote_path} && wp eval {shlex.quote(LIST_THUMBNAILS_PHP)} --allow-root"
+        )
+        stdin, stdout, stderr = self.ssh_client.exec_command(command)
+        output = stdout.read().decode('utf-8')
+        if stdout.channel.recv_exit_status() != 0:
+            raise BackupError(f"Listing image thumbnails failed: {stderr.read().decode('utf-8')}")
+        return {line for line in output.splitlines() if line}
 
-    def _backup_wp_config(self, local_path: Path):
-        """Backup wp-config.php."""
+    def _latest_snapshot(self) -> Optional[str]:
+        """Name of the newest complete incremental snapshot, if any."""
+        snapshots = sorted(p.parent.name for p in self.local_backup_dir.glob(f"*/{MANIFEST_NAME}"))
+        return snapshots[-1] if snapshots else None
+
+    def _read_manifest(self, snapshot_dir: Path) -> dict:
+        """Load a snapshot's manifest."""
+        with open(snapshot_dir / MANIFEST_NAME) as f:
+            return json.load(f)
+
+    def _write_manifest(self, snapshot_dir: Path, manifest: dict):
+        """Write a snapshot's manifest (last, so only complete snapshots have one)."""
+        tmp_path = snapshot_dir / f"{MANIFEST_NAME}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, snapshot_dir / MANIFEST_NAME)
+
+    def _read_wp_config(self) -> Optional[bytes]:
+        """Read wp-config.php (None if it isn't readable)."""
         sftp = self.ssh_client.open_sftp()
         remote_config = f"{self.config.remote_path}/wp-config.php"
 
         try:
-            sftp.get(remote_config, str(local_path))
+            buffer = io.BytesIO()
+            sftp.getfo(remote_config, buffer)
+            return buffer.getvalue()
         except Exception:
             # wp-config.php might not be readable, skip
-            pass
+            return None
         finally:
             sftp.close()
 
-    def _sftp_download_recursive(self, sftp: paramiko.SFTPClient, remote_dir: str, local_dir: str):
-        """Recursively download directory via SFTP."""
-        local_path = Path(local_dir)
-        local_path.mkdir(parents=True, exist_ok=True)
-
-        for item in sftp.listdir_attr(remote_dir):
-            remote_path = f"{remote_dir}/{item.filename}"
-            local_item = local_path / item.filename
-
-            if item.st_mode & 0o40000:  # Directory
-                self._sftp_download_recursive(sftp, remote_path, str(local_item))
-            else:  # File
-                sftp.get(remote_path, str(local_item))
-
-    def _create_archive(self, source_dir: Path, archive_path: Path):
-        """Create compressed tar.gz archive."""
-        with tarfile.open(archive_path, "w:gz") as tar:
-            tar.add(source_dir, arcname=source_dir.name)
-
     def _cleanup_directory(self, directory: Path):
         """Remove directory and all contents."""
         import shutil
         if directory.exists():
             shutil.rmtree(directory)
 
+    def _sha256_file(self, path: Path) -> str:
+        """Checksum a backup file (archives, snapshot manifests)."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while True:
+                data = f.read(DB_CHUNK_SIZE)
+                if not data:
+                    break
+                digest.update(data)
+        return digest.hexdigest()
+
+    def _catalog(self) -> BackupCatalog:
+        """The backup catalog (opened once, shared by all tool calls)."""
+        if self._backup_catalog is None:
+            self._backup_catalog = BackupCatalog(
+                self.local_backup_dir / CATALOG_NAME, self._scan_backups
+            )
+        return self._backup_catalog
+
+    def _catalog_entry(self, meta: dict, results: dict) -> dict:
+        """Catalog entry for a backup that just finished."""
+        if meta["mode"] == "store":
+            backup_type = "store"
+        elif meta["mode"] == "snapshot":
+            backup_type = "incremental"
+        else:
+            backup_type = "full"
+        path = Path(results.get("archive_path", results["backup_path"]))
+
+        return {
+            "name": meta["name"],
+            "filename": path.name if backup_type == "full" else meta["name"],
+            "path": str(path),
+            "type": backup_type,
+            "created": datetime.strptime(meta["timestamp"], "%Y%m%d_%H%M%S").isoformat(),
+            "bytes": results["total_bytes"],
+            "new_bytes": results.get("new_bytes"),
+            "file_count": results.get("file_count", 0),
+            "sha256": results["sha256"],
+            "include_database": meta["include_database"],
+            "include_files": meta["include_files"],
+            "database_layout": results.get("database_layout", "single") if results["database_backed_up"] else None,
+            "parent": results.get("parent"),
+        }
+
+    def _scan_backups(self) -> list[dict]:
+        """
+        Build catalog entries by reading the backups on disk.
+
+        Only needed once, for backups made before the catalog existed;
+        archives from then have no recorded checksum or file count.
+        """
+        entries = []
+        if not self.local_backup_dir.exists():
+            return entries
+
+        for backup_file in self.local_backup_dir.iterdir():
+            if not backup_file.name.endswith(ARCHIVE_SUFFIXES):
+                continue
+            name = backup_file.name
+            for suffix in ARCHIVE_SUFFIXES:
+                name = name.removesuffix(suffix)
+            entries.append({
+                "name": name,
+                "filename": backup_file.name,
+                "path": str(backup_file),
+                "type": "full",
+                "created": datetime.fromtimestamp(backup_file.stat().st_mtime).isoformat(timespec="seconds"),
+                "bytes": backup_file.stat().st_size,
+                "new_bytes": None,
+                "file_count": None,
+                "sha256": None,
+                "include_database": None,
+                "include_files": None,
+                "database_layout": None,
+                "parent": None,
+            })
+
+        snapshots = [
+            (manifest_file.parent, self._read_manifest(manifest_file.parent))
+            for manifest_file in self.local_backup_dir.glob(f"*/{MANIFEST_NAME}")
+        ]
+        store_dir = self.local_backup_dir / STORE_DIR
+        if store_dir.exists():
+            store = self._store()
+            snapshots += [
+                (store.snapshots_dir / f"{name}.json", store.read_snapshot(name))
+                for name in store.list_snapshots()
+            ]
+
+        for path, manifest in snapshots:
+            is_store = path.suffix == ".json"
+            entries.append({
+                "name": manifest["name"],
+                "filename": manifest["name"],
+                "path": str(path),
+                "type": "store" if is_store else "incremental",
+                "created": manifest["created"],
+                "bytes": manifest["total_bytes"],
+                "new_bytes": manifest.get("new_bytes"),
+                "file_count": len(manifest["files"]),
+                "sha256": self._sha256_file(path if is_store else path / MANIFEST_NAME),
+                "include_database": manifest.get("include_database"),
+                "include_files": manifest.get("include_files"),
+                "database_layout": None,
+                "parent": manifest.get("parent"),
+            })
+
+        return entries
+
     def _get_file_size(self, file_path: Path) -> str:
         """Get human-readable file size."""
-        size_bytes = file_path.stat().st_size
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.1f} {unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.1f} TB"
+        return format_size(file_path.stat().st_size)
 
     def _get_dir_size(self, directory: Path) -> str:
         """Get human-readable directory size."""
-        total_size = sum(f.stat().st_size for f in directory.rglob('*') if f.is_file())
-        size_bytes = total_size
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.1f} {unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.1f} TB"
+        return format_size(
+            sum(f.stat().st_size for f in directory.rglob('*') if f.is_file())
+        )
 
-    def list_backups(self) -> list[dict]:
-        """List all available local backups."""
-        backups = []
+    def restore(
+        self,
+        backup_name: str,
+        include_files: bool = True,
+        include_database: bool = True,
+        paths: Optional[list[str]] = None,
+    ) -> dict:
+        """
+        Restore a backup onto the site.
+
+        wp-content files are uploaded with parallel SFTP workers while the
+        database is imported alongside them: each dump is streamed still
+        gzipped over SSH into `wp db import -`, per-table dumps in parallel.
+        Files not in the backup are left in place, and wp-config.php is
+        never overwritten (the site's own config points at its database).
 
+        Args:
+            backup_name: Archive filename, snapshot name or store snapshot name
+            include_files: Restore wp-content files
+            include_database: Import the database dump
+            paths: Only restore these wp-content relative paths
+                (e.g. ["uploads/2024", "plugins/akismet"])
+
+        Returns:
+            dict with restore information
+        """
+        self.connect()
+        started = time.monotonic()
+
+        try:
+            with self._open_backup(backup_name) as contents:
+                files = select_paths(contents.files, paths) if include_files else []
+                if include_files and paths and not files:
+                    raise BackupError(f"No files in {contents.name} match {', '.join(paths)}")
+                if include_database and not contents.database:
+                    raise BackupError(f"{contents.name} has no database dump")
+
+                results = {
+                    "backup_name": contents.name,
+                    "database_restored": False,
+                    "files_restored": False,
+                }
+
+                with ThreadPoolExecutor(1, thread_name_prefix="db-import") as executor:
+                    database = None
+                    if include_database:
+                        # The import runs on its own connections while files upload
+                        database = executor.submit(
+                            in_current_context(self._restore_database), contents
+                        )
+
+                    if files:
+                        uploader = ParallelSFTPUploader(
+                            self.pool,
+                            workers=self.config.backup_workers,
+                            progress=self.progress,
+                        )
+                        stats = uploader.upload(files, f"{self.config.remote_path}/wp-content")
+                        results["files_restored"] = True
+                        results["transfer"] = stats.as_dict()
+
+                    if database is not None:
+                        results["database_import"] = database.result()
+                        results["database_restored"] = True
+                        results["database_layout"] = contents.database_layout
+
+            results["seconds"] = round(time.monotonic() - started, 1)
+            return results
+
+        except BackupError:
+            raise
+        except Exception as e:
+            raise BackupError(f"Restore failed: {str(e)}")
+        finally:
+            self.disconnect()
+
+    @contextlib.contextmanager
+    def _open_backup(self, backup_name: str) -> Iterator[BackupContents]:
+        """Find a backup by name and index its contents."""
+        if Path(backup_name).name != backup_name:
+            raise BackupError(f"Invalid backup name: {backup_name}")
+
+        name = backup_name
+        for suffix in ARCHIVE_SUFFIXES:
+            name = name.removesuffix(suffix)
+
+        store_dir = self.local_backup_dir / STORE_DIR
+        store = self._store() if store_dir.exists() else None
+        if store is not None and name in store.list_snapshots():
+            yield read_store_snapshot(store, store.read_snapshot(name))
+        elif (self.local_backup_dir / name / MANIFEST_NAME).exists():
+            yield read_directory(self.local_backup_dir / name)
+        elif (self.local_backup_dir / f"{name}.tar").exists():
+            yield read_archive(self.local_backup_dir / f"{name}.tar", name)
+        elif (self.local_backup_dir / f"{name}.tar.gz").exists():
+            # Old single-stream archives can't be read in parallel in place
+            with tempfile.TemporaryDirectory(dir=self.local_backup_dir) as tmp:
+                root = extract_legacy_archive(self.local_backup_dir / f"{name}.tar.gz", Path(tmp))
+                yield read_directory(root)
+        else:
+            raise BackupError(f"Backup not found: {backup_name}")
+
+    def _restore_database(self, contents: BackupContents) -> dict:
+        """
+        Import a backup's database dump(s).
+
+        Per-table dumps are independent (each drops and recreates its
+        table), so they are imported concurrently, largest first. Views
+        follow, once their tables exist.
+        """
+        started = time.monotonic()
+
+        if contents.database_layout == "single":
+            stats = [self._import_database(contents.database[0], self.ssh_client)]
+        else:
+            def import_table(dump: LocalFile) -> dict:
+                with self.pool.connection() as ssh_client:
+                    return self._import_database(dump, ssh_client)
+
+            with ThreadPoolExecutor(self.config.backup_db_workers, thread_name_prefix="db-import") as executor:
+                futures = [
+                    executor.submit(in_current_context(import_table), dump)
+                    for dump in contents.database
+                ]
+                stats = [future.result() for future in futures]
+            for dump in contents.database_views:
+                stats.append(self._import_database(dump, self.ssh_client))
+
+        # Drop object cache entries that describe the replaced data
+        self.ssh_client.exec_command(
+            f"cd {self.config.remote_path} && wp cache flush --allow-root"
+        )[1].channel.recv_exit_status()
+
+        sent = sum(s["bytes_sent"] for s in stats)
+        elapsed = max(time.monotonic() - started, 1e-6)
+        return {
+            "dumps": len(stats),
+            "bytes_sent": sent,
+            "seconds": round(elapsed, 1),
+            "mb_per_second": round(sent / elapsed / (1024 * 1024), 2),
+        }
+
+    def _import_database(self, dump: LocalFile, ssh_client: paramiko.SSHClient) -> dict:
+        """
+        Stream one dump into `wp db import -`.
+
+        Gzipped dumps travel compressed and are unpacked on the server.
+        """
+        importer = f"cd {self.config.remote_path} && wp db import - --allow-root"
+        if dump.relative_path.endswith(".gz"):
+            importer = f"gzip -dc | ({importer})"
+        command = f"bash -o pipefail -c {shlex.quote(importer)}"
+
+        stdin, stdout, stderr = ssh_client.exec_command(command)
+        sent = 0
+        with dump.open() as f:
+            while True:
+                chunk = f.read(DB_CHUNK_SIZE)
+                if not chunk:
+                    break
+                stdin.write(chunk)
+                sent += len(chunk)
+                check_cancelled()
+        stdin.channel.shutdown_write()
+
+        stdout.read()
+        exit_code = stdout.channel.recv_exit_status()
+        if exit_code != 0:
+            error = stderr.read().decode('utf-8')
+            raise BackupError(f"Database restore failed ({dump.relative_path}): {error}")
+
+        return {"bytes_sent": sent}
+
+    def _retention_policy(self) -> RetentionPolicy:
+        """Retention policy from the configuration."""
+        return RetentionPolicy(
+            keep_daily=self.config.backup_keep_daily,
+            keep_weekly=self.config.backup_keep_weekly,
+            keep_monthly=self.config.backup_keep_monthly,
+            max_bytes=self.config.backup_max_bytes,
+        )
+
+    def prune(self, policy: Optional[RetentionPolicy] = None, dry_run: bool = True) -> dict:
+        """
+        Delete backups the retention policy doesn't keep.
+
+        Decisions are made from the catalog alone; the filesystem is only
+        touched to delete.
+
+        Args:
+            policy: Retention policy (defaults to the configured one)
+            dry_run: Only report what would be deleted
+
+        Returns:
+            dict with kept backups (and why), deleted backups and freed bytes
+        """
+        policy = policy or self._retention_policy()
+        if not policy.enabled:
+            raise BackupError("No retention policy: set a keep_* count or max_bytes")
+
+        plan = plan_retention(self._catalog().entries(), policy)
+        deleted = []
+        for entry in plan.delete:
+            if dry_run or self.delete_backup(entry["filename"]):
+                deleted.append({
+                    "name": entry["name"],
+                    "type": entry["type"],
+                    "created": entry["created"],
+                    "bytes": disk_bytes(entry),
+                })
+
+        return {
+            "dry_run": dry_run,
+            "kept": plan.keep,
+            "deleted": deleted,
+            "kept_bytes": plan.kept_bytes,
+            "freed_bytes": plan.freed_bytes,
+        }
+
+    def list_backups(self) -> list[dict]:
+        """List all available local backups, newest first (read from the catalog)."""
         if not self.local_backup_dir.exists():
-            return backups
+            return []
 
-        for backup_file in self.local_backup_dir.glob("*.tar.gz"):
-            backups.append({
-                "filename": backup_file.name,
-                "path": str(backup_file),
-                "size": self._get_file_size(backup_file),
-                "created": datetime.fromtimestamp(backup_file.stat().st_mtime).strftime("%Y-%m-%d %H:%M:%S")
-            })
+        entries = self._catalog().entries()
+        parents = {e["name"]: e["parent"] for e in entries if e["type"] == "incremental"}
 
-        return sorted(backups, key=lambda x: x["created"], reverse=True)
+        backups = []
+        for entry in entries:
+            backup = {
+                **entry,
+                "size": format_size(entry["bytes"]),
+                "created": datetime.fromisoformat(entry["created"]).strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            if entry["new_bytes"] is not None:
+                backup["new_size"] = format_size(entry["new_bytes"])
+
+            # Chain back to the first (full) snapshot. Unchanged files are
+            # hardlinks, so deleting an older link never breaks a newer snapshot.
+            if entry["type"] == "incremental":
+                chain = [entry["name"]]
+                while parents.get(chain[-1]) in parents:
+                    chain.append(parents[chain[-1]])
+                backup["chain"] = chain
+            backups.append(backup)
+
+        return backups
 
     def delete_backup(self, backup_filename: str) -> bool:
-        """Delete a backup file."""
+        """
+        Delete a backup archive or snapshot.
+
+        Deleting a store snapshot also garbage collects objects no other
+        snapshot references. A cataloged backup whose files are already
+        gone is dropped from the catalog (and False returned).
+        """
+        if Path(backup_filename).name != backup_filename:
+            return False
+
+        name = backup_filename
+        for suffix in ARCHIVE_SUFFIXES:
+            name = name.removesuffix(suffix)
+
+        store_dir = self.local_backup_dir / STORE_DIR
         backup_path = self.local_backup_dir / backup_filename
-        if backup_path.exists():
+        if store_dir.exists() and self._store().delete_snapshot(backup_filename) is not None:
+            pass
+        elif (backup_path / MANIFEST_NAME).exists():
+            self._cleanup_directory(backup_path)
+        elif backup_path.is_file():
             backup_path.unlink()
-            return True
-        return False
+        else:
+            self._catalog().remove(name)
+            return False
+
+        self._catalog().remove(name)
+        return True
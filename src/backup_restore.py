@@ -0,0 +1,281 @@
+"""Read backups back for a restore, whichever format they were saved in."""
+
+import io
+import json
+import os
+import tarfile
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+from typing import Iterable, Iterator, Optional
+from .backup_codecs import CODEC_PAX_KEY, CODEC_SUFFIXES, decompressing_reader
+from .backup_store import BackupStore
+from .sftp_transfer import LocalFile
+
+# Single database dump; legacy .tar.gz backups hold it uncompressed
+DATABASE_DUMPS = ("database.sql.gz", "database.sql")
+
+# Restore manifest written next to per-table dumps
+DATABASE_RESTORE_MANIFEST = "database/restore.json"
+
+
+@dataclass
+class BackupContents:
+    """What a backup holds, as files that can be opened and streamed."""
+    name: str
+    # wp-content files, by path relative to wp-content
+    files: list[LocalFile] = field(default_factory=list)
+    # Database dumps (.sql or .sql.gz), one or one per table
+    database: list[LocalFile] = field(default_factory=list)
+    # Per-table views, imported after the tables they select from
+    database_views: list[LocalFile] = field(default_factory=list)
+    database_layout: str = "single"
+
+
+class _SliceReader:
+    """Read `size` bytes of a file starting at `offset`."""
+
+    def __init__(self, path: Path, offset: int, size: int):
+        self.f = open(path, "rb")
+        self.f.seek(offset)
+        self.remaining = size
+
+    def read(self, n: int = -1) -> bytes:
+        if n < 0 or n > self.remaining:
+            n = self.remaining
+        data = self.f.read(n)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _DecodingReader:
+    """Decompress a member on read, closing the underlying file with it."""
+
+    def __init__(self, codec: str, raw: _SliceReader):
+        self.raw = raw
+        self.reader = decompressing_reader(codec, raw)
+
+    def read(self, n: int = -1) -> bytes:
+        return self.reader.read(n)
+
+    def close(self):
+        if self.reader is not self.raw:
+            self.reader.close()
+        self.raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _ChunkReader(io.RawIOBase):
+    """Raw file view of an iterator of byte chunks (wrap in a BufferedReader)."""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self.chunks = chunks
+        self.chunk = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self.chunk:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                return 0
+            self.chunk = memoryview(chunk)
+        n = min(len(buffer), len(self.chunk))
+        buffer[:n] = self.chunk[:n]
+        self.chunk = self.chunk[n:]
+        return n
+
+
+def _safe_relative_path(path: str) -> bool:
+    """Reject absolute paths and .. components from a backup."""
+    parts = PurePosixPath(path).parts
+    return bool(parts) and not PurePosixPath(path).is_absolute() and ".." not in parts
+
+
+def _database_from_manifest(contents: BackupContents, restore_manifest: bytes, open_file):
+    """Add the per-table dumps listed in a restore manifest, in import order."""
+    for table in json.loads(restore_manifest)["tables"]:
+        dumps = contents.database_views if table.get("view") else contents.database
+        dumps.append(open_file(table["file"], table["size"]))
+    contents.database_layout = "per-table"
+
+
+def read_archive(path: Path, backup_name: str) -> BackupContents:
+    """
+    Index a .tar backup.
+
+    Members are read in place by offset, so any number of workers can
+    stream different files at once without unpacking the archive.
+    Compressed members are decompressed on read.
+    """
+    contents = BackupContents(backup_name)
+    members = {}
+    with tarfile.open(path, "r:") as tar:
+        for member in tar:
+            if member.isreg():
+                members[member.name] = member
+
+    def open_member(member: tarfile.TarInfo, codec: str = "none"):
+        return lambda: _DecodingReader(codec, _SliceReader(path, member.offset_data, member.size))
+
+    def open_root_file(name: str, size: int) -> LocalFile:
+        member = members[f"{backup_name}/{name}"]
+        return LocalFile(name, size, None, open_member(member))
+
+    prefix = f"{backup_name}/wp-content/"
+    for name, member in members.items():
+        if not name.startswith(prefix):
+            continue
+        codec = member.pax_headers.get(CODEC_PAX_KEY, "none")
+        relative_path = name[len(prefix):]
+        if codec != "none":
+            relative_path = relative_path[:-len(CODEC_SUFFIXES[codec])]
+        if _safe_relative_path(relative_path):
+            contents.files.append(
+                LocalFile(relative_path, member.size, int(member.mtime), open_member(member, codec))
+            )
+
+    restore_manifest = members.get(f"{backup_name}/{DATABASE_RESTORE_MANIFEST}")
+    if restore_manifest is not None:
+        with open_member(restore_manifest)() as f:
+            _database_from_manifest(contents, f.read(), open_root_file)
+    else:
+        for dump in DATABASE_DUMPS:
+            member = members.get(f"{backup_name}/{dump}")
+            if member is not None:
+                contents.database = [open_root_file(dump, member.size)]
+                break
+
+    return contents
+
+
+def extract_legacy_archive(path: Path, target: Path) -> Path:
+    """
+    Unpack an old .tar.gz backup (one gzip stream, no random access).
+
+    Only regular files and directories with safe names are extracted.
+
+    Returns:
+        The backup's top-level directory inside target
+    """
+    with tarfile.open(path, "r:gz") as tar:
+        for member in tar:
+            if not _safe_relative_path(member.name):
+                continue
+            destination = target / member.name
+            if member.isdir():
+                destination.mkdir(parents=True, exist_ok=True)
+            elif member.isreg():
+                destination.parent.mkdir(parents=True, exist_ok=True)
+                with tar.extractfile(member) as source, open(destination, "wb") as f:
+                    while True:
+                        data = source.read(1024 * 1024)
+                        if not data:
+                            break
+                        f.write(data)
+                os.utime(destination, (member.mtime, member.mtime))
+
+    return target / path.name[:-len(".tar.gz")]
+
+
+def read_directory(path: Path) -> BackupContents:
+    """Index an incremental snapshot directory (or an unpacked legacy archive)."""
+    contents = BackupContents(path.name)
+
+    def open_root_file(name: str, size: int) -> LocalFile:
+        return LocalFile(name, size, None, lambda: open(path / name, "rb"))
+
+    wp_content = path / "wp-content"
+    if wp_content.is_dir():
+        for root, _, filenames in os.walk(wp_content):
+            for filename in filenames:
+                local_path = Path(root) / filename
+                stat_result = local_path.stat()
+                contents.files.append(LocalFile(
+                    local_path.relative_to(wp_content).as_posix(),
+                    stat_result.st_size,
+                    int(stat_result.st_mtime),
+                    lambda local_path=local_path: open(local_path, "rb"),
+                ))
+
+    if (path / DATABASE_RESTORE_MANIFEST).exists():
+        _database_from_manifest(
+            contents, (path / DATABASE_RESTORE_MANIFEST).read_bytes(), open_root_file
+        )
+    else:
+        for dump in DATABASE_DUMPS:
+            if (path / dump).exists():
+                contents.database = [open_root_file(dump, (path / dump).stat().st_size)]
+                break
+
+    return contents
+
+
+def read_store_snapshot(store: BackupStore, manifest: dict) -> BackupContents:
+    """Index a content-addressed store snapshot; files are reassembled from chunks on read."""
+    contents = BackupContents(manifest["name"])
+
+    def open_entry(entry: dict):
+        return lambda: io.BufferedReader(_ChunkReader(store.iter_file(entry)), 1024 * 1024)
+
+    def open_root_file(name: str, size: int) -> LocalFile:
+        entry = manifest["root_files"][name]
+        return LocalFile(name, entry["size"], None, open_entry(entry))
+
+    for relative_path, entry in manifest["files"].items():
+        if _safe_relative_path(relative_path):
+            contents.files.append(
+                LocalFile(relative_path, entry["size"], entry["mtime"], open_entry(entry))
+            )
+
+    root_files = manifest["root_files"]
+    if DATABASE_RESTORE_MANIFEST in root_files:
+        restore_manifest = b"".join(store.iter_file(root_files[DATABASE_RESTORE_MANIFEST]))
+        _database_from_manifest(contents, restore_manifest, open_root_file)
+    elif DATABASE_DUMPS[0] in root_files:
+        contents.database = [open_root_file(DATABASE_DUMPS[0], 0)]
+
+    return contents
+
+
+def select_paths(files: list[LocalFile], paths: Optional[Iterable[str]]) -> list[LocalFile]:
+    """
+    Keep only files at or below the given wp-content relative paths.
+
+    Args:
+        files: Files of a backup
+        paths: e.g. ["uploads/2024", "plugins/akismet"]; None keeps all
+    """
+    if paths is None:
+        return files
+
+    prefixes = []
+    for path in paths:
+        path = path.strip("/")
+        if path == "wp-content" or path.startswith("wp-content/"):
+            path = path[len("wp-content/"):]
+        prefixes.append(path)
+
+    return [
+        f for f in files
+        if any(
+            not prefix
+            or f.relative_path == prefix
+            or f.relative_path.startswith(f"{prefix}/")
+            for prefix in prefixes
+        )
+    ]
@@ -0,0 +1,103 @@
+"""Grandfather-father-son retention for cataloged backups."""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+
+@dataclass
+class RetentionPolicy:
+    """How many backups to keep; 0 disables a rule."""
+    keep_daily: int = 0
+    keep_weekly: int = 0
+    keep_monthly: int = 0
+    max_bytes: int = 0
+
+    @property
+    def enabled(self) -> bool:
+        return any((self.keep_daily, self.keep_weekly, self.keep_monthly, self.max_bytes))
+
+
+@dataclass
+class RetentionPlan:
+    """Which backups a policy keeps and deletes, and why."""
+    keep: dict[str, list[str]] = field(default_factory=dict)
+    delete: list[dict] = field(default_factory=list)
+    kept_bytes: int = 0
+    freed_bytes: int = 0
+
+
+def disk_bytes(entry: dict, kept: Optional[set[str]] = None) -> int:
+    """
+    Disk space a backup is charged for.
+
+    Incremental and store snapshots share unchanged data with their parent,
+    so while the parent is kept they are charged only for the data they
+    added. Once the parent goes, the shared data is theirs to pay for.
+
+    Args:
+        entry: Catalog entry
+        kept: Names of the backups that stay (None: all of them)
+    """
+    parent = entry.get("parent")
+    if entry.get("new_bytes") is not None and parent and (kept is None or parent in kept):
+        return entry["new_bytes"]
+    return entry["bytes"]
+
+
+def plan_retention(entries: list[dict], policy: RetentionPolicy) -> RetentionPlan:
+    """
+    Decide which backups to keep.
+
+    The newest backup of each of the last keep_daily days, keep_weekly ISO
+    weeks and keep_monthly months is kept, plus the newest backup overall.
+    If max_bytes is set, the oldest kept backups are then dropped until
+    the rest fit the budget (the newest is never dropped). Sizes are
+    estimates from the catalog; see disk_bytes(). Without any
+    keep_* rule, every backup is a candidate for the byte budget alone.
+
+    Args:
+        entries: Catalog entries (any order)
+        policy: Retention policy
+
+    Returns:
+        The plan; nothing is deleted here
+    """
+    entries = sorted(entries, key=lambda e: (e["created"], e["name"]), reverse=True)
+    plan = RetentionPlan()
+    if not entries:
+        return plan
+
+    reasons: dict[str, list[str]] = {entries[0]["name"]: ["newest"]}
+    periods = (
+        ("daily", policy.keep_daily, lambda d: d.strftime("%Y-%m-%d")),
+        ("weekly", policy.keep_weekly, lambda d: "%d-W%02d" % d.isocalendar()[:2]),
+        ("monthly", policy.keep_monthly, lambda d: d.strftime("%Y-%m")),
+    )
+    gfs = any(count for _, count, _ in periods)
+    for rule, count, period_of in periods:
+        seen = set()
+        for entry in entries:
+            period = period_of(datetime.fromisoformat(entry["created"]))
+            if len(seen) >= count:
+                break
+            if period not in seen:
+                seen.add(period)
+                reasons.setdefault(entry["name"], []).append(f"{rule} {period}")
+
+    keep = [e for e in entries if e["name"] in reasons or not gfs]
+    kept_names = {e["name"] for e in keep}
+    if policy.max_bytes:
+        while len(keep) > 1 and sum(disk_bytes(e, kept_names) for e in keep) > policy.max_bytes:
+            kept_names.discard(keep.pop()["name"])
+
+    plan.kept_bytes = sum(disk_bytes(e, kept_names) for e in keep)
+    for entry in entries:
+        if entry["name"] in kept_names:
+            plan.keep[entry["name"]] = reasons.get(entry["name"], ["within byte budget"])
+        else:
+            plan.delete.append(entry)
+    # What deleting actually frees: everything minus what the rest still costs
+    plan.freed_bytes = sum(disk_bytes(e) for e in entries) - plan.kept_bytes
+
+    return plan
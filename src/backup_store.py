@@ -0,0 +1,398 @@
+"""Content-addressed, deduplicating backup store."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator, Optional
+import paramiko
+from .backup_codecs import (
+    CODEC_SUFFIXES,
+    CODECS,
+    choose_codec,
+    compress_bytes,
+    decompress_bytes,
+)
+from .backup_journal import CHECKPOINT_BYTES, BackupJournal
+from .sftp_transfer import SFTP_PREFETCH_REQUESTS, RemoteFile
+
+# Files are split into fixed-size chunks; each chunk is stored once under
+# the sha256 of its contents
+CHUNK_SIZE = 4 * 1024 * 1024
+
+# Objects younger than this are never garbage collected, so a backup still
+# writing objects (and not yet referencing them from a manifest) is safe
+GC_GRACE_SECONDS = 3600
+
+
+class BackupStore:
+    """
+    Deduplicating store of backup snapshots.
+
+    Layout under root:
+
+        objects/ab/abcdef...[.zst|.gz]   chunk contents, compressed per file type
+        snapshots/<name>.json            one manifest per snapshot
+
+    A manifest lists every file's size, mtime, sha256 and chunk hashes, so
+    media that is identical across nightly backups is stored once. Objects
+    are shared between snapshots and reclaimed by gc() once no manifest
+    references them.
+    """
+
+    def __init__(self, root: Path, codec: str = "zstd", level: int = 3):
+        """
+        Initialize the store.
+
+        Args:
+            root: Store directory (created if missing)
+            codec: Default codec for new chunks ("zstd", "gzip" or "none")
+            level: Compression level
+        """
+        self.root = Path(root)
+        self.codec = codec
+        self.level = level
+        self.objects_dir = self.root / "objects"
+        self.snapshots_dir = self.root / "snapshots"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.snapshots_dir.mkdir(parents=True, exist_ok=True)
+
+    def _object_path(self, digest: str, codec: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}{CODEC_SUFFIXES[codec]}"
+
+    def find_object(self, digest: str) -> Optional[tuple[Path, str]]:
+        """Locate a stored chunk and the codec it was stored with."""
+        for codec in CODECS:
+            path = self._object_path(digest, codec)
+            if path.exists():
+                return path, codec
+        return None
+
+    def put_chunk(self, data: bytes, codec: str) -> tuple[str, int]:
+        """
+        Store one chunk unless it is already present.
+
+        Returns:
+            Tuple of (sha256, bytes newly written to disk)
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        if self.find_object(digest) is not None:
+            return digest, 0
+
+        path = self._object_path(digest, codec)
+        path.parent.mkdir(exist_ok=True)
+        stored = compress_bytes(codec, data, self.level)
+
+        tmp_path = path.with_name(f"{path.name}.tmp-{threading.get_ident()}")
+        with open(tmp_path, "wb") as f:
+            f.write(stored)
+        os.replace(tmp_path, path)
+        return digest, len(stored)
+
+    def put_stream(
+        self,
+        relative_path: str,
+        fileobj: BinaryIO,
+        prefix_chunks: Optional[list[str]] = None,
+        on_chunk: Optional[Callable[[list[str], int], None]] = None,
+    ) -> tuple[dict, int]:
+        """
+        Store a file read from a stream, chunk by chunk.
+
+        Args:
+            relative_path: File path (selects the codec)
+            fileobj: Readable binary stream
+            prefix_chunks: Already stored leading chunks of the file; fileobj
+                continues right after them (used to resume a partial file)
+            on_chunk: Called with (chunks so far, bytes so far) after each chunk
+
+        Returns:
+            Tuple of (manifest entry without mtime, bytes newly written)
+        """
+        codec = choose_codec(relative_path, self.codec)
+        file_digest = hashlib.sha256()
+        chunks = list(prefix_chunks or [])
+        size = 0
+        new_bytes = 0
+
+        for data in self.iter_file({"chunks": chunks}):
+            file_digest.update(data)
+            size += len(data)
+
+        while True:
+            data = fileobj.read(CHUNK_SIZE)
+            # Short reads are fine: chunk boundaries only have to be stable
+            # for the same content, which a full read() gives us
+            while data and len(data) < CHUNK_SIZE:
+                more = fileobj.read(CHUNK_SIZE - len(data))
+                if not more:
+                    break
+                data += more
+            if not data:
+                break
+
+            file_digest.update(data)
+            digest, written = self.put_chunk(data, codec)
+            chunks.append(digest)
+            size += len(data)
+            new_bytes += written
+            if on_chunk is not None:
+                on_chunk(chunks, size)
+
+        entry = {"size": size, "sha256": file_digest.hexdigest(), "chunks": chunks}
+        return entry, new_bytes
+
+    def has_chunks(self, entry: dict) -> bool:
+        """Whether every chunk a manifest entry refers to is present."""
+        return all(self.find_object(digest) is not None for digest in entry["chunks"])
+
+    def iter_file(self, entry: dict) -> Iterator[bytes]:
+        """Stream a stored file's contents chunk by chunk."""
+        for digest in entry["chunks"]:
+            found = self.find_object(digest)
+            if found is None:
+                raise FileNotFoundError(f"Missing backup object {digest}")
+            path, codec = found
+            yield decompress_bytes(codec, path.read_bytes())
+
+    def write_snapshot(self, manifest: dict):
+        """Write a snapshot manifest (last, so only complete snapshots exist)."""
+        path = self.snapshots_dir / f"{manifest['name']}.json"
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
+
+    def read_snapshot(self, name: str) -> dict:
+        """Load a snapshot manifest."""
+        with open(self.snapshots_dir / f"{name}.json") as f:
+            return json.load(f)
+
+    def list_snapshots(self) -> list[str]:
+        """Names of all complete snapshots, oldest first."""
+        return sorted(p.stem for p in self.snapshots_dir.glob("*.json"))
+
+    def latest_snapshot(self) -> Optional[dict]:
+        """Manifest of the newest snapshot, if any."""
+        names = self.list_snapshots()
+        return self.read_snapshot(names[-1]) if names else None
+
+    def delete_snapshot(self, name: str) -> Optional[dict]:
+        """
+        Delete a snapshot and garbage collect objects nothing else uses.
+
+        Returns:
+            gc() stats, or None if there is no such snapshot
+        """
+        path = self.snapshots_dir / f"{name}.json"
+        if not path.exists():
+            return None
+        path.unlink()
+        return self.gc()
+
+    def reference_counts(self) -> dict[str, int]:
+        """How many snapshot files reference each chunk."""
+        counts: dict[str, int] = {}
+        for name in self.list_snapshots():
+            for entry in _manifest_entries(self.read_snapshot(name)):
+                for digest in entry["chunks"]:
+                    counts[digest] = counts.get(digest, 0) + 1
+        return counts
+
+    def gc(self, grace_seconds: float = GC_GRACE_SECONDS) -> dict:
+        """
+        Remove objects whose reference count has dropped to zero.
+
+        Objects written within grace_seconds are kept, as are leftovers of
+        interrupted writes until they are that old.
+
+        Returns:
+            dict with objects_removed and bytes_freed
+        """
+        referenced = self.reference_counts()
+        cutoff = time.time() - grace_seconds
+        removed = 0
+        freed = 0
+
+        for path in self.objects_dir.glob("*/*"):
+            digest = path.name.split(".", 1)[0]
+            if digest in referenced and ".tmp-" not in path.name:
+                continue
+            stat = path.stat()
+            if stat.st_mtime > cutoff:
+                continue
+            path.unlink()
+            removed += 1
+            freed += stat.st_size
+
+        return {"objects_removed": removed, "bytes_freed": freed}
+
+    def stored_bytes(self) -> int:
+        """Disk space used by all objects."""
+        return sum(p.stat().st_size for p in self.objects_dir.glob("*/*"))
+
+
+def _manifest_entries(manifest: dict) -> Iterator[dict]:
+    """Every file entry in a snapshot manifest (wp-content, database, config)."""
+    yield from manifest["files"].values()
+    yield from manifest["root_files"].values()
+
+
+class StoreSink:
+    """
+    Write downloaded files into a BackupStore.
+
+    Used in place of DirectorySink/TarSink by both ParallelSFTPDownloader
+    and RemoteTarStreamer. Files unchanged since the previous snapshot
+    (same size and mtime) are carried over without being downloaded.
+    After a run, `files` holds the manifest entries and `new_bytes` how much
+    was actually added to the store.
+
+    With a journal, finished files are recorded with their chunk lists and
+    large files are checkpointed every CHECKPOINT_BYTES; since the chunks
+    themselves are already in the store, a retry picks up finished files
+    for free and continues partial ones with a ranged read.
+    """
+
+    def __init__(
+        self,
+        store: BackupStore,
+        previous: Optional[dict[str, dict]] = None,
+        journal: Optional[BackupJournal] = None,
+    ):
+        """
+        Initialize the sink.
+
+        Args:
+            store: Store to write chunks to
+            previous: File entries of the previous snapshot
+            journal: Checkpoint journal of this backup
+        """
+        self.store = store
+        self.previous = previous or {}
+        self.journal = journal
+        self.files: dict[str, dict] = {}
+        self.root_files: dict[str, dict] = {}
+        self.directories: list[str] = []
+        self.new_bytes = 0
+        self._lock = threading.Lock()
+
+    def add_directory(self, relative_path: str, mtime: Optional[int] = None):
+        """Record a directory (so empty ones survive a restore)."""
+        with self._lock:
+            self.directories.append(relative_path)
+
+    def compresses(self, relative_path: str) -> bool:
+        """Whether a file at relative_path would be compressed."""
+        return choose_codec(relative_path, self.store.codec) != "none"
+
+    def link_unchanged(self, remote_file: RemoteFile) -> bool:
+        """Reuse the previous snapshot's chunks for an unchanged file."""
+        entry = self.previous.get(remote_file.relative_path)
+        if entry is None or not self.store.has_chunks(entry):
+            return False
+        with self._lock:
+            self.files[remote_file.relative_path] = entry
+        return True
+
+    def resume(self, remote_file: RemoteFile) -> Optional[dict]:
+        """The entry for a file an interrupted run already stored, if any."""
+        if self.journal is None:
+            return None
+        entry = self.journal.get_completed(remote_file.relative_path, remote_file.size, remote_file.mtime)
+        if entry is None or not self.store.has_chunks(entry):
+            return None
+        with self._lock:
+            self.files[remote_file.relative_path] = entry
+        return entry
+
+    def add_file(self, sftp: paramiko.SFTPClient, remote_file: RemoteFile) -> str:
+        """Store one remote file; returns the sha256 of its contents."""
+        prefix_chunks = []
+        if self.journal is not None:
+            record = self.journal.get_partial(remote_file.relative_path, remote_file.size, remote_file.mtime)
+            if record is not None and self.store.has_chunks(record["state"]):
+                prefix_chunks = record["state"]["chunks"]
+
+        with sftp.open(remote_file.remote_path, "rb") as f:
+            f.seek(len(prefix_chunks) * CHUNK_SIZE)
+            f.prefetch(remote_file.size, SFTP_PREFETCH_REQUESTS)
+            return self.add_stream(
+                remote_file.relative_path, f, remote_file.size, remote_file.mtime, prefix_chunks
+            )
+
+    def add_stream(
+        self,
+        relative_path: str,
+        fileobj,
+        size: int,
+        mtime: Optional[int] = None,
+        prefix_chunks: Optional[list[str]] = None,
+    ) -> str:
+        """Store a file read from a stream; returns the sha256 of its contents."""
+        mtime = mtime if mtime is not None else int(time.time())
+        on_chunk = None
+        if self.journal is not None and size > CHECKPOINT_BYTES:
+            on_chunk = self._checkpointer(relative_path, size, mtime)
+
+        entry, new_bytes = self.store.put_stream(relative_path, fileobj, prefix_chunks, on_chunk)
+        entry["mtime"] = mtime
+
+        with self._lock:
+            self.files[relative_path] = entry
+            self.new_bytes += new_bytes
+        if self.journal is not None:
+            self.journal.done(relative_path, entry)
+        return entry["sha256"]
+
+    def _checkpointer(self, relative_path: str, size: int, mtime: int) -> Callable[[list[str], int], None]:
+        """on_chunk callback journaling progress every CHECKPOINT_BYTES."""
+        last = [0]
+
+        def checkpoint(chunks: list[str], offset: int):
+            if offset - last[0] >= CHECKPOINT_BYTES:
+                self.journal.checkpoint(relative_path, size, mtime, offset, {"chunks": list(chunks)})
+                last[0] = offset
+        return checkpoint
+
+    def add_root_file(self, name: str, fileobj):
+        """
+        Store a file from outside the synced tree (database dumps, wp-config.php).
+
+        It is recorded under `name` in the manifest's root_files.
+        """
+        entry, new_bytes = self.store.put_stream(name, fileobj)
+
+        with self._lock:
+            self.root_files[name] = entry
+            self.new_bytes += new_bytes
+        if self.journal is not None:
+            self.journal.done(f"@{name}", entry)
+
+    def resume_root_file(self, name: str) -> Optional[dict]:
+        """Reuse a root file an interrupted run already stored."""
+        if self.journal is None:
+            return None
+        entry = self.journal.get_completed(f"@{name}")
+        if entry is None or not self.store.has_chunks(entry):
+            return None
+        with self._lock:
+            self.root_files[name] = entry
+        return entry
+
+    def snapshot_manifest(self, name: str, **extra) -> dict:
+        """Build the manifest for a snapshot of everything added so far."""
+        manifest = {
+            "name": name,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "files": self.files,
+            "directories": sorted(self.directories),
+            "new_bytes": self.new_bytes,
+            "root_files": self.root_files,
+            **extra,
+        }
+        manifest["total_bytes"] = sum(entry["size"] for entry in _manifest_entries(manifest))
+        return manifest
@@ -1,6 +1,7 @@
 """Configuration management for WordPress MCP Server."""
 
 import os
+import re
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
@@ -27,6 +28,34 @@ class WordPressConfig:
     mailchimp_api_key: Optional[str] = None
     mailchimp_server: Optional[str] = None
     mailchimp_list_id: Optional[str] = None
+    http_pool_size: int = 10
+    http_max_retries: int = 3
+    http_backoff_factor: float = 0.5
+    http_timeout: float = 30
+    wp_cli_persistent: bool = False
+    ssh_pool_size: int = 4
+    ssh_channels_per_connection: int = 8
+    ssh_idle_timeout: float = 300
+    backup_workers: int = 4
+    backup_remote_compression: bool = True
+    backup_compression: str = "zstd"
+    backup_compression_level: int = 3
+    backup_transfer: str = "sftp"
+    backup_store: bool = False
+    backup_resume_hours: float = 24
+    backup_db_workers: int = 1
+    backup_keep_daily: int = 0
+    backup_keep_weekly: int = 0
+    backup_keep_monthly: int = 0
+    backup_max_bytes: int = 0
+    backup_exclude: tuple[str, ...] = ()
+    backup_exclude_regex: Optional[str] = None
+    backup_max_file_size: int = 0
+    backup_skip_thumbnails: bool = False
+    image_audit_workers: int = 8
+    image_host_connections: int = 6
+    image_encode_workers: int = 0
+    image_cache_path: str = "./.image-cache/savings.json"
 
     @classmethod
     def from_env(cls) -> "WordPressConfig":
@@ -49,6 +78,40 @@ class WordPressConfig:
             mailchimp_api_key=os.getenv("MAILCHIMP_API_KEY"),
             mailchimp_server=os.getenv("MAILCHIMP_SERVER"),
             mailchimp_list_id=os.getenv("MAILCHIMP_LIST_ID"),
+            http_pool_size=int(os.getenv("WP_HTTP_POOL_SIZE", "10")),
+            http_max_retries=int(os.getenv("WP_HTTP_MAX_RETRIES", "3")),
+            http_backoff_factor=float(os.getenv("WP_HTTP_BACKOFF_FACTOR", "0.5")),
+            http_timeout=float(os.getenv("WP_HTTP_TIMEOUT", "30")),
+            wp_cli_persistent=os.getenv("WP_CLI_PERSISTENT", "").lower() in ("1", "true", "yes"),
+            ssh_pool_size=int(os.getenv("WP_SSH_POOL_SIZE", "4")),
+            ssh_channels_per_connection=int(os.getenv("WP_SSH_CHANNELS_PER_CONNECTION", "8")),
+            ssh_idle_timeout=float(os.getenv("WP_SSH_IDLE_TIMEOUT", "300")),
+            backup_workers=int(os.getenv("WP_BACKUP_WORKERS", "4")),
+            backup_remote_compression=os.getenv(
+                "WP_BACKUP_REMOTE_COMPRESSION", "true"
+            ).lower() in ("1", "true", "yes"),
+            backup_compression=os.getenv("WP_BACKUP_COMPRESSION", "zstd").lower(),
+            backup_compression_level=int(os.getenv("WP_BACKUP_COMPRESSION_LEVEL", "3")),
+            backup_transfer=os.getenv("WP_BACKUP_TRANSFER", "sftp").lower(),
+            backup_store=os.getenv("WP_BACKUP_STORE", "").lower() in ("1", "true", "yes"),
+            backup_resume_hours=float(os.getenv("WP_BACKUP_RESUME_HOURS", "24")),
+            backup_db_workers=max(1, int(os.getenv("WP_BACKUP_DB_WORKERS", "1"))),
+            backup_keep_daily=int(os.getenv("WP_BACKUP_KEEP_DAILY", "0")),
+            backup_keep_weekly=int(os.getenv("WP_BACKUP_KEEP_WEEKLY", "0")),
+            backup_keep_monthly=int(os.getenv("WP_BACKUP_KEEP_MONTHLY", "0")),
+            backup_max_bytes=int(os.getenv("WP_BACKUP_MAX_BYTES", "0")),
+            backup_exclude=tuple(
+                pattern.strip()
+                for pattern in os.getenv("WP_BACKUP_EXCLUDE", "").split(",")
+                if pattern.strip()
+            ),
+            backup_exclude_regex=os.getenv("WP_BACKUP_EXCLUDE_REGEX") or None,
+            backup_max_file_size=int(os.getenv("WP_BACKUP_MAX_FILE_SIZE", "0")),
+            backup_skip_thumbnails=os.getenv("WP_BACKUP_SKIP_THUMBNAILS", "").lower() in ("1", "true", "yes"),
+            image_audit_workers=int(os.getenv("WP_IMAGE_AUDIT_WORKERS", "8")),
+            image_host_connections=int(os.getenv("WP_IMAGE_HOST_CONNECTIONS", "6")),
+            image_encode_workers=int(os.getenv("WP_IMAGE_ENCODE_WORKERS", "0")),
+            image_cache_path=os.getenv("WP_IMAGE_CACHE", "./.image-cache/savings.json"),
         )
 
     def validate(self) -> list[str]:
@@ -69,4 +132,14 @@ class WordPressConfig:
         if self.ssh_key_path and not Path(self.ssh_key_path).exists():
             errors.append(f"SSH key not found: {self.ssh_key_path}")
 
+        if self.backup_compression not in ("zstd", "gzip", "none"):
+            errors.append("WP_BACKUP_COMPRESSION must be zstd, gzip or none")
+        if self.backup_transfer not in ("sftp", "tar"):
+            errors.append("WP_BACKUP_TRANSFER must be sftp or tar")
+        if self.backup_exclude_regex:
+            try:
+                re.compile(self.backup_exclude_regex)
+            except re.error as e:
+                errors.append(f"WP_BACKUP_EXCLUDE_REGEX is not a valid regex: {e}")
+
         return errors
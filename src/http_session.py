@@ -0,0 +1,72 @@
+"""Shared, pooled HTTP sessions for WordPress REST API traffic."""
+
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .config import WordPressConfig
+
+# Statuses worth retrying: rate limiting and transient gateway/server errors
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+_shared_sessions: dict[tuple, requests.Session] = {}
+_shared_lock = threading.Lock()
+
+
+def build_session(
+    pool_size: int = 10,
+    max_retries: int = 3,
+    backoff_factor: float = 0.5,
+) -> requests.Session:
+    """
+    Build a keep-alive session with a connection pool and retry policy.
+
+    Args:
+        pool_size: Max pooled connections per host
+        max_retries: Retries for connection errors and 429/5xx responses
+        backoff_factor: Exponential backoff base in seconds (honours Retry-After)
+
+    Returns:
+        Configured requests.Session
+    """
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        respect_retry_after_header=True,
+        # Return the final response so callers can report the WordPress error body
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_shared_session(config: WordPressConfig) -> requests.Session:
+    """
+    Get the process-wide pooled session for a site.
+
+    Clients talking to the same site share one session, so connections opened
+    by one tool call (TCP + TLS handshake) are reused by the next. Auth is
+    passed per request, never stored on the shared session.
+    """
+    key = (
+        config.site_url,
+        config.http_pool_size,
+        config.http_max_retries,
+        config.http_backoff_factor,
+    )
+
+    with _shared_lock:
+        session = _shared_sessions.get(key)
+        if session is None:
+            session = build_session(
+                pool_size=config.http_pool_size,
+                max_retries=config.http_max_retries,
+                backoff_factor=config.http_backoff_factor,
+            )
+            _shared_sessions[key] = session
+        return session
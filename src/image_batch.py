@@ -0,0 +1,279 @@
+"""Building blocks for batch image optimization."""
+
+import hashlib
+import io
+import json
+import threading
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import Iterable, Optional
+from urllib.parse import unquote, urlsplit
+from PIL import Image
+
+FORMAT_MIME_TYPES = {
+    "webp": "image/webp",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+}
+
+FORMAT_EXTENSIONS = {
+    "webp": ".webp",
+    "jpeg": ".jpg",
+    "png": ".png",
+}
+
+# Job state files in the jobs directory: <job id>.jsonl
+JOB_STATE_SUFFIX = ".jsonl"
+
+
+@dataclass
+class BatchSummary:
+    """Running totals for a batch optimization, updated as results arrive."""
+    processed: int = 0
+    optimized: int = 0
+    done_earlier: int = 0
+    not_smaller: int = 0
+    below_min_size: int = 0
+    errors: int = 0
+    original_bytes: int = 0
+    optimized_bytes: int = 0
+
+    def add(self, result: dict):
+        """Fold one optimize_batch() result into the totals."""
+        self.processed += 1
+        status = result.get("status")
+        if "error" in result:
+            self.errors += 1
+        elif status == "done earlier":
+            self.done_earlier += 1
+        elif status == "not smaller":
+            self.not_smaller += 1
+        elif status == "below min size":
+            self.below_min_size += 1
+        elif status == "optimized":
+            self.optimized += 1
+            self.original_bytes += result["original_size"]
+            self.optimized_bytes += result["optimized_size"]
+
+    def as_dict(self) -> dict:
+        saved = self.original_bytes - self.optimized_bytes
+        return {
+            "processed": self.processed,
+            "optimized": self.optimized,
+            "done_earlier": self.done_earlier,
+            "not_smaller": self.not_smaller,
+            "below_min_size": self.below_min_size,
+            "errors": self.errors,
+            "saved_kb": round(saved / 1024, 2),
+            "saved_percent": round(saved / self.original_bytes * 100, 1)
+            if self.original_bytes else 0,
+        }
+
+
+def encode_image(
+    data: bytes,
+    target_format: str = "webp",
+    quality: int = 85,
+    max_width: Optional[int] = None,
+    max_height: Optional[int] = None,
+) -> tuple[bytes, int, int]:
+    """
+    Re-encode an image file, shrinking it to fit max_width x max_height.
+
+    Runs in a worker process (see ImageOptimizer.encode_pool), so it takes
+    and returns plain bytes. WebP uses the slowest, best-compressing
+    method; alpha is dropped when no pixel uses it, and JPEG output is
+    flattened onto white. The ICC profile is kept so colors don't shift.
+
+    Args:
+        data: Original image file
+        target_format: webp, jpeg or png
+        quality: Quality for lossy formats (1-100)
+        max_width: Maximum width in pixels
+        max_height: Maximum height in pixels
+
+    Returns:
+        Tuple of (encoded image, width, height)
+    """
+    img = Image.open(io.BytesIO(data))
+    icc_profile = img.info.get("icc_profile")
+    if max_width or max_height:
+        img.thumbnail((max_width or img.width, max_height or img.height), Image.Resampling.LANCZOS)
+
+    # Keep alpha only where the image actually uses it
+    if img.mode in ("P", "LA", "PA"):
+        img = img.convert("RGBA")
+    if img.mode == "RGBA" and img.getextrema()[-1][0] == 255:
+        img = img.convert("RGB")
+    elif img.mode not in ("RGB", "RGBA", "L"):
+        img = img.convert("RGB")
+
+    save_kwargs = {"format": target_format.upper(), "quality": quality}
+    if icc_profile:
+        save_kwargs["icc_profile"] = icc_profile
+    if target_format == "webp":
+        save_kwargs["method"] = 6  # Slowest but best compression
+    else:
+        save_kwargs["optimize"] = True
+    if target_format == "jpeg" and img.mode == "RGBA":
+        # JPEG doesn't support transparency
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[-1])
+        img = background
+
+    output = io.BytesIO()
+    img.save(output, **save_kwargs)
+    return output.getvalue(), img.width, img.height
+
+
+def _stem(url: str) -> str:
+    """File name of a URL without its extension."""
+    return PurePosixPath(unquote(urlsplit(url).path)).stem
+
+
+def select_media(
+    media: Iterable[dict],
+    mime_types: Optional[Iterable[str]] = None,
+    min_size: int = 0,
+    missing_webp: bool = False,
+    exclude_ids: Iterable[int] = (),
+) -> list[dict]:
+    """
+    Pick the attachments a batch should optimize.
+
+    Args:
+        media: Media objects listed with MEDIA_FIELDS
+        mime_types: Only these MIME types (None: any image)
+        min_size: Only files of at least this many bytes. Attachments
+            without a known filesize are kept; the size is checked again
+            once they are downloaded.
+        missing_webp: Only images without a WebP attachment of the same
+            file name (photo.jpg when there is no photo.webp)
+        exclude_ids: Attachments to leave out (copies earlier batches made)
+
+    Returns:
+        Selected media objects, in library order
+    """
+    media = list(media)
+    exclude_ids = set(exclude_ids)
+    webp_stems = {
+        _stem(item.get("source_url", ""))
+        for item in media
+        if item.get("mime_type") == "image/webp"
+    }
+
+    selected = []
+    for item in media:
+        if item.get("id") in exclude_ids:
+            continue
+        if mime_types is not None and item.get("mime_type") not in mime_types:
+            continue
+        file_size = (item.get("media_details") or {}).get("filesize") or 0
+        if min_size and file_size and file_size < min_size:
+            continue
+        if missing_webp and (
+            item.get("mime_type") == "image/webp" or _stem(item.get("source_url", "")) in webp_stems
+        ):
+            continue
+        selected.append(item)
+
+    return selected
+
+
+def batch_job_id(options: dict) -> str:
+    """
+    Stable ID for a batch's options.
+
+    Running the same batch again finds the same job state, so it resumes
+    where it stopped and skips images it already optimized.
+    """
+    digest = hashlib.sha256(json.dumps(options, sort_keys=True).encode()).hexdigest()
+    return f"batch-{digest[:12]}"
+
+
+def optimized_filename(url: str, target_format: str) -> str:
+    """Name for an optimized copy: photo.jpg -> photo.webp."""
+    return _stem(url).replace('"', "") + FORMAT_EXTENSIONS[target_format]
+
+
+class BatchJobState:
+    """
+    Progress of one batch job, kept so a rerun skips finished images.
+
+    A JSON-lines file: the job's options first, then one record per
+    handled image, appended and flushed as each finishes, so a killed
+    run loses at most the images in flight. A torn last line is ignored.
+
+        {"job_id": ..., "options": {...}}
+        {"media_id": 12, "size": 48213, "result": {...}}
+    """
+
+    def __init__(self, path: Path, job_id: str, options: dict):
+        """
+        Load the job's state, creating the file if it doesn't exist.
+
+        Args:
+            path: State file
+            job_id: batch_job_id(options)
+            options: Batch options (recorded in a new file)
+        """
+        self.path = Path(path)
+        self.results: dict[int, dict] = {}
+        self._lock = threading.Lock()
+
+        if self.path.exists():
+            self.results = read_job_results(self.path)
+            with open(self.path, "rb") as f:
+                torn = f.seek(0, 2) > 0 and f.seek(-1, 2) >= 0 and f.read(1) != b"\n"
+            self._file = open(self.path, "a")
+            if torn:
+                # Make sure a torn final line can't swallow the next record
+                self._file.write("\n")
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "w")
+            self._write({"job_id": job_id, "options": options})
+
+    def _write(self, record: dict):
+        with self._lock:
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+
+    def get(self, media_id: int, size: int) -> Optional[dict]:
+        """The result for an image, unless its listed size changed since."""
+        record = self.results.get(media_id)
+        if record is None or record["size"] != size:
+            return None
+        return record["result"]
+
+    def record(self, media_id: int, size: int, result: dict):
+        """Save the result for a handled image."""
+        self.results[media_id] = {"size": size, "result": result}
+        self._write({"media_id": media_id, "size": size, "result": result})
+
+    def close(self):
+        self._file.close()
+
+
+def read_job_results(path: Path) -> dict[int, dict]:
+    """Image records of a job state file, by media ID (the last one wins)."""
+    results = {}
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if "media_id" in record:
+                results[record["media_id"]] = {"size": record["size"], "result": record["result"]}
+    return results
+
+
+def created_media_ids(jobs_dir: Path) -> set[int]:
+    """IDs of every attachment any batch job in jobs_dir uploaded."""
+    created = set()
+    for path in Path(jobs_dir).glob(f"*{JOB_STATE_SUFFIX}"):
+        for record in read_job_results(path).values():
+            if record["result"].get("new_media_id") is not None:
+                created.add(record["result"]["new_media_id"])
+    return created
@@ -1,14 +1,76 @@
 """Image optimization tools for WordPress media."""
 
+import hashlib
+import html
 import io
+import multiprocessing
 import os
+import threading
 import requests
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Literal
-from PIL import Image
+from typing import Callable, Iterable, Iterator, Optional, Literal
+from urllib.parse import urlsplit
+from PIL import Image, UnidentifiedImageError
 from dataclasses import dataclass
 
 from .config import WordPressConfig
+from .http_session import build_session
+from .image_batch import (
+    FORMAT_MIME_TYPES,
+    JOB_STATE_SUFFIX,
+    BatchJobState,
+    batch_job_id,
+    created_media_ids,
+    encode_image,
+    optimized_filename,
+    select_media,
+)
+from .image_savings import SavingsCache, trial_encode
+from .tool_executor import ToolCancelledError, check_cancelled, in_current_context
+from .wp_api import WordPressAPIClient
+
+# Probes fetch this much of an image first: enough for the header of almost
+# any PNG/GIF/WebP and of JPEGs with typical EXIF blocks
+PROBE_BYTES = 64 * 1024
+# A header not found within this many bytes isn't worth chasing further
+PROBE_MAX_BYTES = 1024 * 1024
+
+# Media fields an analysis needs; listing with these avoids a GET per image
+MEDIA_FIELDS = [
+    "id",
+    "source_url",
+    "alt_text",
+    "title",
+    "mime_type",
+    "media_details.width",
+    "media_details.height",
+    "media_details.filesize",
+]
+
+MIME_FORMATS = {
+    "image/jpeg": "JPEG",
+    "image/png": "PNG",
+    "image/gif": "GIF",
+    "image/webp": "WEBP",
+    "image/avif": "AVIF",
+    "image/bmp": "BMP",
+    "image/tiff": "TIFF",
+}
+
+
+def media_title(media_data: dict) -> str:
+    """
+    An attachment's title as plain text.
+
+    The raw title when listed with context=edit; otherwise the rendered
+    one, which WordPress has HTML-escaped (&amp; for &).
+    """
+    title = media_data.get("title") or {}
+    if "raw" in title:
+        return title["raw"]
+    return html.unescape(title.get("rendered", ""))
 
 
 @dataclass
@@ -36,13 +98,102 @@ class OptimizationResult:
     height: int
 
 
+@dataclass
+class AuditSummary:
+    """Running totals for a site image audit, updated as results arrive."""
+    total_images_analyzed: int = 0
+    missing_alt_text: int = 0
+    large_files_over_500kb: int = 0
+    total_potential_webp_savings_kb: float = 0
+    savings_measured: int = 0
+    errors: int = 0
+
+    def add(self, result: dict):
+        """Fold one analyze_wordpress_image() result (or error) into the totals."""
+        self.total_images_analyzed += 1
+        if "error" in result:
+            self.errors += 1
+            return
+        if not result.get("has_alt_text"):
+            self.missing_alt_text += 1
+        if result.get("file_size_kb", 0) > 500:
+            self.large_files_over_500kb += 1
+        self.total_potential_webp_savings_kb += result.get("estimated_webp_savings_kb", 0)
+        if result.get("savings_measured"):
+            self.savings_measured += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "total_images_analyzed": self.total_images_analyzed,
+            "missing_alt_text": self.missing_alt_text,
+            "large_files_over_500kb": self.large_files_over_500kb,
+            "total_potential_webp_savings_kb": round(self.total_potential_webp_savings_kb, 2),
+            "savings_measured": self.savings_measured,
+            "errors": self.errors,
+        }
+
+
 class ImageOptimizer:
     """Optimize images for web performance and SEO."""
 
     def __init__(self, config: WordPressConfig):
         self.config = config
-        self.session = requests.Session()
+        self.session = self._build_session()
         self.session.auth = (config.api_user, config.api_password)
+        # Image downloads may hit third-party hosts, so they get their own
+        # pooled session without WordPress credentials attached
+        self.download_session = self._build_session()
+        self._host_slots: dict[str, threading.BoundedSemaphore] = {}
+        self._host_lock = threading.Lock()
+        self.savings_cache = SavingsCache(config.image_cache_path)
+        self._encode_pool: Optional[ProcessPoolExecutor] = None
+        self._encode_pool_lock = threading.Lock()
+
+    def _build_session(self) -> requests.Session:
+        """Build a pooled keep-alive session from the HTTP config."""
+        return build_session(
+            # Enough pooled connections for the per-host limit, so parallel
+            # audits reuse connections instead of opening throwaway ones
+            pool_size=max(self.config.http_pool_size, self.config.image_host_connections),
+            max_retries=self.config.http_max_retries,
+            backoff_factor=self.config.http_backoff_factor,
+        )
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        """Semaphore limiting concurrent requests to url's host."""
+        host = urlsplit(url).netloc
+        with self._host_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.config.image_host_connections)
+                self._host_slots[host] = slot
+            return slot
+
+    def _get(self, session: requests.Session, url: str, **kwargs) -> requests.Response:
+        """GET under the per-host connection limit."""
+        with self._host_slot(url):
+            return session.get(url, **kwargs)
+
+    def encode_pool(self) -> ProcessPoolExecutor:
+        """
+        Process pool for CPU-bound encodes (created on first use).
+
+        Encoding holds the GIL for most of its run, so worker threads would
+        take turns on one core; processes use all of them. Workers are
+        spawned rather than forked, as forking a process that already runs
+        threads and holds sockets is unsafe.
+        """
+        with self._encode_pool_lock:
+            if self._encode_pool is None:
+                self._encode_pool = ProcessPoolExecutor(
+                    max_workers=self._encode_workers(),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._encode_pool
+
+    def _encode_workers(self) -> int:
+        """Size of the encode pool: configured, or one process per core."""
+        return self.config.image_encode_workers or os.cpu_count() or 1
 
     def download_image(self, url: str) -> tuple[Image.Image, ImageInfo]:
         """
@@ -54,113 +205,197 @@ class ImageOptimizer:
         Returns:
             Tuple of (PIL Image, ImageInfo)
         """
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-
-        image_data = response.content
+        image_data = self._download(url)
         img = Image.open(io.BytesIO(image_data))
 
-        info = ImageInfo(
-            url=url,
-            format=img.format or "UNKNOWN",
-            width=img.width,
-            height=img.height,
-            file_size=len(image_data),
-            file_size_kb=len(image_data) / 1024,
-            has_transparency=img.mode in ("RGBA", "LA") or (
-                img.mode == "P" and "transparency" in img.info
-            ),
-            mode=img.mode,
-        )
+        return img, self._image_info(url, img, len(image_data))
 
-        return img, info
+    def _download(self, url: str) -> bytes:
+        """The file at url."""
+        response = self._get(self.download_session, url, timeout=self.config.http_timeout)
+        response.raise_for_status()
+        return response.content
 
-    def convert_to_webp(
+    def measure_savings(
         self,
-        img: Image.Image,
+        url: str,
+        file_size: int,
+        data: Optional[bytes] = None,
         quality: int = 85,
-        lossless: bool = False
-    ) -> bytes:
+    ) -> dict:
         """
-        Convert image to WebP format.
+        Measure what re-encoding an image as WebP (and AVIF) would save.
+
+        A sample of the image is trial-encoded in the encode pool (see
+        image_savings.trial_encode). Results are cached by content hash;
+        an image whose URL and version (see _file_version()) are unchanged
+        since it was measured isn't even downloaded again.
 
         Args:
-            img: PIL Image to convert
-            quality: Quality setting (1-100), higher is better
-            lossless: Use lossless compression (larger files)
+            url: Image URL
+            file_size: Listed file size (from media_details or a probe; 0 if unknown)
+            data: The image file, if already downloaded
+            quality: Encoder quality
 
         Returns:
-            WebP image as bytes
+            trial_encode() result
         """
-        output = io.BytesIO()
-
-        # Convert RGBA to RGB if no transparency needed
-        if img.mode == "RGBA" and not self._has_alpha_channel(img):
-            img = img.convert("RGB")
-
-        save_kwargs = {
-            "format": "WEBP",
-            "quality": quality,
-        }
-
-        if lossless:
-            save_kwargs["lossless"] = True
-        else:
-            save_kwargs["method"] = 6  # Slowest but best compression
-
-        img.save(output, **save_kwargs)
-        return output.getvalue()
+        version = self._file_version(url, file_size)
+        if data is None:
+            if version is not None:
+                cached = self.savings_cache.lookup_url(url, version, quality)
+                if cached is not None:
+                    return cached
+            data = self._download(url)
+
+        sha256 = hashlib.sha256(data).hexdigest()
+        result = self.savings_cache.lookup_hash(sha256, quality)
+        if result is None:
+            result = self.encode_pool().submit(trial_encode, data, quality).result()
+        self.savings_cache.put(url, version, sha256, quality, result)
+        return result
+
+    def _file_version(self, url: str, file_size: int) -> Optional[str]:
+        """
+        Identify the file at url without downloading it.
 
-    def compress_image(
-        self,
-        img: Image.Image,
-        format: Optional[str] = None,
-        quality: int = 85,
-        max_width: Optional[int] = None,
-        max_height: Optional[int] = None
-    ) -> bytes:
+        The listed size when known, else the ETag or Last-Modified of a
+        HEAD request; None if the server sends neither.
+        """
+        if file_size:
+            return f"size:{file_size}"
+        try:
+            with self._host_slot(url):
+                response = self.download_session.head(
+                    url, allow_redirects=True, timeout=self.config.http_timeout
+                )
+        except requests.RequestException:
+            return None
+        if not response.ok:
+            return None
+        for header in ("ETag", "Last-Modified"):
+            value = response.headers.get(header)
+            if value:
+                return f"{header.lower()}:{value}"
+        return None
+
+    def probe_image(self, url: str, media_data: Optional[dict] = None) -> ImageInfo:
         """
-        Compress image while maintaining format.
+        Read an image's format, dimensions and mode without downloading it.
+
+        Only the first PROBE_BYTES are requested (an HTTP Range request,
+        retried with a larger range if the header runs past it) and parsed
+        lazily by Pillow, which reads headers without decoding pixels. The
+        file size comes from Content-Range or Content-Length, with a HEAD
+        request as fallback. If probing fails, the attachment's
+        media_details from the WordPress media endpoint are used instead.
 
         Args:
-            img: PIL Image to compress
-            format: Output format (JPEG, PNG, WebP) - uses original if None
-            quality: Quality setting for lossy formats
-            max_width: Resize if wider than this
-            max_height: Resize if taller than this
+            url: Image URL
+            media_data: The attachment's /wp/v2/media object, if fetched
 
         Returns:
-            Compressed image as bytes
+            ImageInfo
         """
-        # Resize if needed
-        if max_width or max_height:
-            img = self._resize_image(img, max_width, max_height)
-
-        # Determine output format
-        output_format = format or img.format or "JPEG"
-
-        # Convert mode if needed
-        if output_format == "JPEG" and img.mode in ("RGBA", "LA", "P"):
-            # JPEG doesn't support transparency
-            rgb_img = Image.new("RGB", img.size, (255, 255, 255))
-            if img.mode == "P":
-                img = img.convert("RGBA")
-            rgb_img.paste(img, mask=img.split()[-1] if img.mode == "RGBA" else None)
-            img = rgb_img
-
-        output = io.BytesIO()
-
-        save_kwargs = {"format": output_format}
-
-        if output_format in ("JPEG", "WEBP"):
-            save_kwargs["quality"] = quality
-            save_kwargs["optimize"] = True
-
-        if output_format == "PNG":
-            save_kwargs["optimize"] = True
+        limit = PROBE_BYTES
+        try:
+            while True:
+                data, file_size = self._fetch_prefix(url, limit)
+                try:
+                    img = Image.open(io.BytesIO(data))
+                    break
+                except (UnidentifiedImageError, OSError):
+                    # Truncated before the end of the header, or not an image
+                    if len(data) < limit or limit >= PROBE_MAX_BYTES:
+                        raise
+                    limit *= 4
+        except (requests.RequestException, OSError):
+            info = self._info_from_media_details(url, media_data)
+            if info is None:
+                raise
+            return info
+
+        if file_size is None:
+            file_size = self._head_size(url)
+        if file_size is None and media_data:
+            file_size = media_data.get("media_details", {}).get("filesize")
+
+        return self._image_info(url, img, file_size or 0)
+
+    def _fetch_prefix(self, url: str, limit: int) -> tuple[bytes, Optional[int]]:
+        """First `limit` bytes of url and the full size, if the response tells."""
+        headers = {"Range": f"bytes=0-{limit - 1}"}
+        with self._host_slot(url):
+            with self.download_session.get(
+                url, headers=headers, stream=True, timeout=self.config.http_timeout
+            ) as response:
+                response.raise_for_status()
+                data = bytearray()
+                for chunk in response.iter_content(16 * 1024):
+                    data += chunk
+                    if len(data) >= limit:
+                        break
+                complete = len(data) < limit
+
+                if response.status_code == 206:
+                    total = response.headers.get("Content-Range", "").rpartition("/")[2]
+                    file_size = int(total) if total.isdigit() else None
+                elif complete:
+                    # The server ignored Range and we read the whole file
+                    file_size = len(data)
+                elif "Content-Encoding" not in response.headers:
+                    length = response.headers.get("Content-Length", "")
+                    file_size = int(length) if length.isdigit() else None
+                else:
+                    file_size = None
+
+        return bytes(data[:limit]), file_size
+
+    def _head_size(self, url: str) -> Optional[int]:
+        """File size from a HEAD request's Content-Length, if any."""
+        try:
+            with self._host_slot(url):
+                response = self.download_session.head(
+                    url, allow_redirects=True, timeout=self.config.http_timeout
+                )
+        except requests.RequestException:
+            return None
+        length = response.headers.get("Content-Length", "")
+        return int(length) if response.ok and length.isdigit() else None
+
+    def _info_from_media_details(self, url: str, media_data: Optional[dict]) -> Optional[ImageInfo]:
+        """ImageInfo from WordPress attachment metadata (no pixel data: mode unknown)."""
+        details = (media_data or {}).get("media_details") or {}
+        if not details.get("width") or not details.get("height"):
+            return None
+
+        mime_type = media_data.get("mime_type", "")
+        file_size = details.get("filesize") or 0
+        return ImageInfo(
+            url=url,
+            format=MIME_FORMATS.get(mime_type) or mime_type.partition("/")[2].upper() or "UNKNOWN",
+            width=details["width"],
+            height=details["height"],
+            file_size=file_size,
+            file_size_kb=file_size / 1024,
+            has_transparency=False,
+            mode="unknown",
+        )
 
-        img.save(output, **save_kwargs)
-        return output.getvalue()
+    def _image_info(self, url: str, img: Image.Image, file_size: int) -> ImageInfo:
+        """ImageInfo for an opened (not necessarily decoded) image."""
+        return ImageInfo(
+            url=url,
+            format=img.format or "UNKNOWN",
+            width=img.width,
+            height=img.height,
+            file_size=file_size,
+            file_size_kb=file_size / 1024,
+            has_transparency=img.mode in ("RGBA", "LA") or (
+                img.mode == "P" and "transparency" in img.info
+            ),
+            mode=img.mode,
+        )
 
     def optimize_image(
         self,
@@ -173,6 +408,10 @@ class ImageOptimizer:
         """
         Download and optimize an image.
 
+        The encode runs in the encode pool, so CPU-heavy encodes from
+        concurrent calls spread over all cores. The image is shrunk to fit
+        max_width x max_height whatever the target format.
+
         Args:
             url: Image URL to optimize
             target_format: Desired output format (auto = choose best)
@@ -183,7 +422,8 @@ class ImageOptimizer:
         Returns:
             Tuple of (optimized image bytes, optimization result)
         """
-        img, info = self.download_image(url)
+        image_data = self._download(url)
+        info = self._image_info(url, Image.open(io.BytesIO(image_data)), len(image_data))
 
         # Auto-select format
         if target_format == "auto":
@@ -194,16 +434,9 @@ class ImageOptimizer:
                 target_format = "webp"  # WebP is generally better than JPEG
 
         # Optimize
-        if target_format == "webp":
-            optimized_data = self.convert_to_webp(img, quality=quality)
-        else:
-            optimized_data = self.compress_image(
-                img,
-                format=target_format.upper(),
-                quality=quality,
-                max_width=max_width,
-                max_height=max_height
-            )
+        optimized_data, width, height = self.encode_pool().submit(
+            encode_image, image_data, target_format, quality, max_width, max_height
+        ).result()
 
         # Calculate savings
         result = OptimizationResult(
@@ -213,42 +446,87 @@ class ImageOptimizer:
             savings_percent=((info.file_size - len(optimized_data)) / info.file_size * 100)
             if info.file_size > 0 else 0,
             format=target_format,
-            width=img.width,
-            height=img.height,
+            width=width,
+            height=height,
         )
 
         return optimized_data, result
 
-    def analyze_wordpress_image(self, media_id: int) -> dict:
+    def analyze_wordpress_image(
+        self,
+        media_id: int,
+        media_data: Optional[dict] = None,
+        check_transparency: bool = False,
+        measure_savings: bool = False,
+    ) -> dict:
         """
         Analyze a WordPress media library image.
 
+        By default nothing is downloaded: format, dimensions and file size
+        come from the attachment's media_details. The image header is
+        probed only for what the metadata lacks (e.g. filesize on sites
+        older than WordPress 6.0), and the full image only when
+        check_transparency asks whether its alpha channel is actually used.
+
+        WebP savings are a flat 30% estimate unless measure_savings is set;
+        then they come from a trial encode (see measure_savings()), which
+        downloads images not measured before.
+
         Args:
             media_id: WordPress media attachment ID
+            media_data: The attachment's /wp/v2/media object with at least
+                MEDIA_FIELDS, if already fetched (saves a request)
+            check_transparency: Download the pixels to check transparency
+            measure_savings: Trial-encode to measure WebP/AVIF savings
 
         Returns:
             Analysis including size, format, alt text, optimization potential
         """
-        # Get media details from WordPress API
-        url = f"{self.config.site_url.rstrip('/')}/wp-json/wp/v2/media/{media_id}"
-        response = self.session.get(url, timeout=30)
-        response.raise_for_status()
-
-        media_data = response.json()
+        if media_data is None:
+            # Get media details from WordPress API
+            url = f"{self.config.site_url.rstrip('/')}/wp-json/wp/v2/media/{media_id}"
+            response = self._get(self.session, url, timeout=30)
+            response.raise_for_status()
+            media_data = response.json()
 
         # Get image URL
         image_url = media_data.get("source_url", "")
         alt_text = media_data.get("alt_text", "")
-        title = media_data.get("title", {}).get("rendered", "")
-
-        # Download and analyze
-        img, info = self.download_image(image_url)
-
-        # Estimate WebP savings (rough estimate: 25-35% smaller)
-        estimated_webp_size = info.file_size * 0.70
-        estimated_savings = info.file_size - estimated_webp_size
+        title = media_title(media_data)
+
+        info = self._info_from_media_details(image_url, media_data)
+        image_data = None
+        if check_transparency:
+            image_data = self._download(image_url)
+            img = Image.open(io.BytesIO(image_data))
+            info = self._image_info(image_url, img, len(image_data))
+            info.has_transparency = info.has_transparency and (
+                img.mode != "RGBA" or self._has_alpha_channel(img)
+            )
+            inspected = "pixels"
+        elif info is None:
+            info = self.probe_image(image_url, media_data)
+            inspected = "header"
+        else:
+            inspected = "metadata"
+            if not info.file_size:
+                info.file_size = self._head_size(image_url) or 0
+                info.file_size_kb = info.file_size / 1024
+
+        measured = None
+        if measure_savings:
+            measured = self.measure_savings(image_url, info.file_size, image_data)
+            estimated_webp_size = measured["estimated_webp_size"]
+        else:
+            # Rough estimate: 25-35% smaller
+            estimated_webp_size = info.file_size * 0.70
+        # Nothing to gain if the re-encode comes out larger
+        estimated_savings = max(0, info.file_size - estimated_webp_size)
+        savings_percent = (
+            round(estimated_savings / info.file_size * 100, 1) if info.file_size else 0
+        )
 
-        return {
+        result = {
             "media_id": media_id,
             "url": image_url,
             "title": title,
@@ -257,39 +535,257 @@ class ImageOptimizer:
             "current_format": info.format,
             "dimensions": f"{info.width}x{info.height}",
             "file_size_kb": round(info.file_size_kb, 2),
-            "has_transparency": info.has_transparency,
-            "recommendations": self._get_image_recommendations(info, alt_text),
+            "has_transparency": info.has_transparency if inspected != "metadata" else None,
+            "inspected": inspected,
+            "recommendations": self._get_image_recommendations(
+                info, alt_text, savings_percent if measured else None
+            ),
             "estimated_webp_savings_kb": round(estimated_savings / 1024, 2),
-            "estimated_webp_savings_percent": 30,
+            "estimated_webp_savings_percent": savings_percent,
+            "savings_measured": measured is not None,
         }
+        if measured and "estimated_avif_size" in measured:
+            avif_savings = max(0, info.file_size - measured["estimated_avif_size"])
+            result["estimated_avif_savings_kb"] = round(avif_savings / 1024, 2)
+            result["estimated_avif_savings_percent"] = (
+                round(avif_savings / info.file_size * 100, 1) if info.file_size else 0
+            )
+
+        return result
+
+    def audit_images(
+        self,
+        media: Iterable[dict],
+        workers: Optional[int] = None,
+        check_transparency: bool = False,
+        measure_savings: bool = False,
+    ) -> Iterator[dict]:
+        """
+        Analyze many media library images concurrently.
+
+        Images are analyzed by a pool of worker threads (requests to any one
+        host stay under image_host_connections) and results are yielded in
+        the order of `media` as soon as each is ready, so a caller can
+        aggregate while later images are still being fetched. `media` is
+        consumed lazily, a bounded number ahead of the results. A failed
+        image yields {"media_id", "error"} instead of stopping the audit.
+
+        Args:
+            media: Media objects listed with MEDIA_FIELDS
+            workers: Concurrent analyses (defaults to image_audit_workers)
+            check_transparency: See analyze_wordpress_image()
+            measure_savings: See analyze_wordpress_image(); the trial
+                encodes run in the encode pool while threads download
+
+        Yields:
+            analyze_wordpress_image() results, in input order
+        """
+        try:
+            yield from self._map_media(
+                lambda media_data: self.analyze_wordpress_image(
+                    media_data["id"], media_data, check_transparency, measure_savings
+                ),
+                media,
+                workers or self.config.image_audit_workers,
+                "image-audit",
+            )
+        finally:
+            self.savings_cache.flush()
 
-    def _resize_image(
+    def optimize_batch(
         self,
-        img: Image.Image,
-        max_width: Optional[int],
-        max_height: Optional[int]
-    ) -> Image.Image:
-        """Resize image maintaining aspect ratio."""
-        if not max_width and not max_height:
-            return img
+        api: WordPressAPIClient,
+        mime_types: Optional[Iterable[str]] = ("image/jpeg", "image/png"),
+        min_size: int = 0,
+        missing_webp: bool = False,
+        limit: Optional[int] = None,
+        target_format: Literal["webp", "jpeg", "png"] = "webp",
+        quality: int = 85,
+        max_width: int = 2048,
+        max_height: int = 2048,
+        workers: Optional[int] = None,
+    ) -> Iterator[dict]:
+        """
+        Optimize media library images and upload the results as new attachments.
+
+        Selected images (see image_batch.select_media) are downloaded by
+        worker threads, encoded in the encode pool and uploaded through
+        the REST media endpoint, the stages of different images
+        overlapping. An optimized copy keeps the original's title, alt
+        text and parent post. Copies that aren't smaller are not uploaded.
 
-        width, height = img.size
+        The originals are not replaced, and posts keep using them: the
+        REST API has no way to swap an attachment's file. Results map
+        each original to its copy (new_media_id, new_url) for a follow-up
+        search-replace. Copies made by any batch are never selected again.
 
-        # Calculate new dimensions
-        if max_width and width > max_width:
-            ratio = max_width / width
-            width = max_width
-            height = int(height * ratio)
+        Progress is saved in a job state file (image_batch.BatchJobState)
+        keyed by the batch options: running the same batch again (after a
+        crash, a cancel or new uploads) skips images already handled
+        unless their file size changed. Failed images are retried on the
+        next run.
+
+        Args:
+            api: Client used to list and upload media
+            mime_types: Only images of these types (None: any)
+            min_size: Only images of at least this many bytes
+            missing_webp: Only images without a WebP of the same file name
+            limit: Process at most this many images not handled before
+            target_format: Output format
+            quality: Quality for lossy formats (1-100)
+            max_width: Maximum width in pixels
+            max_height: Maximum height in pixels
+            workers: Concurrent images (defaults to image_audit_workers, and
+                at least two per encode process to keep them busy)
+
+        Yields:
+            Per-image results with a "status" ("optimized", "not smaller",
+            "below min size", "done earlier") or an "error", in library order
+        """
+        options = {
+            "mime_types": sorted(mime_types) if mime_types is not None else None,
+            "min_size": min_size,
+            "missing_webp": missing_webp,
+            "target_format": target_format,
+            "quality": quality,
+            "max_width": max_width,
+            "max_height": max_height,
+        }
+        job_id = batch_job_id(options)
+        # Read before this job's file is opened, which may be new and empty
+        created = created_media_ids(self.jobs_dir)
+        state = BatchJobState(self.jobs_dir / f"{job_id}{JOB_STATE_SUFFIX}", job_id, options)
+
+        media = select_media(
+            # Edit context, so titles are copied raw rather than HTML-escaped
+            api.iter_media(media_type="image", fields=MEDIA_FIELDS + ["post"], context="edit"),
+            mime_types, min_size, missing_webp, exclude_ids=created,
+        )
 
-        if max_height and height > max_height:
-            ratio = max_height / height
-            height = max_height
-            width = int(width * ratio)
+        def todo() -> Iterator[dict]:
+            """Selected media, with `limit` counting only images not done yet."""
+            remaining = limit
+            for media_data in media:
+                if self._batch_done(state, media_data) is None:
+                    if remaining is not None and remaining <= 0:
+                        continue
+                    if remaining is not None:
+                        remaining -= 1
+                yield media_data
+
+        def optimize(media_data: dict) -> dict:
+            done = self._batch_done(state, media_data)
+            if done is not None:
+                return {**done, "status": "done earlier"}
+            result = self._optimize_media(api, media_data, options)
+            state.record(media_data["id"], self._listed_size(media_data), result)
+            return result
+
+        workers = max(workers or self.config.image_audit_workers, 2 * self._encode_workers())
+        try:
+            for result in self._map_media(optimize, todo(), workers, "image-batch"):
+                yield {"job_id": job_id, **result}
+        finally:
+            state.close()
+
+    @property
+    def jobs_dir(self) -> Path:
+        """Where batch job state is kept (next to the savings cache)."""
+        return Path(self.config.image_cache_path).parent / "jobs"
+
+    @staticmethod
+    def _listed_size(media_data: dict) -> int:
+        return (media_data.get("media_details") or {}).get("filesize") or 0
+
+    def _batch_done(self, state: BatchJobState, media_data: dict) -> Optional[dict]:
+        """The saved result for an image, unless it changed since."""
+        return state.get(media_data["id"], self._listed_size(media_data))
+
+    def _optimize_media(self, api: WordPressAPIClient, media_data: dict, options: dict) -> dict:
+        """Download, encode and upload one image for optimize_batch()."""
+        media_id = media_data["id"]
+        url = media_data.get("source_url", "")
+        result = {"media_id": media_id, "url": url}
+
+        check_cancelled()
+        image_data = self._download(url)
+        result["original_size"] = len(image_data)
+        if len(image_data) < options["min_size"]:
+            return {**result, "status": "below min size"}
+
+        target_format = options["target_format"]
+        optimized_data, width, height = self.encode_pool().submit(
+            encode_image,
+            image_data,
+            target_format,
+            options["quality"],
+            options["max_width"],
+            options["max_height"],
+        ).result()
+        result["optimized_size"] = len(optimized_data)
+        if len(optimized_data) >= len(image_data):
+            return {**result, "status": "not smaller"}
+
+        check_cancelled()
+        fields = {
+            "title": media_title(media_data),
+            "alt_text": media_data.get("alt_text", ""),
+        }
+        if media_data.get("post"):
+            fields["post"] = media_data["post"]
+        uploaded = api.upload_media(
+            optimized_filename(url, target_format),
+            optimized_data,
+            FORMAT_MIME_TYPES[target_format],
+            fields,
+        )
+        return {
+            **result,
+            "status": "optimized",
+            "dimensions": f"{width}x{height}",
+            "savings_percent": round((1 - len(optimized_data) / len(image_data)) * 100, 1),
+            "new_media_id": uploaded.get("id"),
+            "new_url": uploaded.get("source_url"),
+        }
 
-        if (width, height) != img.size:
-            img = img.resize((width, height), Image.Resampling.LANCZOS)
+    def _map_media(
+        self,
+        func: Callable[[dict], dict],
+        media: Iterable[dict],
+        workers: int,
+        thread_name_prefix: str,
+    ) -> Iterator[dict]:
+        """
+        Run func over media objects in worker threads, yielding results in order.
 
-        return img
+        `media` is consumed lazily, a bounded number ahead of the results.
+        A failed item yields {"media_id", "error"} instead of stopping the run.
+        """
+        workers = max(1, workers)
+        pending: deque[tuple[int, Future]] = deque()
+
+        with ThreadPoolExecutor(workers, thread_name_prefix=thread_name_prefix) as executor:
+            try:
+                for media_data in media:
+                    future = executor.submit(in_current_context(func), media_data)
+                    pending.append((media_data["id"], future))
+                    if len(pending) >= workers * 2:
+                        yield self._media_result(*pending.popleft())
+                while pending:
+                    yield self._media_result(*pending.popleft())
+            finally:
+                # Stopped early (cancelled, or the caller stopped iterating)
+                for _, future in pending:
+                    future.cancel()
+
+    def _media_result(self, media_id: int, future: Future) -> dict:
+        """Wait for one media task; failures become error entries."""
+        try:
+            return future.result()
+        except ToolCancelledError:
+            raise
+        except Exception as e:
+            return {"media_id": media_id, "error": str(e)}
 
     def _has_alpha_channel(self, img: Image.Image) -> bool:
         """Check if image actually uses transparency."""
@@ -300,15 +796,25 @@ class ImageOptimizer:
         alpha = img.split()[-1]
         return alpha.getextrema()[0] < 255
 
-    def _get_image_recommendations(self, info: ImageInfo, alt_text: str) -> list[str]:
-        """Generate optimization recommendations."""
+    def _get_image_recommendations(
+        self,
+        info: ImageInfo,
+        alt_text: str,
+        webp_savings_percent: Optional[float] = None,
+    ) -> list[str]:
+        """Generate optimization recommendations (webp_savings_percent: measured, if known)."""
         recommendations = []
 
         # Format recommendations
         if info.format in ("PNG", "JPEG") and not info.has_transparency:
-            recommendations.append(
-                f"Convert from {info.format} to WebP for ~30% file size reduction"
-            )
+            if webp_savings_percent is None:
+                recommendations.append(
+                    f"Convert from {info.format} to WebP for ~30% file size reduction"
+                )
+            elif webp_savings_percent >= 10:
+                recommendations.append(
+                    f"Convert from {info.format} to WebP for {webp_savings_percent:.0f}% file size reduction"
+                )
 
         # Size recommendations
         if info.file_size_kb > 500:
@@ -0,0 +1,164 @@
+"""Measured re-encoding savings from sampled trial encodes."""
+
+import io
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+from PIL import Image, features
+
+# Side of the square tiles cut from the image at full resolution. Tiles keep
+# the real detail density, which a downscaled copy would not.
+SAMPLE_TILE = 256
+# Up to GRID x GRID tiles, spread evenly over the image
+SAMPLE_GRID = 2
+
+CACHE_VERSION = 2
+# Between explicit flushes, new results are written at most this often
+CACHE_SAVE_INTERVAL = 10
+
+
+def _sample(img: Image.Image) -> Image.Image:
+    """A mosaic of full-resolution tiles (or the image itself if it's small)."""
+    grid_x = min(SAMPLE_GRID, img.width // SAMPLE_TILE)
+    grid_y = min(SAMPLE_GRID, img.height // SAMPLE_TILE)
+    if grid_x * grid_y < 2:
+        return img
+
+    mosaic = Image.new(img.mode, (grid_x * SAMPLE_TILE, grid_y * SAMPLE_TILE))
+    for i in range(grid_x):
+        for j in range(grid_y):
+            # Tile centers at 1/4, 3/4 (for a 2x2 grid) of each axis
+            left = int((i + 0.5) * img.width / grid_x - SAMPLE_TILE / 2)
+            top = int((j + 0.5) * img.height / grid_y - SAMPLE_TILE / 2)
+            tile = img.crop((left, top, left + SAMPLE_TILE, top + SAMPLE_TILE))
+            mosaic.paste(tile, (i * SAMPLE_TILE, j * SAMPLE_TILE))
+    return mosaic
+
+
+def trial_encode(data: bytes, quality: int = 85) -> dict:
+    """
+    Estimate an image's size as WebP (and AVIF, if Pillow supports it).
+
+    Runs in a worker process. A sample of the image is encoded and its
+    bytes per pixel are extrapolated to the full image.
+
+    Args:
+        data: Original image file
+        quality: Encoder quality (as image_batch.encode_image)
+
+    Returns:
+        dict with the pixel counts and estimated_<format>_size per format
+    """
+    img = Image.open(io.BytesIO(data))
+    if img.mode in ("P", "LA", "PA") or (img.mode == "RGBA" and img.getextrema()[-1][0] < 255):
+        img = img.convert("RGBA")
+    else:
+        img = img.convert("RGB")
+
+    sample = _sample(img)
+    pixels = img.width * img.height
+    sample_pixels = sample.width * sample.height
+    result = {
+        "pixels": pixels,
+        "sample_pixels": sample_pixels,
+        "quality": quality,
+    }
+
+    encoders = {"webp": {"format": "WEBP", "quality": quality, "method": 6}}
+    if features.check("avif"):
+        encoders["avif"] = {"format": "AVIF", "quality": quality}
+
+    for name, options in encoders.items():
+        output = io.BytesIO()
+        sample.save(output, **options)
+        bytes_per_pixel = len(output.getvalue()) / sample_pixels
+        result[f"{name}_bytes_per_pixel"] = round(bytes_per_pixel, 4)
+        result[f"estimated_{name}_size"] = int(bytes_per_pixel * pixels)
+
+    return result
+
+
+class SavingsCache:
+    """
+    Trial-encode results, persisted as JSON.
+
+    Results are keyed by the image's sha256 (and encoder quality), so a
+    file re-uploaded under another URL is not encoded again. A URL index
+    maps each URL to its hash and a version string for the file there
+    (its size, or an HTTP validator), so an unchanged image is answered
+    without downloading it at all.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Initialize the cache.
+
+        Args:
+            path: JSON file (created on first save)
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._data: Optional[dict] = None
+        self._dirty = False
+        self._saved_at = float("-inf")
+
+    def _load(self) -> dict:
+        if self._data is None:
+            try:
+                with open(self.path) as f:
+                    data = json.load(f)
+                if data.get("version") != CACHE_VERSION:
+                    raise ValueError("old cache format")
+            except (FileNotFoundError, ValueError):
+                data = {"version": CACHE_VERSION, "by_hash": {}, "by_url": {}}
+            self._data = data
+        return self._data
+
+    def lookup_url(self, url: str, version: str, quality: int) -> Optional[dict]:
+        """The result for url if the file there is still this version."""
+        with self._lock:
+            data = self._load()
+            entry = data["by_url"].get(url)
+            if entry is None or entry["version"] != version:
+                return None
+            return data["by_hash"].get(f"{entry['sha256']}:{quality}")
+
+    def lookup_hash(self, sha256: str, quality: int) -> Optional[dict]:
+        """The result for an image's content hash."""
+        with self._lock:
+            return self._load()["by_hash"].get(f"{sha256}:{quality}")
+
+    def put(self, url: str, version: Optional[str], sha256: str, quality: int, result: dict):
+        """
+        Record a result; saved now if the last save was a while ago.
+
+        The URL is only indexed when the file's version is known, i.e.
+        the same version lookup_url() will be asked with later.
+        """
+        with self._lock:
+            data = self._load()
+            data["by_hash"][f"{sha256}:{quality}"] = result
+            if version is not None:
+                data["by_url"][url] = {"version": version, "sha256": sha256}
+            self._dirty = True
+            if time.monotonic() - self._saved_at >= CACHE_SAVE_INTERVAL:
+                self._save()
+
+    def flush(self):
+        """Write the cache if anything changed."""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def _save(self):
+        """Replace the cache file atomically (lock held)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._data, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+        self._saved_at = time.monotonic()
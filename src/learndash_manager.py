@@ -45,16 +45,19 @@ class LearnDashManager:
         course_id = result if isinstance(result, int) else int(result)
 
         # Set course meta
+        meta_commands = []
         if price is not None:
-            self.cli.execute(
+            meta_commands.append(
                 f'post meta update {course_id} _sfwd-courses "_sfwd-courses[sfwd-courses_course_price]" {price}'
             )
 
         if certificate_id:
-            self.cli.execute(
+            meta_commands.append(
                 f'post meta update {course_id} _sfwd-courses "_sfwd-courses[sfwd-courses_certificate]" {certificate_id}'
             )
 
+        self.cli.execute_batch(meta_commands, check=True)
+
         return {
             "id": course_id,
             "title": title,
@@ -85,6 +88,7 @@ class LearnDashManager:
             Updated course data
         """
         updates = []
+        commands = []
 
         if title:
             updates.append(f'--post_title="{title}"')
@@ -94,14 +98,15 @@ class LearnDashManager:
             updates.append(f'--post_status={status}')
 
         if updates:
-            cmd = f'post update {course_id} {" ".join(updates)}'
-            self.cli.execute(cmd)
+            commands.append(f'post update {course_id} {" ".join(updates)}')
 
         if price is not None:
-            self.cli.execute(
+            commands.append(
                 f'post meta update {course_id} _sfwd-courses "_sfwd-courses[sfwd-courses_course_price]" {price}'
             )
 
+        self.cli.execute_batch(commands, check=True)
+
         return {"id": course_id, "updated": True}
 
     def list_courses(self, status: str = "any", limit: int = 50) -> list[dict]:
@@ -171,18 +176,16 @@ class LearnDashManager:
         lesson_id = result if isinstance(result, int) else int(result)
 
         # Associate with course
-        self.cli.execute(
-            f'post meta update {lesson_id} course_id {course_id}'
-        )
-        self.cli.execute(
-            f'post meta update {lesson_id} ld_course_{course_id} {course_id}'
-        )
+        meta_commands = [
+            f'post meta update {lesson_id} course_id {course_id}',
+            f'post meta update {lesson_id} ld_course_{course_id} {course_id}',
+        ]
 
         # Set order if provided
         if order is not None:
-            self.cli.execute(
-                f'post meta update {lesson_id} lesson_order {order}'
-            )
+            meta_commands.append(f'post meta update {lesson_id} lesson_order {order}')
+
+        self.cli.execute_batch(meta_commands, check=True)
 
         return {
             "id": lesson_id,
@@ -201,6 +204,7 @@ class LearnDashManager:
     ) -> dict:
         """Update lesson details."""
         updates = []
+        commands = []
 
         if title:
             updates.append(f'--post_title="{title}"')
@@ -208,11 +212,12 @@ class LearnDashManager:
             updates.append(f'--post_content="{content}"')
 
         if updates:
-            cmd = f'post update {lesson_id} {" ".join(updates)}'
-            self.cli.execute(cmd)
+            commands.append(f'post update {lesson_id} {" ".join(updates)}')
 
         if order is not None:
-            self.cli.execute(f'post meta update {lesson_id} lesson_order {order}')
+            commands.append(f'post meta update {lesson_id} lesson_order {order}')
+
+        self.cli.execute_batch(commands, check=True)
 
         return {"id": lesson_id, "updated": True}
 
@@ -255,21 +260,23 @@ class LearnDashManager:
         quiz_id = result if isinstance(result, int) else int(result)
 
         # Set quiz meta
-        self.cli.execute(f'post meta update {quiz_id} course_id {course_id}')
+        meta_commands = [f'post meta update {quiz_id} course_id {course_id}']
 
         if lesson_id:
-            self.cli.execute(f'post meta update {quiz_id} lesson_id {lesson_id}')
+            meta_commands.append(f'post meta update {quiz_id} lesson_id {lesson_id}')
 
         # Set passing score
-        self.cli.execute(
+        meta_commands.append(
             f'post meta update {quiz_id} _sfwd-quiz "_sfwd-quiz[sfwd-quiz_passingpercentage]" {passing_score}'
         )
 
         if certificate_id:
-            self.cli.execute(
+            meta_commands.append(
                 f'post meta update {quiz_id} _sfwd-quiz "_sfwd-quiz[sfwd-quiz_certificate]" {certificate_id}'
             )
 
+        self.cli.execute_batch(meta_commands, check=True)
+
         return {
             "id": quiz_id,
             "title": title,
@@ -311,22 +318,19 @@ class LearnDashManager:
         result = self.cli.execute(cmd, format="json")
         question_id = result if isinstance(result, int) else int(result)
 
-        # Associate with quiz
-        self.cli.execute(f'post meta update {question_id} quiz_id {quiz_id}')
-
-        # Set question type
         type_map = {
             "single": "single",
             "multiple": "multiple",
             "free_answer": "free_answer",
             "essay": "essay_text",
         }
-        self.cli.execute(
-            f'post meta update {question_id} question_type {type_map[question_type]}'
-        )
 
-        # Set points
-        self.cli.execute(f'post meta update {question_id} question_points {points}')
+        # Associate with quiz, set question type and points
+        self.cli.execute_batch([
+            f'post meta update {question_id} quiz_id {quiz_id}',
+            f'post meta update {question_id} question_type {type_map[question_type]}',
+            f'post meta update {question_id} question_points {points}',
+        ], check=True)
 
         # Add answers if provided
         if answers and question_type in ["single", "multiple"]:
@@ -355,14 +359,11 @@ class LearnDashManager:
         Returns:
             Enrollment confirmation
         """
-        # LearnDash stores enrollments in user meta
-        self.cli.execute(
-            f'user meta add {user_id} course_enrolled_{course_id} {course_id}'
-        )
-
-        # Also update course user list
-        cmd = f'post meta add {course_id} learndash_course_users {user_id}'
-        self.cli.execute(cmd)
+        # LearnDash stores enrollments in user meta; also update course user list
+        self.cli.execute_batch([
+            f'user meta add {user_id} course_enrolled_{course_id} {course_id}',
+            f'post meta add {course_id} learndash_course_users {user_id}',
+        ], check=True)
 
         return {
             "user_id": user_id,
@@ -381,12 +382,10 @@ class LearnDashManager:
         Returns:
             Unenrollment confirmation
         """
-        self.cli.execute(
-            f'user meta delete {user_id} course_enrolled_{course_id}'
-        )
-        self.cli.execute(
-            f'post meta delete {course_id} learndash_course_users {user_id}'
-        )
+        self.cli.execute_batch([
+            f'user meta delete {user_id} course_enrolled_{course_id}',
+            f'post meta delete {course_id} learndash_course_users {user_id}',
+        ], check=True)
 
         return {
             "user_id": user_id,
@@ -414,12 +413,8 @@ class LearnDashManager:
             if m['meta_key'].startswith('course_enrolled_')
         ]
 
-        courses = []
-        for cid in course_ids:
-            course_data = self.cli.get_post(cid)
-            courses.append(course_data)
-
-        return courses
+        results = self.cli.execute_batch([f'post get {cid}' for cid in course_ids], check=True)
+        return [r.output for r in results]
 
     def get_course_students(self, course_id: int) -> list[dict]:
         """
@@ -467,10 +462,10 @@ class LearnDashManager:
 
         # Associate courses
         if course_ids:
-            for course_id in course_ids:
-                self.cli.execute(
-                    f'post meta add {group_id} learndash_group_enrolled_{course_id} {course_id}'
-                )
+            self.cli.execute_batch([
+                f'post meta add {group_id} learndash_group_enrolled_{course_id} {course_id}'
+                for course_id in course_ids
+            ], check=True)
 
         return {
             "id": group_id,
@@ -481,11 +476,9 @@ class LearnDashManager:
 
     def add_user_to_group(self, user_id: int, group_id: int) -> dict:
         """Add user to a LearnDash group."""
-        self.cli.execute(
-            f'user meta add {user_id} learndash_group_users_{group_id} {group_id}'
-        )
-        self.cli.execute(
-            f'post meta add {group_id} learndash_group_users {user_id}'
-        )
+        self.cli.execute_batch([
+            f'user meta add {user_id} learndash_group_users_{group_id} {group_id}',
+            f'post meta add {group_id} learndash_group_users {user_id}',
+        ], check=True)
 
         return {"user_id": user_id, "group_id": group_id, "added": True}
@@ -2,7 +2,8 @@
 
 import os
 import asyncio
-from typing import Any
+import concurrent.futures
+from typing import Any, Awaitable, TypeVar
 from dotenv import load_dotenv
 
 from mcp.server import Server
@@ -11,11 +12,15 @@ from mcp.types import Tool, TextContent
 from .config import WordPressConfig
 from .wp_cli import WPCLIClient, WPCLIError
 from .wp_api import WordPressAPIClient, WordPressAPIError
+from .wp_api_async import AsyncWordPressAPIClient
 from .seo_tools import SEOAnalyzer
-from .image_optimizer import ImageOptimizer
+from .image_batch import BatchSummary
+from .image_optimizer import MEDIA_FIELDS, AuditSummary, ImageOptimizer
 from .learndash_manager import LearnDashManager
 from .woocommerce_manager import WooCommerceManager
-from .backup_manager import BackupManager
+from .backup_manager import BackupManager, format_size
+from .backup_retention import RetentionPolicy
+from .tool_executor import ToolExecutor, check_cancelled
 
 # Load environment variables
 load_dotenv()
@@ -26,16 +31,48 @@ server = Server("wordpress-seo-admin")
 # Global clients (initialized on first use)
 wp_cli: WPCLIClient | None = None
 wp_api: WordPressAPIClient | None = None
+wp_api_async: AsyncWordPressAPIClient | None = None
 img_optimizer: ImageOptimizer | None = None
 ld_manager: LearnDashManager | None = None
 wc_manager: WooCommerceManager | None = None
 backup_manager: BackupManager | None = None
 config: WordPressConfig | None = None
 
+# The server's event loop (set by main). Handlers on worker threads run
+# coroutines on it, so the async client and its pooled connections are
+# only ever used from one loop.
+event_loop: asyncio.AbstractEventLoop | None = None
+
+T = TypeVar("T")
+
+# Per-tool concurrency limits. Tools mapped to a group share that group's limit;
+# everything else is only bounded by the worker pool size.
+TOOL_GROUPS = {
+    "wp_create_backup": "backup",
+    "wp_restore_backup": "backup",
+    "wp_prune_backups": "backup",
+    # Deleting a store snapshot garbage collects shared objects
+    "wp_delete_backup": "backup",
+}
+TOOL_LIMITS = {
+    "backup": 1,
+    "image_audit_site": 2,
+    "image_optimize": 2,
+    "image_optimize_batch": 1,
+}
+
+# Blocking handlers (requests/paramiko) run here so one slow tool call
+# doesn't stall every other request on the stdio server
+executor = ToolExecutor(
+    max_workers=int(os.getenv("MCP_TOOL_WORKERS", "8")),
+    tool_limits=TOOL_LIMITS,
+    tool_groups=TOOL_GROUPS,
+)
+
 
 def get_clients():
     """Get or initialize WordPress clients."""
-    global wp_cli, wp_api, img_optimizer, ld_manager, wc_manager, backup_manager, config
+    global wp_cli, wp_api, wp_api_async, img_optimizer, ld_manager, wc_manager, backup_manager, config
 
     if config is None:
         config = WordPressConfig.from_env()
@@ -49,6 +86,9 @@ def get_clients():
     if wp_api is None:
         wp_api = WordPressAPIClient(config)
 
+    if wp_api_async is None:
+        wp_api_async = AsyncWordPressAPIClient(config)
+
     if img_optimizer is None:
         img_optimizer = ImageOptimizer(config)
 
@@ -160,7 +200,7 @@ async def list_tools() -> list[Tool]:
         # SEO Tools
         Tool(
             name="seo_analyze_post",
-            description="Perform comprehensive SEO analysis on a post or page",
+            description="Perform comprehensive SEO analysis on a post or page (or many posts at once)",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -168,8 +208,12 @@ async def list_tools() -> list[Tool]:
                         "type": "number",
                         "description": "WordPress post ID to analyze",
                     },
+                    "post_ids": {
+                        "type": "array",
+                        "items": {"type": "number"},
+                        "description": "Analyze several posts concurrently (instead of post_id)",
+                    },
                 },
-                "required": ["post_id"],
             },
         ),
         Tool(
@@ -206,6 +250,16 @@ async def list_tools() -> list[Tool]:
                         "type": "number",
                         "description": "WordPress media attachment ID",
                     },
+                    "check_transparency": {
+                        "type": "boolean",
+                        "description": "Download the image to check whether its alpha channel is used (otherwise only metadata is read)",
+                        "default": False,
+                    },
+                    "measure_savings": {
+                        "type": "boolean",
+                        "description": "Trial-encode the image to measure WebP/AVIF savings instead of estimating a flat 30% (cached per image)",
+                        "default": False,
+                    },
                 },
                 "required": ["media_id"],
             },
@@ -245,6 +299,56 @@ async def list_tools() -> list[Tool]:
                 "required": ["url"],
             },
         ),
+        Tool(
+            name="image_optimize_batch",
+            description="Optimize media library images in bulk (encoded on all CPU cores) and upload the optimized copies as NEW attachments. Originals are not replaced and posts keep using them; each result maps the original to its copy (new_media_id, new_url) for a search-replace. Copies made by earlier batches are never selected again. Resumable: rerunning the same batch skips images already done",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "mime_types": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Only images of these MIME types",
+                        "default": ["image/jpeg", "image/png"],
+                    },
+                    "min_size_kb": {
+                        "type": "number",
+                        "description": "Only images of at least this size in KB",
+                        "default": 0,
+                    },
+                    "missing_webp": {
+                        "type": "boolean",
+                        "description": "Only images without a WebP attachment of the same file name",
+                        "default": False,
+                    },
+                    "limit": {
+                        "type": "number",
+                        "description": "Process at most this many images not done by an earlier run",
+                    },
+                    "format": {
+                        "type": "string",
+                        "description": "Target format",
+                        "enum": ["webp", "jpeg", "png"],
+                        "default": "webp",
+                    },
+                    "quality": {
+                        "type": "number",
+                        "description": "Quality setting (1-100)",
+                        "default": 85,
+                    },
+                    "max_width": {
+                        "type": "number",
+                        "description": "Maximum width in pixels",
+                        "default": 2048,
+                    },
+                    "max_height": {
+                        "type": "number",
+                        "description": "Maximum height in pixels",
+                        "default": 2048,
+                    },
+                },
+            },
+        ),
         Tool(
             name="image_audit_site",
             description="Audit all images on the site for SEO and performance issues",
@@ -256,6 +360,16 @@ async def list_tools() -> list[Tool]:
                         "description": "Number of images to analyze",
                         "default": 50,
                     },
+                    "check_transparency": {
+                        "type": "boolean",
+                        "description": "Download each image to check transparency (the audit otherwise reads metadata only)",
+                        "default": False,
+                    },
+                    "measure_savings": {
+                        "type": "boolean",
+                        "description": "Trial-encode images to measure WebP/AVIF savings instead of estimating a flat 30% (cached per image, so repeat audits are cheap)",
+                        "default": False,
+                    },
                 },
             },
         ),
@@ -493,6 +607,78 @@ async def list_tools() -> list[Tool]:
                         "description": "Include database dump",
                         "default": True,
                     },
+                    "incremental": {
+                        "type": "boolean",
+                        "description": "Only download files changed since the last incremental snapshot",
+                        "default": False,
+                    },
+                    "transfer": {
+                        "type": "string",
+                        "enum": ["sftp", "tar"],
+                        "description": "How wp-content is copied for full backups: parallel SFTP, or one remote tar stream (faster for many small files). Defaults to WP_BACKUP_TRANSFER",
+                    },
+                    "store": {
+                        "type": "boolean",
+                        "description": "Save into the deduplicating backup store instead of a standalone archive. Defaults to WP_BACKUP_STORE",
+                    },
+                },
+            },
+        ),
+        Tool(
+            name="wp_restore_backup",
+            description="Restore a local backup onto the site: upload wp-content files in parallel and stream the database dump into wp db import. wp-config.php is never overwritten",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "backup_name": {
+                        "type": "string",
+                        "description": "Backup archive, snapshot or store snapshot to restore (e.g., sst_nyc_20251203_153000.tar)",
+                    },
+                    "include_files": {
+                        "type": "boolean",
+                        "description": "Restore wp-content files",
+                        "default": True,
+                    },
+                    "include_database": {
+                        "type": "boolean",
+                        "description": "Import the database dump (defaults to true, or false when paths is given)",
+                    },
+                    "paths": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Only restore these paths relative to wp-content (e.g., [\"uploads/2024\", \"plugins/akismet\"])",
+                    },
+                },
+                "required": ["backup_name"],
+            },
+        ),
+        Tool(
+            name="wp_prune_backups",
+            description="Apply the backup retention policy (keep N daily/weekly/monthly backups within a byte budget). Dry run by default; set apply to delete",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "apply": {
+                        "type": "boolean",
+                        "description": "Delete the backups the policy doesn't keep (otherwise only report them)",
+                        "default": False,
+                    },
+                    "keep_daily": {
+                        "type": "integer",
+                        "description": "Keep the newest backup of each of the last N days. Defaults to WP_BACKUP_KEEP_DAILY",
+                    },
+                    "keep_weekly": {
+                        "type": "integer",
+                        "description": "Keep the newest backup of each of the last N ISO weeks. Defaults to WP_BACKUP_KEEP_WEEKLY",
+                    },
+                    "keep_monthly": {
+                        "type": "integer",
+                        "description": "Keep the newest backup of each of the last N months. Defaults to WP_BACKUP_KEEP_MONTHLY",
+                    },
+                    "max_bytes": {
+                        "type": "integer",
+                        "description": "Prune the oldest backups until the rest fit in this many bytes. Defaults to WP_BACKUP_MAX_BYTES",
+                    },
                 },
             },
         ),
@@ -512,7 +698,7 @@ async def list_tools() -> list[Tool]:
                 "properties": {
                     "backup_filename": {
                         "type": "string",
-                        "description": "Filename of backup to delete (e.g., sst_nyc_20251203_153000.tar.gz)",
+                        "description": "Filename of backup archive or snapshot to delete (e.g., sst_nyc_20251203_153000.tar)",
                     },
                 },
                 "required": ["backup_filename"],
@@ -521,306 +707,363 @@ async def list_tools() -> list[Tool]:
     ]
 
 
-@server.call_tool()
-async def call_tool(name: str, arguments: Any) -> list[TextContent]:
-    """Handle tool calls."""
-    try:
-        cli, api, img_opt, ld, wc, backup = get_clients()
-
-        # Site Info & Management
-        if name == "wp_get_info":
-            info = cli.get_info()
-            plugins = cli.list_plugins(status="active")
-            themes = cli.list_themes()
-            active_theme = next((t for t in themes if t.get("status") == "active"), {})
-
-            result = {
-                **info,
-                "active_theme": active_theme.get("name", "Unknown"),
-                "active_plugins_count": len(plugins),
-            }
-            return [TextContent(type="text", text=str(result))]
-
-        elif name == "wp_plugin_list":
-            status = arguments.get("status")
-            plugins = cli.list_plugins(status=status)
-            return [TextContent(type="text", text=str(plugins))]
-
-        elif name == "wp_theme_list":
-            themes = cli.list_themes()
-            return [TextContent(type="text", text=str(themes))]
-
-        # Content Operations
-        elif name == "wp_post_list":
-            post_type = arguments.get("post_type", "post")
-            post_status = arguments.get("post_status", "publish")
-            limit = arguments.get("limit", 10)
-
-            posts = cli.list_posts(
-                post_type=post_type,
-                post_status=post_status,
-                limit=limit
-            )
-            return [TextContent(type="text", text=str(posts))]
-
-        elif name == "wp_get_post":
-            post_id = arguments["post_id"]
-            # Use REST API for richer data
-            post = api.get_post(post_id)
-            return [TextContent(type="text", text=str(post))]
-
-        elif name == "wp_search":
-            query = arguments["query"]
-            post_type = arguments.get("post_type", "post")
-
-            results = cli.search_posts(search=query, post_type=post_type)
-            return [TextContent(type="text", text=str(results))]
-
-        # SEO Tools
-        elif name == "seo_analyze_post":
-            post_id = arguments["post_id"]
-            post = api.get_post(post_id)
-
-            # Analyze SEO
-            seo_analysis = SEOAnalyzer.analyze_seo_metadata(post)
-            recommendations = SEOAnalyzer.get_seo_recommendations(seo_analysis)
-
-            result = {
-                "analysis": seo_analysis,
-                "recommendations": recommendations,
-            }
-            return [TextContent(type="text", text=str(result))]
-
-        elif name == "elementor_extract_content":
-            post_id = arguments["post_id"]
-            post = api.get_post(post_id)
+def _run_async(coro: Awaitable[T]) -> T:
+    """
+    Run a coroutine on the server's event loop from a tool worker thread.
+
+    Waits for the result, cancelling the coroutine if the tool call is
+    cancelled meanwhile.
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, event_loop)
+    while True:
+        try:
+            return future.result(timeout=0.5)
+        except concurrent.futures.TimeoutError:
+            try:
+                check_cancelled()
+            except BaseException:
+                future.cancel()
+                raise
+
+
+async def _fetch_posts(post_ids: list[int]) -> list:
+    """Fetch many posts concurrently (failures are returned in place)."""
+    return await wp_api_async.get_posts_by_id(post_ids, return_exceptions=True)
+
+
+def _dispatch_tool(name: str, arguments: Any, clients: tuple) -> list[TextContent]:
+    """Run a tool handler synchronously (called on the tool executor's worker threads)."""
+    cli, api, img_opt, ld, wc, backup = clients
+
+    # Site Info & Management
+    if name == "wp_get_info":
+        info = cli.get_info()
+        plugins = cli.list_plugins(status="active")
+        themes = cli.list_themes()
+        active_theme = next((t for t in themes if t.get("status") == "active"), {})
+
+        result = {
+            **info,
+            "active_theme": active_theme.get("name", "Unknown"),
+            "active_plugins_count": len(plugins),
+        }
+        return [TextContent(type="text", text=str(result))]
+
+    elif name == "wp_plugin_list":
+        status = arguments.get("status")
+        plugins = cli.list_plugins(status=status)
+        return [TextContent(type="text", text=str(plugins))]
+
+    elif name == "wp_theme_list":
+        themes = cli.list_themes()
+        return [TextContent(type="text", text=str(themes))]
+
+    # Content Operations
+    elif name == "wp_post_list":
+        post_type = arguments.get("post_type", "post")
+        post_status = arguments.get("post_status", "publish")
+        limit = arguments.get("limit", 10)
+
+        posts = cli.list_posts(
+            post_type=post_type,
+            post_status=post_status,
+            limit=limit
+        )
+        return [TextContent(type="text", text=str(posts))]
 
-            # Extract Elementor content
-            elementor_data = SEOAnalyzer.extract_elementor_content(post)
-            return [TextContent(type="text", text=str(elementor_data))]
+    elif name == "wp_get_post":
+        post_id = arguments["post_id"]
+        # Use REST API for richer data
+        post = api.get_post(post_id)
+        return [TextContent(type="text", text=str(post))]
 
-        # Maintenance & Updates
-        elif name == "wp_check_updates":
-            updates = cli.check_updates()
-            return [TextContent(type="text", text=str(updates))]
+    elif name == "wp_search":
+        query = arguments["query"]
+        post_type = arguments.get("post_type", "post")
 
-        # Image Optimization Tools
-        elif name == "image_analyze":
-            media_id = arguments["media_id"]
-            analysis = img_opt.analyze_wordpress_image(media_id)
-            return [TextContent(type="text", text=str(analysis))]
-
-        elif name == "image_optimize":
-            url = arguments["url"]
-            format = arguments.get("format", "auto")
-            quality = arguments.get("quality", 85)
-            max_width = arguments.get("max_width", 2048)
-            max_height = arguments.get("max_height", 2048)
-
-            optimized_data, result = img_opt.optimize_image(
-                url=url,
-                target_format=format,
-                quality=quality,
-                max_width=max_width,
-                max_height=max_height
-            )
+        results = cli.search_posts(search=query, post_type=post_type)
+        return [TextContent(type="text", text=str(results))]
 
-            # Return optimization results
-            result_dict = {
-                "original_size_kb": round(result.original_size / 1024, 2),
-                "optimized_size_kb": round(result.optimized_size / 1024, 2),
-                "savings_kb": round(result.savings_bytes / 1024, 2),
-                "savings_percent": round(result.savings_percent, 1),
-                "format": result.format,
-                "dimensions": f"{result.width}x{result.height}",
-                "note": "Optimized image data is ready for upload (not shown in text output)"
-            }
-            return [TextContent(type="text", text=str(result_dict))]
-
-        elif name == "image_audit_site":
-            limit = arguments.get("limit", 50)
-
-            # Get all media from WordPress
-            media_url = f"{api.base_url.replace('/wp/v2', '/wp/v2')}/media"
-            response = img_opt.session.get(
-                media_url,
-                params={"per_page": limit, "media_type": "image"},
-                timeout=30
-            )
-            response.raise_for_status()
-            media_items = response.json()
+    # SEO Tools
+    elif name == "seo_analyze_post":
+        post_ids = arguments.get("post_ids")
+        if post_ids:
+            posts = _run_async(_fetch_posts(post_ids))
 
-            # Analyze each image
             results = []
-            for media in media_items:
-                try:
-                    analysis = img_opt.analyze_wordpress_image(media["id"])
-                    results.append(analysis)
-                except Exception as e:
-                    results.append({
-                        "media_id": media["id"],
-                        "error": str(e)
-                    })
-
-            # Generate summary
-            total_images = len(results)
-            missing_alt = len([r for r in results if not r.get("has_alt_text")])
-            large_files = len([r for r in results if r.get("file_size_kb", 0) > 500])
-            total_potential_savings = sum(
-                r.get("estimated_webp_savings_kb", 0) for r in results
-            )
-
-            summary = {
-                "total_images_analyzed": total_images,
-                "missing_alt_text": missing_alt,
-                "large_files_over_500kb": large_files,
-                "total_potential_webp_savings_kb": round(total_potential_savings, 2),
-                "images": results
-            }
-
-            return [TextContent(type="text", text=str(summary))]
-
-        # LearnDash Course Management
-        elif name == "ld_create_course":
-            result = ld.create_course(
-                title=arguments["title"],
-                content=arguments.get("content", ""),
-                status=arguments.get("status", "draft"),
-                price=arguments.get("price"),
-            )
-            return [TextContent(type="text", text=str(result))]
-
-        elif name == "ld_update_course":
-            result = ld.update_course(
-                course_id=arguments["course_id"],
-                title=arguments.get("title"),
-                content=arguments.get("content"),
-                price=arguments.get("price"),
-            )
-            return [TextContent(type="text", text=str(result))]
+            for post_id, post in zip(post_ids, posts):
+                if isinstance(post, Exception):
+                    results.append({"post_id": post_id, "error": str(post)})
+                    continue
+
+                seo_analysis = SEOAnalyzer.analyze_seo_metadata(post)
+                results.append({
+                    "post_id": post_id,
+                    "analysis": seo_analysis,
+                    "recommendations": SEOAnalyzer.get_seo_recommendations(seo_analysis),
+                })
+            return [TextContent(type="text", text=str(results))]
 
-        elif name == "ld_list_courses":
-            courses = ld.list_courses(
-                status=arguments.get("status", "any"),
-                limit=arguments.get("limit", 50)
-            )
-            return [TextContent(type="text", text=str(courses))]
-
-        elif name == "ld_create_lesson":
-            result = ld.create_lesson(
-                course_id=arguments["course_id"],
-                title=arguments["title"],
-                content=arguments.get("content", ""),
-                order=arguments.get("order"),
-            )
-            return [TextContent(type="text", text=str(result))]
-
-        elif name == "ld_update_lesson":
-            result = ld.update_lesson(
-                lesson_id=arguments["lesson_id"],
-                title=arguments.get("title"),
-                content=arguments.get("content"),
-                order=arguments.get("order"),
-            )
-            return [TextContent(type="text", text=str(result))]
-
-        elif name == "ld_create_quiz":
-            result = ld.create_quiz(
-                course_id=arguments["course_id"],
-                lesson_id=arguments.get("lesson_id"),
-                title=arguments["title"],
-                passing_score=arguments.get("passing_score", 80),
-            )
-            return [TextContent(type="text", text=str(result))]
-
-        elif name == "ld_add_quiz_question":
-            result = ld.add_quiz_question(
-                quiz_id=arguments["quiz_id"],
-                question_text=arguments["question_text"],
-                question_type=arguments.get("question_type", "single"),
-                points=arguments.get("points", 1),
-            )
-            return [TextContent(type="text", text=str(result))]
+        post_id = arguments["post_id"]
+        post = api.get_post(post_id)
+
+        # Analyze SEO
+        seo_analysis = SEOAnalyzer.analyze_seo_metadata(post)
+        recommendations = SEOAnalyzer.get_seo_recommendations(seo_analysis)
+
+        result = {
+            "analysis": seo_analysis,
+            "recommendations": recommendations,
+        }
+        return [TextContent(type="text", text=str(result))]
+
+    elif name == "elementor_extract_content":
+        post_id = arguments["post_id"]
+        post = api.get_post(post_id)
+
+        # Extract Elementor content
+        elementor_data = SEOAnalyzer.extract_elementor_content(post)
+        return [TextContent(type="text", text=str(elementor_data))]
+
+    # Maintenance & Updates
+    elif name == "wp_check_updates":
+        updates = cli.check_updates()
+        return [TextContent(type="text", text=str(updates))]
+
+    # Image Optimization Tools
+    elif name == "image_analyze":
+        media_id = arguments["media_id"]
+        analysis = img_opt.analyze_wordpress_image(
+            media_id,
+            check_transparency=arguments.get("check_transparency", False),
+            measure_savings=arguments.get("measure_savings", False),
+        )
+        img_opt.savings_cache.flush()
+        return [TextContent(type="text", text=str(analysis))]
+
+    elif name == "image_optimize":
+        url = arguments["url"]
+        format = arguments.get("format", "auto")
+        quality = arguments.get("quality", 85)
+        max_width = arguments.get("max_width", 2048)
+        max_height = arguments.get("max_height", 2048)
+
+        optimized_data, result = img_opt.optimize_image(
+            url=url,
+            target_format=format,
+            quality=quality,
+            max_width=max_width,
+            max_height=max_height
+        )
 
-        elif name == "ld_enroll_user":
-            result = ld.enroll_user(
-                user_id=arguments["user_id"],
-                course_id=arguments["course_id"],
-            )
-            return [TextContent(type="text", text=str(result))]
+        # Return optimization results
+        result_dict = {
+            "original_size_kb": round(result.original_size / 1024, 2),
+            "optimized_size_kb": round(result.optimized_size / 1024, 2),
+            "savings_kb": round(result.savings_bytes / 1024, 2),
+            "savings_percent": round(result.savings_percent, 1),
+            "format": result.format,
+            "dimensions": f"{result.width}x{result.height}",
+            "note": "Optimized image data is ready for upload (not shown in text output)"
+        }
+        return [TextContent(type="text", text=str(result_dict))]
+
+    elif name == "image_optimize_batch":
+        batch = img_opt.optimize_batch(
+            api,
+            mime_types=arguments.get("mime_types", ["image/jpeg", "image/png"]),
+            min_size=int(arguments.get("min_size_kb", 0) * 1024),
+            missing_webp=arguments.get("missing_webp", False),
+            limit=arguments.get("limit"),
+            target_format=arguments.get("format", "webp"),
+            quality=arguments.get("quality", 85),
+            max_width=arguments.get("max_width", 2048),
+            max_height=arguments.get("max_height", 2048),
+        )
 
-        elif name == "ld_create_group":
-            result = ld.create_group(
-                title=arguments["title"],
-                description=arguments.get("description", ""),
-                course_ids=arguments.get("course_ids"),
-            )
-            return [TextContent(type="text", text=str(result))]
+        totals = BatchSummary()
+        results = []
+        job_id = None
+        for result in batch:
+            check_cancelled()
+            job_id = result.pop("job_id")
+            totals.add(result)
+            results.append(result)
+
+        summary = {"job_id": job_id, **totals.as_dict(), "images": results}
+
+        return [TextContent(type="text", text=str(summary))]
+
+    elif name == "image_audit_site":
+        limit = arguments.get("limit", 50)
+
+        # Page through the media library; the listing carries the metadata
+        # the analysis needs, so no per-image request is made
+        media_items = api.iter_media(media_type="image", fields=MEDIA_FIELDS, limit=limit)
+
+        # Analyze concurrently; results arrive in library order
+        totals = AuditSummary()
+        results = []
+        audit = img_opt.audit_images(
+            media_items,
+            check_transparency=arguments.get("check_transparency", False),
+            measure_savings=arguments.get("measure_savings", False),
+        )
+        for analysis in audit:
+            check_cancelled()
+            totals.add(analysis)
+            results.append(analysis)
+
+        summary = {**totals.as_dict(), "images": results}
+
+        return [TextContent(type="text", text=str(summary))]
+
+    # LearnDash Course Management
+    elif name == "ld_create_course":
+        result = ld.create_course(
+            title=arguments["title"],
+            content=arguments.get("content", ""),
+            status=arguments.get("status", "draft"),
+            price=arguments.get("price"),
+        )
+        return [TextContent(type="text", text=str(result))]
+
+    elif name == "ld_update_course":
+        result = ld.update_course(
+            course_id=arguments["course_id"],
+            title=arguments.get("title"),
+            content=arguments.get("content"),
+            price=arguments.get("price"),
+        )
+        return [TextContent(type="text", text=str(result))]
 
-        # WooCommerce Product Management
-        elif name == "wc_create_product":
-            result = wc.create_product(
-                name=arguments["name"],
-                price=arguments["price"],
-                description=arguments.get("description", ""),
-                sku=arguments.get("sku"),
-                course_id=arguments.get("course_id"),
-            )
-            return [TextContent(type="text", text=str(result))]
-
-        elif name == "wc_update_product":
-            result = wc.update_product(
-                product_id=arguments["product_id"],
-                name=arguments.get("name"),
-                price=arguments.get("price"),
-                sale_price=arguments.get("sale_price"),
-            )
-            return [TextContent(type="text", text=str(result))]
+    elif name == "ld_list_courses":
+        courses = ld.list_courses(
+            status=arguments.get("status", "any"),
+            limit=arguments.get("limit", 50)
+        )
+        return [TextContent(type="text", text=str(courses))]
+
+    elif name == "ld_create_lesson":
+        result = ld.create_lesson(
+            course_id=arguments["course_id"],
+            title=arguments["title"],
+            content=arguments.get("content", ""),
+            order=arguments.get("order"),
+        )
+        return [TextContent(type="text", text=str(result))]
+
+    elif name == "ld_update_lesson":
+        result = ld.update_lesson(
+            lesson_id=arguments["lesson_id"],
+            title=arguments.get("title"),
+            content=arguments.get("content"),
+            order=arguments.get("order"),
+        )
+        return [TextContent(type="text", text=str(result))]
+
+    elif name == "ld_create_quiz":
+        result = ld.create_quiz(
+            course_id=arguments["course_id"],
+            lesson_id=arguments.get("lesson_id"),
+            title=arguments["title"],
+            passing_score=arguments.get("passing_score", 80),
+        )
+        return [TextContent(type="text", text=str(result))]
+
+    elif name == "ld_add_quiz_question":
+        result = ld.add_quiz_question(
+            quiz_id=arguments["quiz_id"],
+            question_text=arguments["question_text"],
+            question_type=arguments.get("question_type", "single"),
+            points=arguments.get("points", 1),
+        )
+        return [TextContent(type="text", text=str(result))]
 
-        elif name == "wc_list_products":
-            products = wc.list_products(
-                per_page=arguments.get("per_page", 20),
-                search=arguments.get("search"),
-            )
-            return [TextContent(type="text", text=str(products))]
+    elif name == "ld_enroll_user":
+        result = ld.enroll_user(
+            user_id=arguments["user_id"],
+            course_id=arguments["course_id"],
+        )
+        return [TextContent(type="text", text=str(result))]
 
-        elif name == "wc_list_orders":
-            orders = wc.list_orders(
-                per_page=arguments.get("per_page", 20),
-                status=arguments.get("status"),
-            )
-            return [TextContent(type="text", text=str(orders))]
-
-        elif name == "wc_create_coupon":
-            result = wc.create_coupon(
-                code=arguments["code"],
-                discount_type=arguments.get("discount_type", "percent"),
-                amount=arguments["amount"],
-                usage_limit=arguments.get("usage_limit"),
-            )
-            return [TextContent(type="text", text=str(result))]
+    elif name == "ld_create_group":
+        result = ld.create_group(
+            title=arguments["title"],
+            description=arguments.get("description", ""),
+            course_ids=arguments.get("course_ids"),
+        )
+        return [TextContent(type="text", text=str(result))]
+
+    # WooCommerce Product Management
+    elif name == "wc_create_product":
+        result = wc.create_product(
+            name=arguments["name"],
+            price=arguments["price"],
+            description=arguments.get("description", ""),
+            sku=arguments.get("sku"),
+            course_id=arguments.get("course_id"),
+        )
+        return [TextContent(type="text", text=str(result))]
+
+    elif name == "wc_update_product":
+        result = wc.update_product(
+            product_id=arguments["product_id"],
+            name=arguments.get("name"),
+            price=arguments.get("price"),
+            sale_price=arguments.get("sale_price"),
+        )
+        return [TextContent(type="text", text=str(result))]
 
-        elif name == "wc_get_sales_report":
-            report = wc.get_sales_report(
-                period=arguments.get("period", "month")
-            )
-            return [TextContent(type="text", text=str(report))]
+    elif name == "wc_list_products":
+        products = wc.list_products(
+            per_page=arguments.get("per_page", 20),
+            search=arguments.get("search"),
+        )
+        return [TextContent(type="text", text=str(products))]
 
-        # Backup Management
-        elif name == "wp_create_backup":
-            include_files = arguments.get("include_files", True)
-            include_database = arguments.get("include_database", True)
+    elif name == "wc_list_orders":
+        orders = wc.list_orders(
+            per_page=arguments.get("per_page", 20),
+            status=arguments.get("status"),
+        )
+        return [TextContent(type="text", text=str(orders))]
+
+    elif name == "wc_create_coupon":
+        result = wc.create_coupon(
+            code=arguments["code"],
+            discount_type=arguments.get("discount_type", "percent"),
+            amount=arguments["amount"],
+            usage_limit=arguments.get("usage_limit"),
+        )
+        return [TextContent(type="text", text=str(result))]
 
-            result = backup.create_backup(
-                include_files=include_files,
-                include_database=include_database
-            )
+    elif name == "wc_get_sales_report":
+        report = wc.get_sales_report(
+            period=arguments.get("period", "month")
+        )
+        return [TextContent(type="text", text=str(report))]
+
+    # Backup Management
+    elif name == "wp_create_backup":
+        include_files = arguments.get("include_files", True)
+        include_database = arguments.get("include_database", True)
+        incremental = arguments.get("incremental", False)
+
+        result = backup.create_backup(
+            include_files=include_files,
+            include_database=include_database,
+            incremental=incremental,
+            transfer=arguments.get("transfer"),
+            store=arguments.get("store"),
+        )
 
-            summary = f"""
+        location = result.get('archive_path', result['backup_path'])
+        summary = f"""
 Backup Created Successfully!
 
 Timestamp: {result['timestamp']}
-Archive: {result['archive_path']}
+Location: {location}
 Total Size: {result['total_size']}
 
 Backed up:
@@ -829,33 +1072,114 @@ Backed up:
 
 The backup is saved locally and excluded from git via .gitignore
 """
-            return [TextContent(type="text", text=summary)]
-
-        elif name == "wp_list_backups":
-            backups = backup.list_backups()
-
-            if not backups:
-                return [TextContent(type="text", text="No backups found in ./backups/")]
-
-            result = "Available Backups:\n\n"
-            for b in backups:
-                result += f"- {b['filename']}\n"
-                result += f"  Size: {b['size']}\n"
-                result += f"  Created: {b['created']}\n\n"
+        if result.get("incremental"):
+            transfer = result.get("transfer", {})
+            summary += (
+                f"Incremental snapshot (parent: {result['parent'] or 'none - first snapshot'}): "
+                f"{transfer.get('files', 0)} files downloaded, "
+                f"{transfer.get('unchanged', 0)} unchanged files linked\n"
+            )
+        if result.get("resumed"):
+            summary += "Resumed an interrupted backup; files it had finished were not downloaded again\n"
+        if result.get("store"):
+            summary += (
+                f"Store snapshot (parent: {result['parent'] or 'none - first snapshot'}): "
+                f"{result['new_size']} of new data written\n"
+            )
+        if result.get("pruned"):
+            summary += f"Retention pruned {len(result['pruned'])} old backup(s): {', '.join(p['name'] for p in result['pruned'])}\n"
+        if result.get("prune_error"):
+            summary += f"Retention pruning failed: {result['prune_error']}\n"
+        return [TextContent(type="text", text=summary)]
+
+    elif name == "wp_restore_backup":
+        paths = arguments.get("paths")
+        result = backup.restore(
+            arguments["backup_name"],
+            include_files=arguments.get("include_files", True),
+            include_database=arguments.get("include_database", not paths),
+            paths=paths,
+        )
 
-            return [TextContent(type="text", text=result)]
+        summary = f"Backup Restored: {result['backup_name']} ({result['seconds']}s)\n\n"
+        if result["database_restored"]:
+            database = result["database_import"]
+            summary += (
+                f"- Database: ✓ {database['dumps']} dump(s) imported "
+                f"({database['mb_per_second']} MB/s)\n"
+            )
+        else:
+            summary += "- Database: ✗ not restored\n"
+        if result["files_restored"]:
+            transfer = result["transfer"]
+            summary += (
+                f"- Files: ✓ {transfer['files']} files, {format_size(transfer['bytes'])} uploaded "
+                f"({transfer['mb_per_second']} MB/s)\n"
+            )
+        else:
+            summary += "- Files: ✗ not restored\n"
+        return [TextContent(type="text", text=summary)]
+
+    elif name == "wp_prune_backups":
+        policy = RetentionPolicy(
+            keep_daily=arguments.get("keep_daily", config.backup_keep_daily),
+            keep_weekly=arguments.get("keep_weekly", config.backup_keep_weekly),
+            keep_monthly=arguments.get("keep_monthly", config.backup_keep_monthly),
+            max_bytes=arguments.get("max_bytes", config.backup_max_bytes),
+        )
+        result = backup.prune(policy, dry_run=not arguments.get("apply", False))
+
+        verb = "Would delete" if result["dry_run"] else "Deleted"
+        summary = f"{verb} {len(result['deleted'])} backup(s), freeing {format_size(result['freed_bytes'])}\n"
+        for d in result["deleted"]:
+            summary += f"- {d['name']} ({d['type']}, {d['created']}, {format_size(d['bytes'])})\n"
+        summary += f"\nKeeping {len(result['kept'])} backup(s), {format_size(result['kept_bytes'])}:\n"
+        for kept_name, reasons in result["kept"].items():
+            summary += f"- {kept_name}: {', '.join(reasons)}\n"
+        if result["dry_run"] and result["deleted"]:
+            summary += "\nDry run: pass apply=true to delete\n"
+        return [TextContent(type="text", text=summary)]
+
+    elif name == "wp_list_backups":
+        backups = backup.list_backups()
+
+        if not backups:
+            return [TextContent(type="text", text="No backups found in ./backups/")]
+
+        result = "Available Backups:\n\n"
+        for b in backups:
+            result += f"- {b['filename']}\n"
+            result += f"  Size: {b['size']}\n"
+            result += f"  Created: {b['created']}\n"
+            if b.get("file_count") is not None:
+                result += f"  Files: {b['file_count']}\n"
+            if b.get("new_size"):
+                result += f"  New data: {b['new_size']}\n"
+            if b.get("chain"):
+                result += f"  Chain: {' <- '.join(b['chain'])}\n"
+            result += "\n"
+
+        return [TextContent(type="text", text=result)]
+
+    elif name == "wp_delete_backup":
+        filename = arguments["backup_filename"]
+        success = backup.delete_backup(filename)
+
+        if success:
+            return [TextContent(type="text", text=f"✓ Backup deleted: {filename}")]
+        else:
+            return [TextContent(type="text", text=f"✗ Backup not found: {filename}")]
 
-        elif name == "wp_delete_backup":
-            filename = arguments["backup_filename"]
-            success = backup.delete_backup(filename)
+    else:
+        return [TextContent(type="text", text=f"Unknown tool: {name}")]
 
-            if success:
-                return [TextContent(type="text", text=f"✓ Backup deleted: {filename}")]
-            else:
-                return [TextContent(type="text", text=f"✗ Backup not found: {filename}")]
 
-        else:
-            return [TextContent(type="text", text=f"Unknown tool: {name}")]
+@server.call_tool()
+async def call_tool(name: str, arguments: Any) -> list[TextContent]:
+    """Handle tool calls."""
+    try:
+        clients = get_clients()
+        return await executor.run(name, _dispatch_tool, name, arguments or {}, clients)
 
     except (WPCLIError, WordPressAPIError) as e:
         return [TextContent(type="text", text=f"Error: {str(e)}")]
@@ -865,14 +1189,20 @@ The backup is saved locally and excluded from git via .gitignore
 
 async def main():
     """Run the MCP server."""
+    global event_loop
     from mcp.server.stdio import stdio_server
 
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            server.create_initialization_options()
-        )
+    event_loop = asyncio.get_running_loop()
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                server.create_initialization_options()
+            )
+    finally:
+        if wp_api_async is not None:
+            await wp_api_async.aclose()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,826 @@
+"""Parallel SFTP transfer engine for backups."""
+
+import hashlib
+import io
+import os
+import queue
+import shutil
+import stat
+import tarfile
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Callable, Optional
+import paramiko
+from .backup_codecs import (
+    CODEC_PAX_KEY,
+    CODEC_SUFFIXES,
+    choose_codec,
+    compressing_writer,
+)
+from .backup_filters import BackupFilter
+from .backup_journal import CHECKPOINT_BYTES, BackupJournal
+from .ssh_pool import SSHConnectionPool
+from .tool_executor import check_cancelled, in_current_context
+
+# Large SSH windows/packets and many in-flight read requests keep a
+# high-latency link busy instead of waiting on one 32 KB read at a time
+SFTP_WINDOW_SIZE = 64 * 1024 * 1024
+SFTP_MAX_PACKET_SIZE = 256 * 1024
+SFTP_PREFETCH_REQUESTS = 64
+
+# Files up to this size are buffered in memory so workers can download them
+# in parallel and only hold the archive lock to append; bigger ones stream
+# straight from the channel into the archive
+TAR_BUFFER_LIMIT = 8 * 1024 * 1024
+
+
+class TransferError(Exception):
+    """Exception raised when a parallel transfer fails."""
+    pass
+
+
+@dataclass
+class RemoteFile:
+    """A regular file found while walking the remote tree."""
+    remote_path: str
+    relative_path: str
+    size: int
+    mtime: int
+
+
+@dataclass
+class LocalFile:
+    """A file read back from a backup, to be uploaded."""
+    relative_path: str
+    size: int
+    mtime: Optional[int]
+    open: Callable[[], BinaryIO]
+
+
+@dataclass
+class TransferStats:
+    """Running totals for a transfer (shared by all workers)."""
+    files: int = 0
+    bytes: int = 0
+    directories: int = 0
+    skipped: int = 0
+    excluded: int = 0
+    unchanged: int = 0
+    unchanged_bytes: int = 0
+    resumed: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    def as_dict(self) -> dict:
+        """Summarize totals and throughput."""
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        return {
+            "files": self.files,
+            "bytes": self.bytes,
+            "directories": self.directories,
+            "skipped": self.skipped,
+            "excluded": self.excluded,
+            "unchanged": self.unchanged,
+            "unchanged_bytes": self.unchanged_bytes,
+            "resumed": self.resumed,
+            "seconds": round(elapsed, 1),
+            "mb_per_second": round(self.bytes / elapsed / (1024 * 1024), 2),
+        }
+
+
+class _HashingWriter:
+    """File wrapper that hashes bytes as they are written."""
+
+    def __init__(self, f):
+        self.f = f
+        self.digest = hashlib.sha256()
+
+    def write(self, data: bytes) -> int:
+        self.digest.update(data)
+        return self.f.write(data)
+
+
+class _ExactReader:
+    """
+    Read exactly `size` bytes from a remote file, hashing as it goes.
+
+    Tar headers are written before the data, so a file that shrinks after
+    it was listed is zero-padded and one that grows is cut at the listed
+    size, the same way GNU tar handles live files.
+    """
+
+    def __init__(self, f, size: int):
+        self.f = f
+        self.remaining = size
+        self.digest = hashlib.sha256()
+
+    def read(self, n: int = -1) -> bytes:
+        if n < 0 or n > self.remaining:
+            n = self.remaining
+        data = self.f.read(n) if n else b""
+        if len(data) < n:
+            data += b"\0" * (n - len(data))
+        self.remaining -= n
+        self.digest.update(data)
+        return data
+
+
+class DirectorySink:
+    """
+    Write downloaded files into a local directory tree.
+
+    With reuse_root, unchanged files are hardlinked from an earlier download
+    of the same tree instead of being transferred again. With a journal,
+    finished files are recorded and large files are checkpointed, so a
+    retry skips the former and continues the latter from their last offset.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        reuse_root: Optional[Path] = None,
+        journal: Optional[BackupJournal] = None,
+    ):
+        """
+        Initialize the sink.
+
+        Args:
+            root: Local destination directory
+            reuse_root: Local directory holding an earlier download
+            journal: Checkpoint journal of this backup
+        """
+        self.root = Path(root)
+        self.reuse_root = Path(reuse_root) if reuse_root else None
+        self.journal = journal
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def add_directory(self, relative_path: str, mtime: Optional[int] = None):
+        """Create a directory."""
+        (self.root / relative_path).mkdir(parents=True, exist_ok=True)
+
+    def link_unchanged(self, remote_file: RemoteFile) -> bool:
+        """Hardlink an unchanged file from the earlier download, if possible."""
+        if self.reuse_root is None:
+            return False
+
+        source = self.reuse_root / remote_file.relative_path
+        target = self.root / remote_file.relative_path
+        # A resumed run may find the link already made
+        target.unlink(missing_ok=True)
+        try:
+            os.link(source, target)
+        except FileNotFoundError:
+            return False
+        except OSError:
+            # Different filesystem or no hardlink support
+            shutil.copy2(source, target)
+        return True
+
+    def resume(self, remote_file: RemoteFile) -> Optional[dict]:
+        """The entry for a file an interrupted run already finished, if any."""
+        if self.journal is None:
+            return None
+        entry = self.journal.get_completed(remote_file.relative_path, remote_file.size, remote_file.mtime)
+        if entry is None or not (self.root / remote_file.relative_path).exists():
+            return None
+        return entry
+
+    def add_file(self, sftp: paramiko.SFTPClient, remote_file: RemoteFile) -> str:
+        """
+        Download one file with pipelined reads; returns its sha256.
+
+        A checkpointed partial download is continued with a ranged read
+        from its last offset.
+        """
+        local_path = self.root / remote_file.relative_path
+        offset = self._resume_offset(remote_file, local_path)
+
+        with open(local_path, "r+b" if offset else "wb") as f:
+            digest = hashlib.sha256()
+            if offset:
+                # Rehash the kept prefix locally instead of downloading it again
+                f.truncate(offset)
+                while f.tell() < offset:
+                    digest.update(f.read(min(1024 * 1024, offset - f.tell())))
+
+            with sftp.open(remote_file.remote_path, "rb") as remote:
+                remote.seek(offset)
+                remote.prefetch(remote_file.size, SFTP_PREFETCH_REQUESTS)
+                checkpointed = offset
+                while True:
+                    data = remote.read(1024 * 1024)
+                    if not data:
+                        break
+                    f.write(data)
+                    digest.update(data)
+                    offset += len(data)
+
+                    if self.journal is not None and offset - checkpointed >= CHECKPOINT_BYTES:
+                        f.flush()
+                        self.journal.checkpoint(
+                            remote_file.relative_path, remote_file.size, remote_file.mtime, offset
+                        )
+                        checkpointed = offset
+
+        os.utime(local_path, (remote_file.mtime, remote_file.mtime))
+        sha256 = digest.hexdigest()
+
+        if self.journal is not None:
+            self.journal.done(remote_file.relative_path, {
+                "size": remote_file.size,
+                "mtime": remote_file.mtime,
+                "sha256": sha256,
+            })
+        return sha256
+
+    def _resume_offset(self, remote_file: RemoteFile, local_path: Path) -> int:
+        """Offset to continue a partial download from (0 to start over)."""
+        if self.journal is None:
+            return 0
+        record = self.journal.get_partial(remote_file.relative_path, remote_file.size, remote_file.mtime)
+        if record is None or not local_path.exists() or local_path.stat().st_size < record["offset"]:
+            return 0
+        return record["offset"]
+
+
+class TarSink:
+    """
+    Stream downloaded files straight into an open tar archive.
+
+    Each file is compressed on its own (see backup_codecs) by the worker
+    that downloaded it, so compression runs on as many cores as there are
+    workers and already-compressed media is stored without recompression.
+    Compressed members get the codec's name suffix plus a pax header.
+
+    Stored files up to TAR_BUFFER_LIMIT and all compressed output up to
+    that size are buffered in memory and appended under a lock; larger
+    stored files stream from their source directly into the archive, and
+    larger compressed output spills to a temporary file in spool_dir.
+
+    With a journal, every appended member is recorded together with the
+    archive offset after it, so an interrupted archive can be cut back to
+    its last complete member and appended to. Files that were cut off are
+    fetched again from the start.
+    """
+
+    def __init__(
+        self,
+        tar: tarfile.TarFile,
+        prefix: str,
+        codec: str = "none",
+        level: int = 3,
+        spool_dir: Optional[Path] = None,
+        journal: Optional[BackupJournal] = None,
+    ):
+        """
+        Initialize the sink.
+
+        Args:
+            tar: Archive opened for writing (plain, uncompressed tar)
+            prefix: Member path prefix for everything added (e.g. "site/wp-content")
+            codec: Default per-file codec ("zstd", "gzip" or "none")
+            level: Compression level
+            spool_dir: Where large compressed files spill before being appended
+            journal: Checkpoint journal of this backup
+        """
+        self.tar = tar
+        self.prefix = prefix.strip("/")
+        self.codec = codec
+        self.level = level
+        self.spool_dir = spool_dir
+        self.journal = journal
+        self._lock = threading.Lock()
+
+    def _member_name(self, relative_path: str) -> str:
+        return f"{self.prefix}/{relative_path}" if relative_path else self.prefix
+
+    def add_directory(self, relative_path: str, mtime: Optional[int] = None):
+        """Append a directory entry."""
+        name = self._member_name(relative_path)
+        if self.journal is not None and self.journal.get_completed(name) is not None:
+            return
+
+        info = tarfile.TarInfo(name)
+        info.type = tarfile.DIRTYPE
+        info.mode = 0o755
+        info.mtime = mtime if mtime is not None else int(time.time())
+        with self._lock:
+            self.tar.addfile(info)
+            self._commit(name, {"mtime": info.mtime})
+
+    def link_unchanged(self, remote_file: RemoteFile) -> bool:
+        """Archives are always complete; nothing is reused."""
+        return False
+
+    def resume(self, remote_file: RemoteFile) -> Optional[dict]:
+        """The entry for a file already in the (resumed) archive, if any."""
+        if self.journal is None:
+            return None
+        return self.journal.get_completed(
+            self._member_name(remote_file.relative_path), remote_file.size, remote_file.mtime
+        )
+
+    def _commit(self, name: str, entry: dict):
+        """Journal a member once its bytes have reached the archive file."""
+        if self.journal is not None:
+            self.tar.fileobj.flush()
+            self.journal.done(name, entry, offset=self.tar.offset)
+
+    def add_fileobj(
+        self,
+        relative_path: str,
+        fileobj,
+        size: int,
+        mtime: Optional[int] = None,
+        codec: str = "none",
+        source_size: Optional[int] = None,
+    ):
+        """
+        Append `size` bytes read from fileobj as a regular file.
+
+        A codec other than "none" means fileobj already holds compressed
+        data; the member is named and tagged accordingly, and source_size
+        is the uncompressed size (recorded in the journal).
+        """
+        name = self._member_name(relative_path)
+        info = tarfile.TarInfo(name + CODEC_SUFFIXES[codec])
+        info.size = size
+        info.mode = 0o644
+        info.mtime = mtime if mtime is not None else int(time.time())
+        if codec != "none":
+            info.pax_headers = {CODEC_PAX_KEY: codec}
+        with self._lock:
+            self.tar.addfile(info, fileobj)
+            self._commit(name, {
+                "size": size if source_size is None else source_size,
+                "mtime": info.mtime,
+            })
+
+    def compresses(self, relative_path: str) -> bool:
+        """Whether a file at relative_path would be compressed."""
+        return choose_codec(relative_path, self.codec) != "none"
+
+    def add_file(self, sftp: paramiko.SFTPClient, remote_file: RemoteFile) -> str:
+        """Append one remote file; returns the sha256 of its contents."""
+        with sftp.open(remote_file.remote_path, "rb") as f:
+            f.prefetch(remote_file.size, SFTP_PREFETCH_REQUESTS)
+            return self.add_stream(remote_file.relative_path, f, remote_file.size, remote_file.mtime)
+
+    def add_stream(self, relative_path: str, fileobj, size: int, mtime: Optional[int] = None) -> str:
+        """
+        Append a file read from a stream, applying the codec policy.
+
+        Compression happens before the archive lock is taken. Stored files
+        are cut or zero-padded to `size` if the stream disagrees (only
+        possible when large stored files are streamed straight through).
+
+        Args:
+            relative_path: Path below the sink's prefix
+            fileobj: Readable binary stream of the file contents
+            size: Expected size in bytes
+            mtime: Modification time for the member
+
+        Returns:
+            sha256 of the file contents
+        """
+        codec = choose_codec(relative_path, self.codec)
+
+        if codec != "none":
+            with tempfile.SpooledTemporaryFile(max_size=TAR_BUFFER_LIMIT, dir=self.spool_dir) as spool:
+                compressor = compressing_writer(codec, spool, self.level, size)
+                writer = _HashingWriter(compressor)
+                shutil.copyfileobj(fileobj, writer, 1024 * 1024)
+                compressor.close()
+
+                compressed_size = spool.tell()
+                spool.seek(0)
+                self.add_fileobj(
+                    relative_path, spool, compressed_size, mtime, codec,
+                    source_size=size,
+                )
+            return writer.digest.hexdigest()
+
+        if size <= TAR_BUFFER_LIMIT:
+            data = fileobj.read()
+            self.add_fileobj(relative_path, io.BytesIO(data), len(data), mtime)
+            return hashlib.sha256(data).hexdigest()
+
+        reader = _ExactReader(fileobj, size)
+        self.add_fileobj(relative_path, reader, size, mtime)
+        return reader.digest.hexdigest()
+
+
+def open_sftp(client: paramiko.SSHClient) -> paramiko.SFTPClient:
+    """Open an SFTP channel tuned for bulk transfer."""
+    return paramiko.SFTPClient.from_transport(
+        client.get_transport(),
+        window_size=SFTP_WINDOW_SIZE,
+        max_packet_size=SFTP_MAX_PACKET_SIZE,
+    )
+
+
+class ParallelTransfer:
+    """
+    Shared bookkeeping for a multi-threaded transfer.
+
+    Holds the running TransferStats under one lock, records the first
+    worker error (stopping the rest) and rate-limits progress callbacks.
+    Subclasses call _begin() at the start of each run.
+    """
+
+    def __init__(
+        self,
+        pool: SSHConnectionPool,
+        workers: int = 4,
+        progress: Optional[Callable[[dict], None]] = None,
+        progress_interval: float = 5.0,
+    ):
+        """
+        Initialize the transfer.
+
+        Args:
+            pool: SSH connection pool to lease worker connections from
+            workers: Number of worker threads
+            progress: Called with TransferStats.as_dict() while running
+            progress_interval: Min seconds between progress callbacks
+        """
+        self.pool = pool
+        self.workers = max(1, workers)
+        self.progress = progress
+        self.progress_interval = progress_interval
+
+    def _begin(self):
+        """Reset the per-run state."""
+        self._stats = TransferStats()
+        self._lock = threading.Lock()
+        self._errors: list[BaseException] = []
+        self._stop = threading.Event()
+        self._last_progress = 0.0
+
+    def _fail(self, error: BaseException):
+        """Record the first error and stop the other workers."""
+        with self._lock:
+            self._errors.append(error)
+        self._stop.set()
+
+    def _finish(self) -> TransferStats:
+        """Raise the first worker error, or report and return the final stats."""
+        if self._errors:
+            raise TransferError(str(self._errors[0])) from self._errors[0]
+
+        self._report(force=True)
+        return self._stats
+
+    def _report(self, force: bool = False):
+        """Invoke the progress callback, rate-limited to progress_interval."""
+        if self.progress is None:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_progress < self.progress_interval:
+                return
+            self._last_progress = now
+            snapshot = self._stats.as_dict()
+
+        self.progress(snapshot)
+
+
+class _SFTPWorkerPool(ParallelTransfer):
+    """
+    Threads that each lease an SSH connection and SFTP channel and work
+    through one queue of (kind, item) tasks, handled by _handle().
+    """
+
+    def _run_workers(self, name: str, feed: Callable[[], None]) -> TransferStats:
+        """
+        Start the workers, let feed() queue the work, then wait for them.
+
+        Args:
+            name: Thread name prefix
+            feed: Queues tasks on self._work (and joins it when done)
+
+        Returns:
+            Final transfer stats
+        """
+        self._work: queue.Queue = queue.Queue()
+
+        threads = []
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=in_current_context(self._worker),
+                name=f"{name}-{index}",
+                daemon=True,
+            )
+            thread.start()
+            threads.append(thread)
+
+        try:
+            feed()
+        finally:
+            for _ in threads:
+                self._work.put(None)
+            for thread in threads:
+                thread.join()
+
+        return self._finish()
+
+    def _worker(self):
+        """Process tasks until the sentinel arrives."""
+        ssh_client = None
+        sftp = None
+
+        try:
+            ssh_client = self.pool.acquire()
+            sftp = open_sftp(ssh_client)
+        except Exception as e:
+            self._fail(e)
+
+        while True:
+            task = self._work.get()
+            try:
+                if task is None:
+                    break
+                if self._stop.is_set() or sftp is None:
+                    continue
+
+                check_cancelled()
+                self._handle(sftp, *task)
+            except BaseException as e:
+                self._fail(e)
+            finally:
+                self._work.task_done()
+
+        if sftp is not None:
+            sftp.close()
+        if ssh_client is not None:
+            self.pool.release(ssh_client)
+
+    def _handle(self, sftp: paramiko.SFTPClient, kind: str, item):
+        """Process one task."""
+        raise NotImplementedError
+
+
+class ParallelSFTPDownloader(_SFTPWorkerPool):
+    """
+    Download a remote directory tree with several SFTP channels at once.
+
+    Workers share one work queue holding both directories (to list) and
+    files (to fetch), so listing a deep tree is parallel too. Each worker
+    leases its own pooled SSH connection and SFTP channel and pipelines
+    reads with prefetch. Files go to a sink: DirectorySink writes a local
+    tree, TarSink streams into an archive.
+
+    After a download, `manifest` maps each relative path to its size, mtime
+    and sha256. Passing the previous manifest makes the next download
+    incremental: files whose size and mtime are unchanged are taken from
+    the sink's earlier copy instead of transferred. A BackupFilter prunes
+    the walk: excluded directories are never listed.
+    """
+
+    def __init__(
+        self,
+        pool: SSHConnectionPool,
+        workers: int = 4,
+        progress: Optional[Callable[[dict], None]] = None,
+        progress_interval: float = 5.0,
+        file_filter: Optional[BackupFilter] = None,
+    ):
+        """
+        Initialize the downloader.
+
+        Args:
+            pool: SSH connection pool to lease worker connections from
+            workers: Number of parallel SFTP channels
+            progress: Called with TransferStats.as_dict() while running
+            progress_interval: Min seconds between progress callbacks
+            file_filter: Files and directories to leave out
+        """
+        super().__init__(pool, workers, progress, progress_interval)
+        self.file_filter = file_filter or BackupFilter()
+
+    def download(
+        self,
+        remote_root: str,
+        sink,
+        previous: Optional[dict[str, dict]] = None,
+    ) -> TransferStats:
+        """
+        Download remote_root into a sink.
+
+        Regular files keep their remote mtime; symlinks and special files
+        are skipped.
+
+        Args:
+            remote_root: Remote directory to copy
+            sink: DirectorySink or TarSink receiving the files
+            previous: Manifest of an earlier download of the same tree
+
+        Returns:
+            Final transfer stats
+        """
+        self.manifest: dict[str, dict] = {}
+        self._previous = previous or {}
+        self._sink = sink
+        self._begin()
+
+        def feed():
+            # Listing a directory queues its children, so this covers the tree
+            self._work.put(("dir", (remote_root.rstrip("/"), "", None)))
+            self._work.join()
+
+        return self._run_workers("sftp-download", feed)
+
+    def _handle(self, sftp: paramiko.SFTPClient, kind: str, item):
+        """List a directory or fetch a file."""
+        if kind == "dir":
+            self._list_directory(sftp, *item)
+        else:
+            self._fetch(sftp, item)
+
+    def _list_directory(
+        self,
+        sftp: paramiko.SFTPClient,
+        remote_dir: str,
+        relative_dir: str,
+        mtime: Optional[int],
+    ):
+        """List one remote directory, queueing subdirectories and files."""
+        self._sink.add_directory(relative_dir, mtime)
+
+        for item in sftp.listdir_attr(remote_dir):
+            remote_path = f"{remote_dir}/{item.filename}"
+            relative_path = f"{relative_dir}/{item.filename}" if relative_dir else item.filename
+
+            if stat.S_ISDIR(item.st_mode):
+                if self.file_filter.excludes_directory(relative_path):
+                    with self._lock:
+                        self._stats.excluded += 1
+                else:
+                    self._work.put(("dir", (remote_path, relative_path, item.st_mtime)))
+            elif stat.S_ISREG(item.st_mode):
+                if self.file_filter.excludes_file(relative_path, item.st_size):
+                    with self._lock:
+                        self._stats.excluded += 1
+                    continue
+                remote_file = RemoteFile(remote_path, relative_path, item.st_size, item.st_mtime)
+                if not self._resume(remote_file) and not self._reuse(remote_file):
+                    self._work.put(("file", remote_file))
+            else:
+                with self._lock:
+                    self._stats.skipped += 1
+
+        with self._lock:
+            self._stats.directories += 1
+
+    def _resume(self, remote_file: RemoteFile) -> bool:
+        """Skip a file an interrupted run of this backup already finished."""
+        entry = self._sink.resume(remote_file)
+        if entry is None:
+            return False
+
+        with self._lock:
+            self.manifest[remote_file.relative_path] = dict(entry)
+            self._stats.resumed += 1
+        return True
+
+    def _reuse(self, remote_file: RemoteFile) -> bool:
+        """Take an unchanged file from the sink's previous copy, if possible."""
+        entry = self._previous.get(remote_file.relative_path)
+        if (
+            entry is None
+            or entry["size"] != remote_file.size
+            or entry["mtime"] != remote_file.mtime
+            or not self._sink.link_unchanged(remote_file)
+        ):
+            return False
+
+        with self._lock:
+            self.manifest[remote_file.relative_path] = dict(entry)
+            self._stats.unchanged += 1
+            self._stats.unchanged_bytes += remote_file.size
+        return True
+
+    def _fetch(self, sftp: paramiko.SFTPClient, remote_file: RemoteFile):
+        """Download one file into the sink."""
+        digest = self._sink.add_file(sftp, remote_file)
+
+        with self._lock:
+            self.manifest[remote_file.relative_path] = {
+                "size": remote_file.size,
+                "mtime": remote_file.mtime,
+                "sha256": digest,
+            }
+            self._stats.files += 1
+            self._stats.bytes += remote_file.size
+        self._report()
+
+
+class ParallelSFTPUploader(_SFTPWorkerPool):
+    """
+    Upload files into a remote directory with several SFTP channels at once.
+
+    The counterpart of ParallelSFTPDownloader, used by restores. Missing
+    directories are created one depth level at a time (spread over the
+    workers), then files are uploaded largest first so one big file doesn't
+    end the run alone. Writes are pipelined, and each file is written under
+    a temporary name and renamed into place, so the live site never serves
+    a half-written file.
+    """
+
+    def upload(self, files: list[LocalFile], remote_root: str) -> TransferStats:
+        """
+        Upload files below remote_root, keeping their relative paths and mtimes.
+
+        Existing remote files are replaced; other remote files are left alone.
+
+        Args:
+            files: Files to upload
+            remote_root: Remote directory the relative paths are below
+
+        Returns:
+            Final transfer stats
+        """
+        self._remote_root = remote_root.rstrip("/")
+        self._begin()
+
+        def feed():
+            directories = {""}
+            for local_file in files:
+                parent = local_file.relative_path.rpartition("/")[0]
+                while parent not in directories:
+                    directories.add(parent)
+                    parent = parent.rpartition("/")[0]
+
+            # Parents must exist before their children are created
+            by_depth: dict[int, list[str]] = {}
+            for directory in directories:
+                by_depth.setdefault(directory.count("/") + bool(directory), []).append(directory)
+            for depth in sorted(by_depth):
+                for directory in by_depth[depth]:
+                    self._work.put(("dir", directory))
+                self._work.join()
+
+            for local_file in sorted(files, key=lambda f: f.size, reverse=True):
+                self._work.put(("file", local_file))
+            self._work.join()
+
+        return self._run_workers("sftp-upload", feed)
+
+    def _handle(self, sftp: paramiko.SFTPClient, kind: str, item):
+        """Create a directory or upload a file."""
+        if kind == "dir":
+            self._make_directory(sftp, item)
+        else:
+            self._put(sftp, item)
+
+    def _remote_path(self, relative_path: str) -> str:
+        return f"{self._remote_root}/{relative_path}" if relative_path else self._remote_root
+
+    def _make_directory(self, sftp: paramiko.SFTPClient, relative_path: str):
+        """Create one remote directory unless it already exists."""
+        remote_path = self._remote_path(relative_path)
+        try:
+            sftp.mkdir(remote_path)
+        except IOError:
+            # Usually it exists already; anything else fails the stat too
+            if not stat.S_ISDIR(sftp.stat(remote_path).st_mode):
+                raise TransferError(f"Not a directory: {remote_path}")
+            return
+
+        with self._lock:
+            self._stats.directories += 1
+
+    def _put(self, sftp: paramiko.SFTPClient, local_file: LocalFile):
+        """Upload one file and rename it into place."""
+        remote_path = self._remote_path(local_file.relative_path)
+        tmp_path = f"{remote_path}.restore-tmp"
+        written = 0
+
+        try:
+            with local_file.open() as source, sftp.open(tmp_path, "wb") as remote:
+                # Don't wait for each write's status before sending the next
+                remote.set_pipelined(True)
+                while True:
+                    data = source.read(1024 * 1024)
+                    if not data:
+                        break
+                    remote.write(data)
+                    written += len(data)
+                    check_cancelled()
+            if local_file.mtime is not None:
+                sftp.utime(tmp_path, (local_file.mtime, local_file.mtime))
+            sftp.posix_rename(tmp_path, remote_path)
+        except BaseException:
+            try:
+                sftp.remove(tmp_path)
+            except IOError:
+                pass
+            raise
+
+        with self._lock:
+            self._stats.files += 1
+            self._stats.bytes += written
+        self._report()
@@ -0,0 +1,230 @@
+"""Shared, thread-safe SSH connection pool."""
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, Optional
+import paramiko
+from .config import WordPressConfig
+
+
+@dataclass
+class _PooledConnection:
+    """An open SSH connection and how many callers currently lease it."""
+    client: paramiko.SSHClient
+    leases: int = 0
+    last_used: float = 0.0
+
+
+class SSHConnectionPool:
+    """
+    Pool of authenticated SSH connections to one host.
+
+    Each connection is leased to up to `max_channels` callers at once, each
+    opening its own channels (exec, SFTP) on the shared transport. Idle
+    connections are preferred, new ones are opened while under
+    `max_connections`, and only then are busy transports multiplexed.
+    Dead connections are dropped on the next acquire/release, and a
+    background reaper closes connections idle longer than `idle_timeout`
+    (keepalives would otherwise hold them open for good). The reaper
+    runs only while the pool has connections.
+    """
+
+    def __init__(
+        self,
+        config: WordPressConfig,
+        max_connections: int = 4,
+        max_channels: int = 8,
+        idle_timeout: float = 300,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            config: WordPress configuration (SSH host and credentials)
+            max_connections: Max open SSH connections
+            max_channels: Max concurrent leases per connection (keep below the
+                server's MaxSessions, 10 by default on OpenSSH)
+            idle_timeout: Seconds an unused connection is kept open
+        """
+        self.config = config
+        self.max_connections = max_connections
+        self.max_channels = max_channels
+        self.idle_timeout = idle_timeout
+        self._connections: list[_PooledConnection] = []
+        self._opening = 0
+        self._cond = threading.Condition()
+        self._reaper: Optional[threading.Thread] = None
+
+    def _open(self) -> paramiko.SSHClient:
+        """Open and authenticate a new SSH connection."""
+        ssh_client = paramiko.SSHClient()
+        ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+
+        connect_kwargs = {
+            "hostname": self.config.ssh_host,
+            "username": self.config.ssh_user,
+            "port": self.config.ssh_port,
+        }
+
+        if self.config.ssh_key_path:
+            connect_kwargs["key_filename"] = self.config.ssh_key_path
+        elif self.config.ssh_password:
+            connect_kwargs["password"] = self.config.ssh_password
+            connect_kwargs["look_for_keys"] = False
+            connect_kwargs["allow_agent"] = False
+
+        ssh_client.connect(**connect_kwargs)
+        # Keep NAT/firewall state alive while a connection sits idle in the pool
+        ssh_client.get_transport().set_keepalive(30)
+        return ssh_client
+
+    @staticmethod
+    def is_healthy(client: paramiko.SSHClient) -> bool:
+        """Whether a client's transport is still usable."""
+        transport = client.get_transport()
+        return transport is not None and transport.is_active()
+
+    def _evict(self):
+        """Close dead connections and unused ones past the idle timeout."""
+        now = time.monotonic()
+        keep = []
+
+        for conn in self._connections:
+            idle = conn.leases == 0 and now - conn.last_used > self.idle_timeout
+            if idle or not self.is_healthy(conn.client):
+                conn.client.close()
+            else:
+                keep.append(conn)
+
+        self._connections = keep
+
+    def _reap(self):
+        """Reaper thread: evict idle connections until none are left."""
+        with self._cond:
+            while True:
+                self._evict()
+                if not self._connections:
+                    break
+                now = time.monotonic()
+                idle_since = [c.last_used for c in self._connections if c.leases == 0]
+                # Wake when the longest-idle connection expires (or a release
+                # notifies); busy connections are checked again after a timeout
+                expires = min(idle_since) + self.idle_timeout - now if idle_since else self.idle_timeout
+                self._cond.wait(max(expires, 0) + 1)
+            self._reaper = None
+
+    def _pick(self, can_open: bool) -> Optional[_PooledConnection]:
+        """Choose a connection to lease, or None if a new one should be opened."""
+        available = [c for c in self._connections if c.leases < self.max_channels]
+        if not available:
+            return None
+
+        least_loaded = min(available, key=lambda c: c.leases)
+        if least_loaded.leases > 0 and can_open:
+            # Spread load over transports first: each paramiko transport
+            # encrypts on a single thread
+            return None
+        return least_loaded
+
+    def acquire(self, timeout: Optional[float] = None) -> paramiko.SSHClient:
+        """
+        Lease a connection; pair every call with release().
+
+        Args:
+            timeout: Seconds to wait for capacity (None waits forever)
+
+        Returns:
+            Connected paramiko.SSHClient
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            while True:
+                self._evict()
+                can_open = len(self._connections) + self._opening < self.max_connections
+                conn = self._pick(can_open)
+
+                if conn is not None:
+                    conn.leases += 1
+                    conn.last_used = time.monotonic()
+                    return conn.client
+
+                if can_open:
+                    self._opening += 1
+                    break
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise paramiko.SSHException("Timed out waiting for a pooled SSH connection")
+                self._cond.wait(remaining)
+
+        try:
+            client = self._open()
+        except BaseException:
+            with self._cond:
+                self._opening -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._opening -= 1
+            self._connections.append(
+                _PooledConnection(client, leases=1, last_used=time.monotonic())
+            )
+            if self._reaper is None:
+                self._reaper = threading.Thread(
+                    target=self._reap, name="ssh-pool-reaper", daemon=True
+                )
+                self._reaper.start()
+        return client
+
+    def release(self, client: paramiko.SSHClient):
+        """Return a leased connection to the pool."""
+        with self._cond:
+            for conn in self._connections:
+                if conn.client is client:
+                    conn.leases = max(0, conn.leases - 1)
+                    conn.last_used = time.monotonic()
+                    break
+            self._evict()
+            self._cond.notify_all()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[paramiko.SSHClient]:
+        """Lease a connection for the duration of a with-block."""
+        client = self.acquire(timeout)
+        try:
+            yield client
+        finally:
+            self.release(client)
+
+    def close_all(self):
+        """Close every pooled connection (leased ones included)."""
+        with self._cond:
+            for conn in self._connections:
+                conn.client.close()
+            self._connections = []
+            self._cond.notify_all()
+
+
+_pools: dict[tuple, SSHConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_ssh_pool(config: WordPressConfig) -> SSHConnectionPool:
+    """Get the process-wide pool for the configured SSH host and user."""
+    key = (config.ssh_host, config.ssh_port, config.ssh_user)
+
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = SSHConnectionPool(
+                config,
+                max_connections=config.ssh_pool_size,
+                max_channels=config.ssh_channels_per_connection,
+                idle_timeout=config.ssh_idle_timeout,
+            )
+            _pools[key] = pool
+        return pool
@@ -0,0 +1,123 @@
+"""Bounded thread-pool dispatch for blocking MCP tool handlers."""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+class ToolCancelledError(Exception):
+    """Exception raised inside a tool handler after the client aborted the call."""
+    pass
+
+
+_cancel_event: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar(
+    "tool_cancel_event", default=None
+)
+
+
+def check_cancelled():
+    """
+    Raise ToolCancelledError if the current tool call was cancelled.
+
+    A running thread cannot be interrupted, so long-running handlers (backups,
+    site audits) call this between units of work to stop promptly once the
+    client gives up on the request. Outside a tool call this is a no-op.
+    """
+    event = _cancel_event.get()
+    if event is not None and event.is_set():
+        raise ToolCancelledError("Tool call cancelled by client")
+
+
+def in_current_context(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wrap func to run in a copy of the calling thread's context.
+
+    Handlers that fan work out to their own threads or pools pass their
+    tasks through this, so check_cancelled() inside a task still sees the
+    tool call's cancellation state. Each call gets its own copy.
+    """
+    return functools.partial(contextvars.copy_context().run, func)
+
+
+class ToolExecutor:
+    """Run synchronous tool handlers off the event loop with per-tool limits."""
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        tool_limits: Optional[dict[str, int]] = None,
+        tool_groups: Optional[dict[str, str]] = None,
+    ):
+        """
+        Initialize the executor.
+
+        Args:
+            max_workers: Size of the shared worker thread pool
+            tool_limits: Max concurrent calls per tool (or per group) name
+            tool_groups: Maps tool names onto a shared limit group
+        """
+        self.max_workers = max_workers
+        self.tool_limits = tool_limits or {}
+        self.tool_groups = tool_groups or {}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mcp-tool")
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def _semaphore(self, name: str) -> asyncio.Semaphore:
+        """Get the semaphore guarding a tool (created on first use)."""
+        key = self.tool_groups.get(name, name)
+        if key not in self._semaphores:
+            limit = self.tool_limits.get(key, self.max_workers)
+            self._semaphores[key] = asyncio.Semaphore(max(1, limit))
+        return self._semaphores[key]
+
+    async def run(self, name: str, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run func(*args) on the worker pool under the tool's concurrency limit.
+
+        If the awaiting task is cancelled, a call that has not started yet is
+        dropped and a running call is signalled via check_cancelled(). The
+        tool's slot is only released once its thread has actually finished,
+        so a cancelled backup can't overlap with the next one.
+
+        Args:
+            name: Tool name (selects the concurrency limit)
+            func: Blocking callable to run
+            *args: Positional arguments for func
+
+        Returns:
+            Whatever func returns
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphore(name)
+        await semaphore.acquire()
+
+        event = threading.Event()
+        ctx = contextvars.copy_context()
+        ctx.run(_cancel_event.set, event)
+
+        def release(_future):
+            try:
+                loop.call_soon_threadsafe(semaphore.release)
+            except RuntimeError:
+                # Event loop already closed (server shutting down)
+                pass
+
+        try:
+            future = self._pool.submit(ctx.run, func, *args)
+        except BaseException:
+            semaphore.release()
+            raise
+        future.add_done_callback(release)
+
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            event.set()
+            raise
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work and shut down the worker pool."""
+        self._pool.shutdown(wait=wait)
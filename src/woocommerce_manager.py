@@ -1,6 +1,6 @@
 """WooCommerce product and sales management."""
 
-from typing import Optional, Literal
+from typing import Iterator, Optional, Literal
 from .config import WordPressConfig
 from .wp_api import WordPressAPIClient
 
@@ -133,7 +133,7 @@ class WooCommerceManager:
         List WooCommerce products.
 
         Args:
-            per_page: Number of products to return
+            per_page: Number of products to return (pages are followed above 100)
             status: Filter by status (publish, draft, pending)
             category: Filter by category ID
             search: Search term
@@ -141,7 +141,30 @@ class WooCommerceManager:
         Returns:
             List of products
         """
-        params = {"per_page": per_page}
+        return list(self.iter_products(status, category, search, limit=per_page))
+
+    def iter_products(
+        self,
+        status: Optional[str] = None,
+        category: Optional[int] = None,
+        search: Optional[str] = None,
+        fields: Optional[list[str]] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[dict]:
+        """
+        Iterate all matching products, following pagination.
+
+        Args:
+            status: Filter by status (publish, draft, pending)
+            category: Filter by category ID
+            search: Search term
+            fields: Only return these fields (e.g. ["id", "name", "price"])
+            limit: Stop after this many products
+
+        Yields:
+            Products
+        """
+        params = {}
 
         if status:
             params["status"] = status
@@ -150,7 +173,9 @@ class WooCommerceManager:
         if search:
             params["search"] = search
 
-        return self.api._request("GET", f"{self.wc_base}/products", params=params)
+        return self.api.iter_collection(
+            f"{self.wc_base}/products", params, fields=fields, limit=limit
+        )
 
     def delete_product(self, product_id: int, force: bool = False) -> dict:
         """
@@ -182,21 +207,44 @@ class WooCommerceManager:
         List WooCommerce orders.
 
         Args:
-            per_page: Number of orders to return
+            per_page: Number of orders to return (pages are followed above 100)
             status: Filter by status (completed, processing, pending, etc.)
             customer: Filter by customer ID
 
         Returns:
             List of orders
         """
-        params = {"per_page": per_page}
+        return list(self.iter_orders(status, customer, limit=per_page))
+
+    def iter_orders(
+        self,
+        status: Optional[str] = None,
+        customer: Optional[int] = None,
+        fields: Optional[list[str]] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[dict]:
+        """
+        Iterate all matching orders, following pagination.
+
+        Args:
+            status: Filter by status (completed, processing, pending, etc.)
+            customer: Filter by customer ID
+            fields: Only return these fields (e.g. ["id", "total", "status"])
+            limit: Stop after this many orders
+
+        Yields:
+            Orders
+        """
+        params = {}
 
         if status:
             params["status"] = status
         if customer:
             params["customer"] = customer
 
-        return self.api._request("GET", f"{self.wc_base}/orders", params=params)
+        return self.api.iter_collection(
+            f"{self.wc_base}/orders", params, fields=fields, limit=limit
+        )
 
     def get_order(self, order_id: int) -> dict:
         """Get single order details."""
@@ -351,25 +399,48 @@ class WooCommerceManager:
         List WooCommerce customers.
 
         Args:
-            per_page: Number to return
+            per_page: Number to return (pages are followed above 100)
             role: Filter by role
             search: Search term
 
         Returns:
             List of customers
         """
-        params = {"per_page": per_page}
+        return list(self.iter_customers(role, search, limit=per_page))
+
+    def iter_customers(
+        self,
+        role: Optional[str] = None,
+        search: Optional[str] = None,
+        fields: Optional[list[str]] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[dict]:
+        """
+        Iterate all matching customers, following pagination.
+
+        Args:
+            role: Filter by role
+            search: Search term
+            fields: Only return these fields (e.g. ["id", "email"])
+            limit: Stop after this many customers
+
+        Yields:
+            Customers
+        """
+        params = {}
 
         if role:
             params["role"] = role
         if search:
             params["search"] = search
 
-        return self.api._request("GET", f"{self.wc_base}/customers", params=params)
+        return self.api.iter_collection(
+            f"{self.wc_base}/customers", params, fields=fields, limit=limit
+        )
 
     def get_customer_orders(self, customer_id: int) -> list[dict]:
         """Get all orders for a specific customer."""
-        return self.list_orders(customer=customer_id, per_page=100)
+        return list(self.iter_orders(customer=customer_id))
 
     # ==================== REPORTS & ANALYTICS ====================
 
@@ -428,10 +499,8 @@ class WooCommerceManager:
         Returns:
             Product data if found, None otherwise
         """
-        # Search for product with related course meta
-        products = self.list_products(per_page=100)
-
-        for product in products:
+        # Search every product (not just the first page) for related course meta
+        for product in self.iter_products():
             meta = product.get("meta_data", [])
             for m in meta:
                 if m.get("key") == "_related_course" and m.get("value") == str(course_id):
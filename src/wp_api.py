@@ -1,8 +1,11 @@
 """WordPress REST API client."""
 
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator, Optional
+from urllib.parse import quote
 import requests
-from typing import Any, Optional
 from .config import WordPressConfig
+from .http_session import get_shared_session
 
 
 class WordPressAPIError(Exception):
@@ -13,9 +16,22 @@ class WordPressAPIError(Exception):
 class WordPressAPIClient:
     """Client for WordPress REST API operations."""
 
-    def __init__(self, config: WordPressConfig):
+    # Read timeouts (seconds) for slow endpoints, keyed by resource path prefix
+    # relative to the API namespace (e.g. "media" or "reports/sales").
+    # Anything not listed uses config.http_timeout.
+    ENDPOINT_TIMEOUTS = {
+        "media": 60,
+        "reports": 120,
+    }
+
+    # WordPress (and WooCommerce) reject per_page values above this
+    MAX_PER_PAGE = 100
+
+    def __init__(self, config: WordPressConfig, endpoint_timeouts: Optional[dict] = None):
         self.config = config
         self.base_url = f"{config.site_url.rstrip('/')}/wp-json/wp/v2"
+        self.session = get_shared_session(config)
+        self.endpoint_timeouts = {**self.ENDPOINT_TIMEOUTS, **(endpoint_timeouts or {})}
 
         # Support both JWT and Application Password authentication
         if config.jwt_token:
@@ -25,24 +41,48 @@ class WordPressAPIClient:
             self.auth = (config.api_user, config.api_password)
             self.headers = {}
 
-    def _request(
+    def _url(self, endpoint: str) -> str:
+        """Resolve an endpoint against base_url (absolute URLs pass through)."""
+        if endpoint.startswith(("http://", "https://")):
+            return endpoint
+        return f"{self.base_url}/{endpoint.lstrip('/')}"
+
+    def _timeout_for(self, url: str) -> float:
+        """Pick the read timeout for a URL (longest matching endpoint prefix wins)."""
+        # ".../wp-json/wc/v3/reports/sales" -> "reports/sales"
+        route = url.split("/wp-json/", 1)[-1].split("?", 1)[0]
+        resource = route.split("/", 2)[2] if route.count("/") >= 2 else route
+
+        timeout = self.config.http_timeout
+        matched = ""
+        for prefix, prefix_timeout in self.endpoint_timeouts.items():
+            if resource.startswith(prefix) and len(prefix) > len(matched):
+                matched = prefix
+                timeout = prefix_timeout
+        return timeout
+
+    def _send(
         self,
         method: str,
         endpoint: str,
         params: Optional[dict] = None,
-        json_data: Optional[dict] = None
-    ) -> Any:
-        """Make API request."""
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        json_data: Optional[dict] = None,
+        timeout: Optional[float] = None,
+        data: Optional[bytes] = None,
+        headers: Optional[dict] = None
+    ) -> requests.Response:
+        """Send API request over the shared keep-alive session."""
+        url = self._url(endpoint)
 
-        response = requests.request(
+        response = self.session.request(
             method=method,
             url=url,
             auth=self.auth,
-            headers=self.headers,
+            headers={**self.headers, **(headers or {})},
             params=params,
             json=json_data,
-            timeout=30
+            data=data,
+            timeout=timeout or self._timeout_for(url)
         )
 
         if not response.ok:
@@ -50,14 +90,107 @@ class WordPressAPIClient:
                 f"API request failed ({response.status_code}): {response.text}"
             )
 
-        return response.json()
+        return response
+
+    def _request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[dict] = None,
+        json_data: Optional[dict] = None,
+        timeout: Optional[float] = None
+    ) -> Any:
+        """Make API request and return the decoded JSON body."""
+        return self._send(method, endpoint, params, json_data, timeout).json()
+
+    def _next_page(
+        self,
+        response: requests.Response,
+        endpoint: str,
+        params: dict,
+        page: int
+    ) -> Optional[tuple[str, Optional[dict]]]:
+        """Work out the request for the page after `response`, if any."""
+        # Prefer the Link header: it already carries every query argument
+        next_url = response.links.get("next", {}).get("url")
+        if next_url:
+            return next_url, None
+
+        total_pages = response.headers.get("X-WP-TotalPages")
+        if total_pages and page < int(total_pages):
+            return endpoint, {**params, "page": page + 1}
+
+        return None
+
+    def iter_collection(
+        self,
+        endpoint: str,
+        params: Optional[dict] = None,
+        per_page: int = MAX_PER_PAGE,
+        fields: Optional[list[str]] = None,
+        limit: Optional[int] = None,
+        prefetch: bool = True
+    ) -> Iterator[dict]:
+        """
+        Iterate every item of a paginated collection endpoint.
+
+        Follows the Link / X-WP-TotalPages headers instead of stopping at the
+        first page. While the caller consumes one page, the next is fetched
+        in the background.
+
+        Args:
+            endpoint: Collection endpoint (relative, or an absolute URL for wc/v3)
+            params: Query filters
+            per_page: Page size (capped at MAX_PER_PAGE)
+            fields: Only return these fields (_fields projection)
+            limit: Stop after this many items
+            prefetch: Fetch the next page while the current one is consumed
+
+        Yields:
+            Collection items, in API order
+        """
+        params = dict(params or {})
+        page = params.pop("page", 1)
+        params["per_page"] = min(per_page, limit or per_page, self.MAX_PER_PAGE)
+        if fields:
+            params["_fields"] = ",".join(fields)
+
+        remaining = limit
+        response = self._send("GET", endpoint, params={**params, "page": page})
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="wp-prefetch") as prefetcher:
+            while True:
+                items = response.json()
+                if not items:
+                    return
+
+                if remaining is not None:
+                    items = items[:remaining]
+                    remaining -= len(items)
+
+                next_request = None
+                if remaining is None or remaining > 0:
+                    next_request = self._next_page(response, endpoint, params, page)
+
+                future = None
+                if next_request and prefetch:
+                    future = prefetcher.submit(self._send, "GET", *next_request)
+
+                yield from items
+
+                if next_request is None:
+                    return
+
+                response = future.result() if future else self._send("GET", *next_request)
+                page += 1
 
     def get_posts(
         self,
         per_page: int = 10,
         page: int = 1,
         search: Optional[str] = None,
-        status: str = "publish"
+        status: str = "publish",
+        fields: Optional[list[str]] = None
     ) -> list[dict]:
         """Get posts from WordPress."""
         params = {
@@ -68,9 +201,25 @@ class WordPressAPIClient:
 
         if search:
             params["search"] = search
+        if fields:
+            params["_fields"] = ",".join(fields)
 
         return self._request("GET", "posts", params=params)
 
+    def iter_posts(
+        self,
+        search: Optional[str] = None,
+        status: str = "publish",
+        fields: Optional[list[str]] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[dict]:
+        """Iterate all posts, following pagination."""
+        params = {"status": status}
+        if search:
+            params["search"] = search
+
+        return self.iter_collection("posts", params, fields=fields, limit=limit)
+
     def get_post(self, post_id: int) -> dict:
         """Get single post by ID."""
         return self._request("GET", f"posts/{post_id}")
@@ -79,7 +228,8 @@ class WordPressAPIClient:
         self,
         per_page: int = 10,
         page: int = 1,
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        fields: Optional[list[str]] = None
     ) -> list[dict]:
         """Get pages from WordPress."""
         params = {
@@ -90,13 +240,83 @@ class WordPressAPIClient:
 
         if search:
             params["search"] = search
+        if fields:
+            params["_fields"] = ",".join(fields)
 
         return self._request("GET", "pages", params=params)
 
+    def iter_pages(
+        self,
+        search: Optional[str] = None,
+        fields: Optional[list[str]] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[dict]:
+        """Iterate all published pages, following pagination."""
+        params = {"status": "publish"}
+        if search:
+            params["search"] = search
+
+        return self.iter_collection("pages", params, fields=fields, limit=limit)
+
     def get_page(self, page_id: int) -> dict:
         """Get single page by ID."""
         return self._request("GET", f"pages/{page_id}")
 
+    def iter_media(
+        self,
+        media_type: Optional[str] = None,
+        mime_type: Optional[str] = None,
+        fields: Optional[list[str]] = None,
+        limit: Optional[int] = None,
+        context: Optional[str] = None
+    ) -> Iterator[dict]:
+        """
+        Iterate the media library, following pagination.
+
+        Args:
+            media_type: Filter by type (image, video, audio, application)
+            mime_type: Filter by MIME type (e.g. image/png)
+            fields: Only return these fields
+            limit: Stop after this many items
+            context: "edit" to get raw field values (needs edit rights)
+        """
+        params = {}
+        if media_type:
+            params["media_type"] = media_type
+        if mime_type:
+            params["mime_type"] = mime_type
+        if context:
+            params["context"] = context
+
+        return self.iter_collection("media", params, fields=fields, limit=limit)
+
+    def upload_media(
+        self,
+        filename: str,
+        data: bytes,
+        mime_type: str,
+        fields: Optional[dict] = None
+    ) -> dict:
+        """
+        Upload a file to the media library as a new attachment.
+
+        Args:
+            filename: File name WordPress stores it under (made unique if taken)
+            data: File contents
+            mime_type: MIME type of data
+            fields: Attachment fields to set (title, alt_text, post, ...)
+
+        Returns:
+            The new media object
+        """
+        if filename.isascii():
+            disposition = f'attachment; filename="{filename}"'
+        else:
+            # Headers are Latin-1; RFC 5987 carries other names
+            disposition = f"attachment; filename*=UTF-8''{quote(filename)}"
+        headers = {"Content-Type": mime_type, "Content-Disposition": disposition}
+        return self._send("POST", "media", params=fields, data=data, headers=headers).json()
+
     def get_post_meta(self, post_id: int) -> dict:
         """
         Get post metadata.
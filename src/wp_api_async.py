@@ -0,0 +1,229 @@
+"""Async WordPress REST API client with concurrent fan-out."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Iterable, Optional, TypeVar
+import httpx
+from .config import WordPressConfig
+from .http_session import RETRY_STATUS_CODES
+from .wp_api import WordPressAPIClient, WordPressAPIError
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Methods safe to send twice, so retried on 429/5xx or when the connection
+# dropped after the request went out (urllib3's Retry defaults, as used by
+# the sync client)
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS", "TRACE"})
+# Failures that happen before anything is sent; retried for every method
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class AsyncWordPressAPIClient:
+    """
+    Coroutine counterpart to WordPressAPIClient.
+
+    Uses one pooled HTTP/2 connection set for its lifetime, so fetching
+    hundreds of objects with gather() costs roughly one round trip per
+    `concurrency` objects rather than one per object. Use as an async
+    context manager (or call aclose()) to release connections.
+    """
+
+    ENDPOINT_TIMEOUTS = WordPressAPIClient.ENDPOINT_TIMEOUTS
+
+    # URL resolution and per-endpoint timeouts match the sync client exactly
+    _url = WordPressAPIClient._url
+    _timeout_for = WordPressAPIClient._timeout_for
+
+    def __init__(
+        self,
+        config: WordPressConfig,
+        endpoint_timeouts: Optional[dict] = None,
+        concurrency: Optional[int] = None,
+    ):
+        """
+        Initialize the async client.
+
+        Args:
+            config: WordPress configuration
+            endpoint_timeouts: Overrides for ENDPOINT_TIMEOUTS
+            concurrency: Default max in-flight requests for gather()
+                (defaults to the HTTP pool size)
+        """
+        self.config = config
+        self.base_url = f"{config.site_url.rstrip('/')}/wp-json/wp/v2"
+        self.endpoint_timeouts = {**self.ENDPOINT_TIMEOUTS, **(endpoint_timeouts or {})}
+        self.concurrency = concurrency or config.http_pool_size
+
+        # Support both JWT and Application Password authentication
+        if config.jwt_token:
+            auth = None
+            headers = {"Authorization": f"Bearer {config.jwt_token}"}
+        else:
+            auth = (config.api_user, config.api_password)
+            headers = {}
+
+        self.client = httpx.AsyncClient(
+            auth=auth,
+            headers=headers,
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=config.http_pool_size,
+                max_keepalive_connections=config.http_pool_size,
+            ),
+            timeout=config.http_timeout,
+        )
+
+    async def __aenter__(self) -> "AsyncWordPressAPIClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close pooled connections."""
+        await self.client.aclose()
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[dict] = None,
+        json_data: Optional[dict] = None,
+        timeout: Optional[float] = None
+    ) -> Any:
+        """
+        Make API request, retrying with exponential backoff.
+
+        As with the sync client's Retry policy, 429/5xx responses and
+        dropped connections are only retried for idempotent methods (a
+        POST may have taken effect), and connection failures for any.
+        """
+        url = self._url(endpoint)
+        timeout = timeout or self._timeout_for(url)
+
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        for attempt in range(self.config.http_max_retries + 1):
+            last_attempt = attempt == self.config.http_max_retries
+            try:
+                response = await self.client.request(
+                    method,
+                    url,
+                    params=params,
+                    json=json_data,
+                    timeout=timeout,
+                )
+            except httpx.TransportError as e:
+                # Timeouts and dropped connections (TimeoutException is a TransportError)
+                if last_attempt or not (idempotent or isinstance(e, UNSENT_ERRORS)):
+                    raise
+                await asyncio.sleep(self.config.http_backoff_factor * (2 ** attempt))
+                continue
+
+            if response.status_code not in RETRY_STATUS_CODES or last_attempt or not idempotent:
+                break
+
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                delay = float(retry_after)
+            else:
+                delay = self.config.http_backoff_factor * (2 ** attempt)
+            await asyncio.sleep(delay)
+
+        if not response.is_success:
+            raise WordPressAPIError(
+                f"API request failed ({response.status_code}): {response.text}"
+            )
+
+        return response.json()
+
+    async def get_posts(
+        self,
+        per_page: int = 10,
+        page: int = 1,
+        search: Optional[str] = None,
+        status: str = "publish"
+    ) -> list[dict]:
+        """Get posts from WordPress."""
+        params = {
+            "per_page": per_page,
+            "page": page,
+            "status": status,
+        }
+
+        if search:
+            params["search"] = search
+
+        return await self._request("GET", "posts", params=params)
+
+    async def get_post(self, post_id: int) -> dict:
+        """Get single post by ID."""
+        return await self._request("GET", f"posts/{post_id}")
+
+    async def get_pages(
+        self,
+        per_page: int = 10,
+        page: int = 1,
+        search: Optional[str] = None
+    ) -> list[dict]:
+        """Get pages from WordPress."""
+        params = {
+            "per_page": per_page,
+            "page": page,
+            "status": "publish",
+        }
+
+        if search:
+            params["search"] = search
+
+        return await self._request("GET", "pages", params=params)
+
+    async def get_page(self, page_id: int) -> dict:
+        """Get single page by ID."""
+        return await self._request("GET", f"pages/{page_id}")
+
+    async def search_content(self, query: str, post_type: str = "posts") -> list[dict]:
+        """Search across content."""
+        params = {
+            "search": query,
+            "per_page": 20,
+        }
+
+        return await self._request("GET", post_type, params=params)
+
+    async def gather(
+        self,
+        func: Callable[[T], Awaitable[R]],
+        items: Iterable[T],
+        concurrency: Optional[int] = None,
+        return_exceptions: bool = False,
+    ) -> list[R]:
+        """
+        Run func over items concurrently, at most `concurrency` at a time.
+
+        Args:
+            func: Coroutine function taking one item (e.g. self.get_post)
+            items: Items to fetch (e.g. post IDs)
+            concurrency: Max in-flight calls (defaults to self.concurrency)
+            return_exceptions: Return failures in place instead of raising
+
+        Returns:
+            Results in the same order as items
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.concurrency)
+
+        async def bounded(item: T) -> R:
+            async with semaphore:
+                return await func(item)
+
+        return await asyncio.gather(
+            *(bounded(item) for item in items),
+            return_exceptions=return_exceptions,
+        )
+
+    async def get_posts_by_id(
+        self,
+        post_ids: Iterable[int],
+        return_exceptions: bool = False,
+    ) -> list[dict]:
+        """Fetch many posts concurrently, preserving order."""
+        return await self.gather(self.get_post, post_ids, return_exceptions=return_exceptions)
@@ -1,9 +1,61 @@
 """WordPress CLI wrapper for remote execution via SSH."""
 
 import json
+import shlex
+import threading
 import paramiko
+from base64 import b64encode
+from dataclasses import dataclass
 from typing import Any, Optional
 from .config import WordPressConfig
+from .ssh_pool import get_ssh_pool
+
+# Result lines from the PHP runners start with this marker, so stray output
+# (PHP notices, plugin echo) on stdout can't be mistaken for a result
+RESULT_MARKER = b"@@WPCLI-RESULT@@"
+
+# Run inside `wp eval`: WordPress is bootstrapped once, then every JSON line on
+# stdin is run in-process with WP_CLI::runcommand and answered with one
+# marker-prefixed JSON line on stdout.
+SESSION_WORKER_PHP = r"""
+while (($line = fgets(STDIN)) !== false) {
+    $request = json_decode($line, true);
+    if (!is_array($request)) {
+        continue;
+    }
+    $result = WP_CLI::runcommand($request["command"], array(
+        "return" => "all",
+        "launch" => false,
+        "exit_error" => false,
+    ));
+    echo "@@WPCLI-RESULT@@" . json_encode(array(
+        "id" => $request["id"],
+        "stdout" => $result->stdout,
+        "stderr" => $result->stderr,
+        "return_code" => $result->return_code,
+    )) . "\n";
+    flush();
+}
+"""
+
+# Run inside `wp eval`: executes a base64-encoded JSON list of commands
+# in-process and prints all results as one marker-prefixed JSON line.
+BATCH_PHP = r"""
+$results = array();
+foreach (json_decode(base64_decode("__COMMANDS__"), true) as $command) {
+    $result = WP_CLI::runcommand($command, array(
+        "return" => "all",
+        "launch" => false,
+        "exit_error" => false,
+    ));
+    $results[] = array(
+        "stdout" => $result->stdout,
+        "stderr" => $result->stderr,
+        "return_code" => $result->return_code,
+    );
+}
+echo "@@WPCLI-RESULT@@" . json_encode($results) . "\n";
+"""
 
 
 class WPCLIError(Exception):
@@ -11,41 +63,125 @@ class WPCLIError(Exception):
     pass
 
 
+@dataclass
+class WPCLIResult:
+    """Result of one command in a batch."""
+    command: str
+    exit_code: int
+    output: Any
+    error: str
+
+    @property
+    def ok(self) -> bool:
+        return self.exit_code == 0
+
+
+class WPCLISession:
+    """
+    Long-lived wp-cli worker on one SSH channel.
+
+    Pays the WordPress bootstrap once, then streams commands in and JSON
+    results out. Commands share one PHP process, so anything a command leaves
+    in globals or the object cache is visible to the next one.
+    """
+
+    def __init__(self, ssh_client: paramiko.SSHClient, remote_path: str):
+        self.channel = ssh_client.get_transport().open_session()
+        self.channel.exec_command(
+            f"cd {remote_path} && wp eval {shlex.quote(SESSION_WORKER_PHP)}"
+        )
+        self.stdin = self.channel.makefile_stdin("wb")
+        self.stdout = self.channel.makefile("rb")
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    @property
+    def alive(self) -> bool:
+        """Whether the worker process is still running."""
+        return not self.channel.closed and not self.channel.exit_status_ready()
+
+    def run(self, commands: list[str]) -> list[tuple[int, str, str]]:
+        """
+        Run commands in order, pipelined over the channel.
+
+        Args:
+            commands: wp-cli commands (without 'wp' prefix)
+
+        Returns:
+            (exit_code, stdout, stderr) for each command
+        """
+        with self._lock:
+            request_ids = []
+            for command in commands:
+                self._next_id += 1
+                request_ids.append(self._next_id)
+                request = {"id": self._next_id, "command": command}
+                self.stdin.write(json.dumps(request).encode("utf-8") + b"\n")
+            self.stdin.flush()
+
+            return [self._read_result(request_id) for request_id in request_ids]
+
+    def _read_result(self, request_id: int) -> tuple[int, str, str]:
+        """Read lines until the result for request_id arrives."""
+        while True:
+            line = self.stdout.readline()
+            if not line:
+                error = self.channel.makefile_stderr("rb").read().decode("utf-8").strip()
+                raise WPCLIError(f"wp-cli session ended unexpectedly: {error}")
+
+            if not line.startswith(RESULT_MARKER):
+                continue
+
+            result = json.loads(line[len(RESULT_MARKER):])
+            if result["id"] == request_id:
+                return (
+                    result["return_code"],
+                    (result["stdout"] or "").strip(),
+                    (result["stderr"] or "").strip(),
+                )
+
+    def close(self):
+        """Stop the worker (it exits when stdin closes)."""
+        try:
+            self.channel.shutdown_write()
+        finally:
+            self.channel.close()
+
+
 class WPCLIClient:
     """Client for executing wp-cli commands remotely."""
 
-    def __init__(self, config: WordPressConfig):
+    def __init__(self, config: WordPressConfig, persistent: Optional[bool] = None):
+        """
+        Initialize the client.
+
+        Args:
+            config: WordPress configuration
+            persistent: Run commands through one long-lived WPCLISession instead
+                of a fresh `wp` process per call (defaults to config.wp_cli_persistent)
+        """
         self.config = config
+        self.persistent = config.wp_cli_persistent if persistent is None else persistent
+        self.pool = get_ssh_pool(config)
         self.ssh_client: Optional[paramiko.SSHClient] = None
+        self.session: Optional[WPCLISession] = None
+        self._connect_lock = threading.Lock()
 
     def connect(self):
-        """Establish SSH connection."""
-        if self.ssh_client is not None:
-            return
-
-        self.ssh_client = paramiko.SSHClient()
-        self.ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-
-        connect_kwargs = {
-            "hostname": self.config.ssh_host,
-            "username": self.config.ssh_user,
-            "port": self.config.ssh_port,
-        }
-
-        if self.config.ssh_key_path:
-            connect_kwargs["key_filename"] = self.config.ssh_key_path
-        elif self.config.ssh_password:
-            connect_kwargs["password"] = self.config.ssh_password
-            connect_kwargs["look_for_keys"] = False
-            connect_kwargs["allow_agent"] = False
-
-        self.ssh_client.connect(**connect_kwargs)
+        """Lease a pooled SSH connection for the persistent session."""
+        with self._connect_lock:
+            if self.ssh_client is None:
+                self.ssh_client = self.pool.acquire()
 
     def disconnect(self):
-        """Close SSH connection."""
-        if self.ssh_client:
-            self.ssh_client.close()
-            self.ssh_client = None
+        """Stop the session and return its SSH connection to the pool."""
+        with self._connect_lock:
+            if self.session:
+                self.session.close()
+                self.session = None
+            if self.ssh_client:
+                self.pool.release(self.ssh_client)
+                self.ssh_client = None
 
     def execute(self, command: str, format: str = "json") -> Any:
         """
@@ -58,25 +194,128 @@ class WPCLIClient:
         Returns:
             Command output (parsed JSON if format=json)
         """
-        self.connect()
+        command = self._with_format(command, format)
 
-        # Build full command
-        if format and format != "table":
-            full_command = f"cd {self.config.remote_path} && wp {command} --format={format}"
+        if self.persistent:
+            exit_code, output, error = self._get_session().run([command])[0]
         else:
-            full_command = f"cd {self.config.remote_path} && wp {command}"
-
-        # Execute command
-        stdin, stdout, stderr = self.ssh_client.exec_command(full_command)
-        exit_code = stdout.channel.recv_exit_status()
-
-        output = stdout.read().decode('utf-8').strip()
-        error = stderr.read().decode('utf-8').strip()
+            exit_code, output, error = self._exec(command)
 
         if exit_code != 0:
             raise WPCLIError(f"wp-cli command failed: {error or output}")
 
-        # Parse JSON output if requested
+        return self._parse_output(output, format)
+
+    def execute_batch(
+        self,
+        commands: list[str],
+        format: str = "json",
+        check: bool = False
+    ) -> list[WPCLIResult]:
+        """
+        Execute several wp-cli commands in one round trip and one bootstrap.
+
+        Commands run in order inside a single PHP process (the persistent
+        session if enabled, otherwise one `wp eval`). A failing command does
+        not stop the ones after it.
+
+        Args:
+            commands: wp-cli commands (without 'wp' prefix)
+            format: Output format applied to every command
+            check: Raise WPCLIError if any command failed
+
+        Returns:
+            One WPCLIResult per command, in order
+        """
+        if not commands:
+            return []
+
+        full_commands = [self._with_format(command, format) for command in commands]
+
+        if self.persistent:
+            raw_results = self._get_session().run(full_commands)
+        else:
+            raw_results = self._exec_batch(full_commands)
+
+        results = [
+            WPCLIResult(
+                command=command,
+                exit_code=exit_code,
+                output=self._parse_output(output, format),
+                error=error,
+            )
+            for command, (exit_code, output, error) in zip(commands, raw_results)
+        ]
+
+        failed = [r for r in results if not r.ok]
+        if check and failed:
+            details = "; ".join(f"{r.command}: {r.error or r.output}" for r in failed)
+            raise WPCLIError(f"wp-cli batch failed: {details}")
+
+        return results
+
+    def _with_format(self, command: str, format: Optional[str]) -> str:
+        """Append the --format flag (table is wp-cli's default)."""
+        if format and format != "table":
+            return f"{command} --format={format}"
+        return command
+
+    def _exec_batch(self, commands: list[str]) -> list[tuple[int, str, str]]:
+        """Run commands through one `wp eval` process."""
+        encoded = b64encode(json.dumps(commands).encode("utf-8")).decode("ascii")
+        script = BATCH_PHP.replace("__COMMANDS__", encoded)
+
+        exit_code, output, error = self._exec(f"eval {shlex.quote(script)}")
+        if exit_code != 0:
+            raise WPCLIError(f"wp-cli batch failed: {error or output}")
+
+        marker = RESULT_MARKER.decode("ascii")
+        for line in output.splitlines():
+            if line.startswith(marker):
+                return [
+                    (
+                        result["return_code"],
+                        (result["stdout"] or "").strip(),
+                        (result["stderr"] or "").strip(),
+                    )
+                    for result in json.loads(line[len(marker):])
+                ]
+
+        raise WPCLIError(f"wp-cli batch returned no results: {error or output}")
+
+    def _exec(self, command: str) -> tuple[int, str, str]:
+        """Run one command in its own `wp` process over a pooled SSH connection."""
+        full_command = f"cd {self.config.remote_path} && wp {command}"
+
+        with self.pool.connection() as ssh_client:
+            stdin, stdout, stderr = ssh_client.exec_command(full_command)
+
+            # Drain output before waiting for exit so large results can't stall the channel
+            output = stdout.read().decode('utf-8').strip()
+            error = stderr.read().decode('utf-8').strip()
+            exit_code = stdout.channel.recv_exit_status()
+
+        return exit_code, output, error
+
+    def _get_session(self) -> WPCLISession:
+        """Get the persistent worker session, (re)starting it if needed."""
+        with self._connect_lock:
+            if self.session is not None and self.session.alive:
+                return self.session
+
+            if self.session is not None:
+                self.session.close()
+            if self.ssh_client is not None and not self.pool.is_healthy(self.ssh_client):
+                self.pool.release(self.ssh_client)
+                self.ssh_client = None
+            if self.ssh_client is None:
+                self.ssh_client = self.pool.acquire()
+
+            self.session = WPCLISession(self.ssh_client, self.config.remote_path)
+            return self.session
+
+    def _parse_output(self, output: str, format: Optional[str]) -> Any:
+        """Parse JSON output if requested."""
         if format == "json" and output:
             try:
                 return json.loads(output)
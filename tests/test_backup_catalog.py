@@ -0,0 +1,81 @@
+"""Tests for the backup catalog."""
+
+import json
+import threading
+
+from src.backup_catalog import BackupCatalog
+from src.backup_manager import BackupManager
+from src.config import WordPressConfig
+
+
+def entry(name, created="2026-01-01T00:00:00"):
+    return {"name": name, "created": created, "bytes": 1}
+
+
+def test_rebuilds_once_when_missing(tmp_path):
+    calls = []
+
+    def rebuild():
+        calls.append(1)
+        return [entry("scanned")]
+
+    catalog = BackupCatalog(tmp_path / "catalog.json", rebuild)
+    assert [e["name"] for e in catalog.entries()] == ["scanned"]
+    assert catalog.get("scanned") is not None
+    assert len(calls) == 1
+
+
+def test_rebuilds_when_unreadable(tmp_path):
+    path = tmp_path / "catalog.json"
+    path.write_text("{not json")
+
+    catalog = BackupCatalog(path, lambda: [entry("scanned")])
+    assert catalog.get("scanned") is not None
+    assert json.loads(path.read_text())["backups"].keys() == {"scanned"}
+
+
+def test_add_remove_and_order(tmp_path):
+    catalog = BackupCatalog(tmp_path / "catalog.json", list)
+    catalog.add(entry("old", "2026-01-01T00:00:00"))
+    catalog.add(entry("new", "2026-02-01T00:00:00"))
+
+    assert [e["name"] for e in catalog.entries()] == ["new", "old"]
+    assert catalog.remove("old")
+    assert not catalog.remove("old")
+    assert [e["name"] for e in catalog.entries()] == ["new"]
+
+
+def test_concurrent_adds_from_separate_instances(tmp_path):
+    path = tmp_path / "catalog.json"
+    catalogs = [BackupCatalog(path, list) for _ in range(4)]
+
+    def add_many(index):
+        for i in range(25):
+            catalogs[index].add(entry(f"b{index}-{i}"))
+
+    threads = [threading.Thread(target=add_many, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(BackupCatalog(path, list).entries()) == 100
+    assert [p.name for p in tmp_path.iterdir()] == ["catalog.json"]
+
+
+def test_manager_drops_entries_of_vanished_backups(tmp_path):
+    config = WordPressConfig(
+        site_url="https://example.com",
+        ssh_host="example.com",
+        ssh_user="deploy",
+        ssh_key_path=None,
+        remote_path="/var/www/html",
+        api_user="admin",
+        api_password="secret",
+    )
+    manager = BackupManager(config, local_backup_dir=tmp_path)
+    manager._catalog().add(entry("gone_20260101_000000"))
+
+    assert manager._catalog() is manager._catalog()
+    assert not manager.delete_backup("gone_20260101_000000.tar")
+    assert manager._catalog().get("gone_20260101_000000") is None
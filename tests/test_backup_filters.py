@@ -0,0 +1,66 @@
+"""Tests for backup exclusion rules."""
+
+from src.backup_filters import BackupFilter
+
+
+def test_default_excludes_nothing():
+    file_filter = BackupFilter()
+    assert not file_filter.excludes_directory("cache")
+    assert not file_filter.excludes_file("uploads/photo-300x200.jpg", 10**9)
+    assert file_filter.tar_arguments("wp-content") == []
+
+
+def test_globs_match_whole_path_at_any_depth():
+    file_filter = BackupFilter(exclude=["cache", "*/node_modules/", "*.log"])
+
+    assert file_filter.excludes_directory("cache")
+    assert not file_filter.excludes_directory("uploads/cache")
+    assert file_filter.excludes_directory("plugins/foo/node_modules")
+    assert file_filter.excludes_file("debug.log", 1)
+    assert file_filter.excludes_file("uploads/2026/debug.log", 1)
+    assert not file_filter.excludes_file("uploads/log.txt", 1)
+
+
+def test_root_is_never_excluded():
+    assert not BackupFilter(exclude=["*"]).excludes_directory("")
+
+
+def test_regex_sees_trailing_slash_on_directories():
+    file_filter = BackupFilter(exclude_regex=r"(^|/)backup[^/]*/$")
+
+    assert file_filter.excludes_directory("uploads/backups-old")
+    assert not file_filter.excludes_file("uploads/backups-old", 1)
+
+
+def test_max_file_size():
+    file_filter = BackupFilter(max_file_size=1000)
+
+    assert not file_filter.excludes_file("uploads/a.zip", 1000)
+    assert file_filter.excludes_file("uploads/a.zip", 1001)
+
+
+def test_thumbnails_skipped_by_listed_path_only():
+    file_filter = BackupFilter(thumbnails={"uploads/2026/01/photo-300x200.jpg"})
+
+    assert file_filter.excludes_file("uploads/2026/01/photo-300x200.jpg", 1)
+    assert not file_filter.excludes_file("uploads/2026/01/photo.jpg", 1)
+    assert not file_filter.excludes_file("uploads/2026/02/photo-300x200.jpg", 1)
+
+
+def test_original_named_like_a_thumbnail_is_kept():
+    # No banner.jpg and not in any attachment's sizes: this is an original
+    file_filter = BackupFilter(thumbnails={"uploads/2026/01/photo-300x200.jpg"})
+
+    assert not file_filter.excludes_file("uploads/2026/01/banner-1920x1080.jpg", 1)
+    assert not file_filter.excludes_file("uploads/screenshot-2560x1440.png", 1)
+
+
+def test_tar_arguments_anchor_globs_below_root():
+    file_filter = BackupFilter(exclude=["/cache/", "*.log"], max_file_size=5)
+
+    assert file_filter.tar_arguments("wp-content") == [
+        "--anchored",
+        "--wildcards",
+        "--exclude=wp-content/cache",
+        "--exclude=wp-content/*.log",
+    ]
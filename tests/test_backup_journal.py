@@ -0,0 +1,89 @@
+"""Tests for the resume journal."""
+
+from src.backup_journal import BackupJournal
+
+
+def test_new_journal_records_meta(tmp_path):
+    journal = BackupJournal(tmp_path / "j.jsonl")
+    assert journal.meta == {} and not journal.resumed
+
+    journal.open({"name": "b1"})
+    journal.close()
+
+    reloaded = BackupJournal(tmp_path / "j.jsonl")
+    assert reloaded.meta["name"] == "b1"
+    assert reloaded.age >= 0
+
+
+def test_replays_done_and_part_records(tmp_path):
+    journal = BackupJournal(tmp_path / "j.jsonl")
+    journal.open({"name": "b1"})
+    journal.checkpoint("big.bin", size=100, mtime=5, offset=40, state={"chunks": ["x"]})
+    journal.checkpoint("other.bin", size=100, mtime=5, offset=60)
+    journal.done("small.txt", {"size": 3, "mtime": 1}, offset=512)
+    journal.done("other.bin", {"size": 100, "mtime": 5}, offset=1024)
+    journal.close()
+
+    reloaded = BackupJournal(tmp_path / "j.jsonl")
+    assert reloaded.offset == 1024
+    assert set(reloaded.completed) == {"small.txt", "other.bin"}
+    # A file finished after its checkpoint is no longer partial
+    assert set(reloaded.partial) == {"big.bin"}
+    assert reloaded.get_partial("big.bin", 100, 5)["state"] == {"chunks": ["x"]}
+    assert reloaded.get_partial("big.bin", 100, 6) is None
+    assert reloaded.get_partial("big.bin", 99, 5) is None
+
+
+def test_get_completed_checks_size_and_mtime(tmp_path):
+    journal = BackupJournal(tmp_path / "j.jsonl")
+    journal.open({"name": "b1"})
+    journal.done("a.txt", {"size": 3, "mtime": 1})
+    journal.close()
+
+    reloaded = BackupJournal(tmp_path / "j.jsonl")
+    assert reloaded.get_completed("a.txt") == {"size": 3, "mtime": 1}
+    assert reloaded.get_completed("a.txt", size=3, mtime=1) is not None
+    assert reloaded.get_completed("a.txt", size=4) is None
+    assert reloaded.get_completed("a.txt", mtime=2) is None
+    assert reloaded.get_completed("missing") is None
+
+
+def test_torn_last_line_is_ignored_and_fenced_off(tmp_path):
+    path = tmp_path / "j.jsonl"
+    journal = BackupJournal(path)
+    journal.open({"name": "b1"})
+    journal.done("a.txt", {"size": 1, "mtime": 1})
+    journal.close()
+    with open(path, "a") as f:
+        f.write('{"t": "done", "key": "b.t')
+
+    resumed = BackupJournal(path)
+    assert set(resumed.completed) == {"a.txt"}
+    resumed.open()
+    assert resumed.resumed
+    resumed.done("c.txt", {"size": 1, "mtime": 1})
+    resumed.close()
+
+    assert set(BackupJournal(path).completed) == {"a.txt", "c.txt"}
+
+
+def test_forget_progress(tmp_path):
+    path = tmp_path / "j.jsonl"
+    journal = BackupJournal(path)
+    journal.open({"name": "b1"})
+    journal.done("a.txt", {"size": 1, "mtime": 1}, offset=10)
+    journal.forget_progress()
+    journal.close()
+
+    reloaded = BackupJournal(path)
+    assert reloaded.meta["name"] == "b1"
+    assert reloaded.completed == {} and reloaded.offset == 0
+
+
+def test_remove(tmp_path):
+    path = tmp_path / "j.jsonl"
+    journal = BackupJournal(path)
+    journal.open({"name": "b1"})
+    journal.remove()
+
+    assert not path.exists()
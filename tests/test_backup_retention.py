@@ -0,0 +1,88 @@
+"""Tests for GFS retention planning."""
+
+from src.backup_retention import RetentionPolicy, disk_bytes, plan_retention
+
+
+def entry(name, created, size=100, new_bytes=None, parent=None):
+    return {
+        "name": name,
+        "created": created,
+        "bytes": size,
+        "new_bytes": new_bytes,
+        "parent": parent,
+    }
+
+
+def test_no_entries():
+    plan = plan_retention([], RetentionPolicy(keep_daily=3))
+    assert plan.keep == {} and plan.delete == []
+
+
+def test_keeps_newest_backup_of_each_day():
+    entries = [
+        entry("d1-early", "2026-01-01T01:00:00"),
+        entry("d1-late", "2026-01-01T23:00:00"),
+        entry("d2", "2026-01-02T12:00:00"),
+        entry("d3", "2026-01-03T12:00:00"),
+    ]
+    plan = plan_retention(entries, RetentionPolicy(keep_daily=2))
+
+    assert set(plan.keep) == {"d3", "d2"}
+    assert plan.keep["d3"] == ["newest", "daily 2026-01-03"]
+    assert [e["name"] for e in plan.delete] == ["d1-late", "d1-early"]
+    assert plan.freed_bytes == 200
+
+
+def test_rules_combine():
+    entries = [entry(f"b{month}", f"2026-{month:02d}-15T00:00:00") for month in range(1, 7)]
+    plan = plan_retention(entries, RetentionPolicy(keep_daily=1, keep_monthly=3))
+
+    assert set(plan.keep) == {"b6", "b5", "b4"}
+    assert "monthly 2026-04" in plan.keep["b4"]
+
+
+def test_newest_is_always_kept():
+    entries = [entry("old", "2025-01-01T00:00:00"), entry("new", "2026-01-01T00:00:00", size=500)]
+    plan = plan_retention(entries, RetentionPolicy(max_bytes=10))
+
+    assert list(plan.keep) == ["new"]
+    assert [e["name"] for e in plan.delete] == ["old"]
+
+
+def test_byte_budget_drops_oldest_first():
+    entries = [entry(f"b{day}", f"2026-01-0{day}T00:00:00") for day in range(1, 6)]
+    plan = plan_retention(entries, RetentionPolicy(max_bytes=300))
+
+    assert set(plan.keep) == {"b5", "b4", "b3"}
+    assert plan.keep["b4"] == ["within byte budget"]
+    assert plan.kept_bytes == 300
+    assert plan.freed_bytes == 200
+
+
+def test_incremental_charged_for_new_data_while_parent_is_kept():
+    full = entry("full", "2026-01-01T00:00:00", size=1000)
+    child = entry("child", "2026-01-02T00:00:00", size=1000, new_bytes=50, parent="full")
+
+    assert disk_bytes(child) == 50
+    assert disk_bytes(child, kept={"child"}) == 1000
+    assert disk_bytes(full) == 1000
+
+    plan = plan_retention([full, child], RetentionPolicy(max_bytes=1050))
+    assert set(plan.keep) == {"full", "child"}
+    assert plan.kept_bytes == 1050
+
+
+def test_dropping_parent_charges_child_in_full():
+    full = entry("full", "2026-01-01T00:00:00", size=1000)
+    child = entry("child", "2026-01-02T00:00:00", size=1000, new_bytes=50, parent="full")
+    plan = plan_retention([full, child], RetentionPolicy(max_bytes=1000))
+
+    assert list(plan.keep) == ["child"]
+    assert plan.kept_bytes == 1000
+    assert plan.freed_bytes == 1050 - 1000
+
+
+def test_policy_enabled():
+    assert not RetentionPolicy().enabled
+    assert RetentionPolicy(keep_weekly=1).enabled
+    assert RetentionPolicy(max_bytes=1).enabled
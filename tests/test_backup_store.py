@@ -0,0 +1,115 @@
+"""Tests for the deduplicating backup store."""
+
+import io
+
+import pytest
+
+from src import backup_store
+from src.backup_journal import BackupJournal
+from src.backup_store import BackupStore, StoreSink
+from src.sftp_transfer import RemoteFile
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    # Small chunks so a few bytes of test data span several of them
+    monkeypatch.setattr(backup_store, "CHUNK_SIZE", 4)
+    return BackupStore(tmp_path / "store")
+
+
+def read_back(store, entry):
+    return b"".join(store.iter_file(entry))
+
+
+def test_round_trip_in_chunks(store):
+    entry, new_bytes = store.put_stream("notes.txt", io.BytesIO(b"0123456789"))
+
+    assert entry["size"] == 10
+    assert len(entry["chunks"]) == 3
+    assert new_bytes > 0
+    assert read_back(store, entry) == b"0123456789"
+
+
+def test_identical_chunks_are_stored_once(store):
+    first, _ = store.put_stream("a.txt", io.BytesIO(b"aaaabbbb"))
+    second, new_bytes = store.put_stream("b.txt", io.BytesIO(b"bbbbaaaa"))
+
+    assert new_bytes == 0
+    assert first["chunks"] == second["chunks"][::-1]
+    assert len(list(store.objects_dir.glob("*/*"))) == 2
+
+
+def test_incompressible_files_are_stored_raw(store):
+    entry, new_bytes = store.put_stream("photo.jpg", io.BytesIO(b"\xff\xd8\xff\xe0"))
+
+    path, codec = store.find_object(entry["chunks"][0])
+    assert codec == "none"
+    assert path.read_bytes() == b"\xff\xd8\xff\xe0"
+    assert new_bytes == 4
+
+
+def test_resume_from_prefix_chunks(store):
+    whole, _ = store.put_stream("f.txt", io.BytesIO(b"abcdefghij"))
+    resumed, _ = store.put_stream(
+        "f.txt", io.BytesIO(b"efghij"), prefix_chunks=whole["chunks"][:1]
+    )
+
+    assert resumed == whole
+
+
+def test_snapshots_and_gc(store):
+    kept, _ = store.put_stream("kept.txt", io.BytesIO(b"keep"))
+    dropped, _ = store.put_stream("dropped.txt", io.BytesIO(b"drop"))
+    store.write_snapshot({"name": "s1", "files": {"kept.txt": kept}, "root_files": {}})
+    store.write_snapshot({"name": "s2", "files": {"dropped.txt": dropped}, "root_files": {}})
+
+    assert store.list_snapshots() == ["s1", "s2"]
+    assert store.latest_snapshot()["name"] == "s2"
+    # Unreferenced but recent objects survive the default grace period
+    assert store.delete_snapshot("s2") == {"objects_removed": 0, "bytes_freed": 0}
+    assert store.delete_snapshot("s2") is None
+
+    stats = store.gc(grace_seconds=-1)
+    assert stats["objects_removed"] == 1
+    assert store.has_chunks(kept)
+    assert not store.has_chunks(dropped)
+    with pytest.raises(FileNotFoundError):
+        read_back(store, dropped)
+
+
+def test_sink_reuses_unchanged_files(store):
+    entry, _ = store.put_stream("a.txt", io.BytesIO(b"old data"))
+    entry["mtime"] = 100
+    sink = StoreSink(store, previous={"a.txt": entry})
+
+    assert sink.link_unchanged(RemoteFile("/r/a.txt", "a.txt", 8, 100))
+    assert not sink.link_unchanged(RemoteFile("/r/b.txt", "b.txt", 8, 100))
+    assert sink.files == {"a.txt": entry}
+
+
+def test_sink_manifest(store):
+    sink = StoreSink(store)
+    sink.add_directory("uploads")
+    sink.add_stream("uploads/a.txt", io.BytesIO(b"hello"), 5, mtime=7)
+    sink.add_root_file("database.sql", io.BytesIO(b"SELECT 1;"))
+
+    manifest = sink.snapshot_manifest("snap", include_database=True)
+    assert manifest["files"]["uploads/a.txt"]["mtime"] == 7
+    assert manifest["directories"] == ["uploads"]
+    assert manifest["total_bytes"] == 5 + 9
+    assert manifest["new_bytes"] == sink.new_bytes > 0
+    assert manifest["include_database"] is True
+
+
+def test_sink_resumes_from_journal(store, tmp_path):
+    journal = BackupJournal(tmp_path / "journal.jsonl")
+    journal.open({"name": "snap"})
+    sink = StoreSink(store, journal=journal)
+    sink.add_stream("a.txt", io.BytesIO(b"payload"), 7, mtime=1)
+    sink.add_root_file("database.sql", io.BytesIO(b"dump"))
+    journal.close()
+
+    retry = StoreSink(store, journal=BackupJournal(tmp_path / "journal.jsonl"))
+    assert retry.resume(RemoteFile("/r/a.txt", "a.txt", 7, 1)) == sink.files["a.txt"]
+    assert retry.resume(RemoteFile("/r/a.txt", "a.txt", 7, 2)) is None
+    assert retry.resume_root_file("database.sql") == sink.root_files["database.sql"]
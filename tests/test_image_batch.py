@@ -0,0 +1,104 @@
+"""Tests for batch image optimization building blocks."""
+
+import io
+
+from PIL import Image
+
+from src.image_batch import (
+    BatchJobState,
+    batch_job_id,
+    created_media_ids,
+    encode_image,
+    optimized_filename,
+    select_media,
+)
+
+
+def media(media_id, url, mime_type="image/jpeg", filesize=1000):
+    return {
+        "id": media_id,
+        "source_url": url,
+        "mime_type": mime_type,
+        "media_details": {"filesize": filesize},
+    }
+
+
+LIBRARY = [
+    media(1, "https://example.com/uploads/photo.jpg"),
+    media(2, "https://example.com/uploads/photo.webp", "image/webp"),
+    media(3, "https://example.com/uploads/logo.png", "image/png", filesize=100),
+    media(4, "https://example.com/uploads/scan.jpg", filesize=0),
+    media(5, "https://example.com/uploads/doc.pdf", "application/pdf"),
+]
+
+
+def ids(selected):
+    return [item["id"] for item in selected]
+
+
+def test_select_all_by_default():
+    assert ids(select_media(LIBRARY)) == [1, 2, 3, 4, 5]
+
+
+def test_select_by_mime_type():
+    assert ids(select_media(LIBRARY, mime_types=("image/jpeg", "image/png"))) == [1, 3, 4]
+
+
+def test_min_size_keeps_unknown_sizes():
+    assert ids(select_media(LIBRARY, min_size=500)) == [1, 2, 4, 5]
+
+
+def test_missing_webp_skips_images_with_a_webp_sibling():
+    assert ids(select_media(LIBRARY, mime_types=("image/jpeg",), missing_webp=True)) == [4]
+    assert 2 not in ids(select_media(LIBRARY, missing_webp=True))
+
+
+def test_excludes_batch_outputs():
+    assert ids(select_media(LIBRARY, exclude_ids=[2, 5])) == [1, 3, 4]
+
+
+def test_job_id_is_stable():
+    assert batch_job_id({"a": 1, "b": 2}) == batch_job_id({"b": 2, "a": 1})
+    assert batch_job_id({"a": 1}) != batch_job_id({"a": 2})
+    assert batch_job_id({"a": 1}).startswith("batch-")
+
+
+def test_optimized_filename():
+    url = "https://example.com/uploads/my%20photo.jpg"
+    assert optimized_filename(url, "webp") == "my photo.webp"
+    assert optimized_filename(url, "jpeg") == "my photo.jpg"
+
+
+def test_job_state_resumes(tmp_path):
+    path = tmp_path / "jobs" / "batch-1.jsonl"
+    state = BatchJobState(path, "batch-1", {"quality": 85})
+    state.record(1, 1000, {"status": "optimized", "new_media_id": 10})
+    state.record(3, 100, {"status": "not smaller"})
+    state.close()
+    with open(path, "a") as f:
+        f.write('{"media_id": 4, "si')
+
+    resumed = BatchJobState(path, "batch-1", {"quality": 85})
+    assert resumed.get(1, 1000) == {"status": "optimized", "new_media_id": 10}
+    assert resumed.get(1, 2000) is None  # the file changed since
+    assert resumed.get(4, 0) is None
+    resumed.record(4, 0, {"status": "optimized", "new_media_id": 11})
+    resumed.close()
+
+    other = BatchJobState(tmp_path / "jobs" / "batch-2.jsonl", "batch-2", {})
+    other.record(1, 1000, {"status": "optimized", "new_media_id": 12})
+    other.close()
+
+    assert created_media_ids(tmp_path / "jobs") == {10, 11, 12}
+
+
+def test_encode_image_resizes_and_drops_unused_alpha():
+    buffer = io.BytesIO()
+    Image.new("RGBA", (400, 200), (200, 50, 50, 255)).save(buffer, "PNG")
+
+    data, width, height = encode_image(buffer.getvalue(), "webp", max_width=100, max_height=100)
+
+    assert (width, height) == (100, 50)
+    img = Image.open(io.BytesIO(data))
+    assert img.format == "WEBP"
+    assert img.mode == "RGB"
@@ -0,0 +1,12 @@
+"""Tests for image optimizer helpers."""
+
+from src.image_optimizer import media_title
+
+
+def test_media_title_prefers_raw():
+    assert media_title({"title": {"raw": "Tom & Jerry", "rendered": "Tom &amp; Jerry"}}) == "Tom & Jerry"
+
+
+def test_media_title_unescapes_rendered():
+    assert media_title({"title": {"rendered": "Tom &amp; Jerry &#8211; 1"}}) == "Tom & Jerry – 1"
+    assert media_title({}) == ""
@@ -0,0 +1,62 @@
+"""Tests for the SSH connection pool."""
+
+import time
+
+from src.ssh_pool import SSHConnectionPool
+
+
+class FakeTransport:
+    def __init__(self):
+        self.active = True
+
+    def is_active(self):
+        return self.active
+
+
+class FakeClient:
+    def __init__(self):
+        self.transport = FakeTransport()
+        self.closed = False
+
+    def get_transport(self):
+        return self.transport
+
+    def close(self):
+        self.closed = True
+        self.transport.active = False
+
+
+def make_pool(**kwargs):
+    pool = SSHConnectionPool(None, **kwargs)
+    pool._open = FakeClient
+    return pool
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return condition()
+
+
+def test_spreads_leases_over_connections():
+    pool = make_pool(max_connections=2, max_channels=2)
+    clients = [pool.acquire() for _ in range(4)]
+
+    assert len({id(client) for client in clients}) == 2
+    pool.close_all()
+
+
+def test_idle_connections_are_closed_without_further_calls():
+    pool = make_pool(max_connections=2, idle_timeout=0.2)
+    idle = pool.acquire()
+    busy = pool.acquire()
+    pool.release(idle)
+
+    assert wait_for(lambda: idle.closed)
+    assert not busy.closed
+
+    pool.release(busy)
+    assert wait_for(lambda: busy.closed)
+    # The reaper stops once the pool is empty
+    assert wait_for(lambda: pool._reaper is None)
@@ -0,0 +1,39 @@
+"""Tests for tool dispatch and cancellation."""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.tool_executor import ToolExecutor, check_cancelled, in_current_context
+
+
+def test_cancellation_reaches_tasks_in_current_context():
+    started = threading.Event()
+
+    def task():
+        started.set()
+        while True:
+            check_cancelled()
+            threading.Event().wait(0.01)
+
+    def handler():
+        with ThreadPoolExecutor(1) as pool:
+            return pool.submit(in_current_context(task)).result()
+
+    async def main():
+        executor = ToolExecutor(max_workers=1)
+        call = asyncio.ensure_future(executor.run("tool", handler))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        # Only returns once the task has seen the cancellation and stopped
+        executor.shutdown()
+
+    asyncio.run(main())
+
+
+def test_check_cancelled_is_a_noop_outside_tool_calls():
+    check_cancelled()